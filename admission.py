@@ -0,0 +1,140 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict
+from metrics import ADMISSION_REJECTED, QUEUE_WAIT
+
+class AdmissionConfig(BaseModel):
+    """모듈 또는 실행 환경 하나에 대한 동시 실행 제한"""
+    model_config = ConfigDict(frozen=True)
+
+    max_concurrency: int = 4
+    # 슬롯을 기다릴 수 있는 요청 수. 0 이면 슬롯이 없을 때 바로 거절
+    max_queue: int = 16
+    # 슬롯을 기다리는 최대 시간(초). None 이면 자리가 날 때까지 기다린다
+    max_wait: Optional[float] = 10.0
+
+class AdmissionRejected(Exception):
+    """과부하로 실행을 받지 않음 (REST 429 / gRPC RESOURCE_EXHAUSTED)"""
+
+    def __init__(self, key: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"{key} is overloaded: {reason}")
+        self.key = key
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionLimit:
+    """세마포어 + 크기가 제한된 대기열. 대기 시간/거절 수를 함께 기록한다."""
+
+    def __init__(self, config: AdmissionConfig, label: str = ""):
+        self.config = config
+        # 지표 라벨 (module:<이름> / env:<환경>)
+        self.label = label
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def acquire(self, key: str) -> None:
+        if self._semaphore.locked() and self.waiting >= self.config.max_queue:
+            self.rejected += 1
+            ADMISSION_REJECTED.inc(self.label)
+            raise AdmissionRejected(key, f"{self.active} running, {self.waiting} waiting")
+        self.waiting += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.config.max_wait)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            ADMISSION_REJECTED.inc(self.label)
+            raise AdmissionRejected(key, f"no slot within {self.config.max_wait} seconds")
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - start
+        QUEUE_WAIT.observe(waited, "admission")
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.active += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.config.max_concurrency,
+            "max_queue": self.config.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+class AdmissionController:
+    """ExecutorManager 앞단의 모듈별/실행 환경별 동시 실행 제한.
+
+    modules 에 없는 모듈은 default 설정을 따르고 (None 이면 제한 없음), 실행 환경 제한은
+    envs 에 있는 환경에만 걸린다. 항상 모듈 -> 환경 순으로 슬롯을 잡으므로 서로 기다리며 멈추지 않는다.
+    """
+
+    def __init__(
+        self,
+        default: Optional[AdmissionConfig] = None,
+        modules: Optional[Dict[str, AdmissionConfig]] = None,
+        envs: Optional[Dict[str, AdmissionConfig]] = None,
+    ):
+        self.default = default
+        self.module_configs = modules or {}
+        self.env_configs = envs or {}
+        self.module_limits: Dict[str, AdmissionLimit] = {}
+        self.env_limits: Dict[str, AdmissionLimit] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AdmissionController":
+        """{"default": {...}, "modules": {name: {...}}, "envs": {env: {...}}} 형태의 설정(YAML/JSON)"""
+        default = data.get("default")
+        return cls(
+            default=AdmissionConfig(**default) if default is not None else None,
+            modules={name: AdmissionConfig(**c) for name, c in (data.get("modules") or {}).items()},
+            envs={env: AdmissionConfig(**c) for env, c in (data.get("envs") or {}).items()},
+        )
+
+    def _limits(self, module_name: str, env: str) -> List[Tuple[str, AdmissionLimit]]:
+        limits = []
+        config = self.module_configs.get(module_name, self.default)
+        if config is not None:
+            limit = self.module_limits.get(module_name)
+            if limit is None:
+                limit = self.module_limits[module_name] = AdmissionLimit(config, f"module:{module_name}")
+            limits.append((f"module '{module_name}'", limit))
+        if env in self.env_configs:
+            limit = self.env_limits.get(env)
+            if limit is None:
+                limit = self.env_limits[env] = AdmissionLimit(self.env_configs[env], f"env:{env}")
+            limits.append((f"environment '{env}'", limit))
+        return limits
+
+    @asynccontextmanager
+    async def admit(self, module_name: str, env: str) -> AsyncIterator[None]:
+        acquired = []
+        try:
+            for key, limit in self._limits(module_name, env):
+                await limit.acquire(key)
+                acquired.append(limit)
+            yield
+        finally:
+            for limit in reversed(acquired):
+                limit.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "modules": {name: limit.stats() for name, limit in self.module_limits.items()},
+            "envs": {env: limit.stats() for env, limit in self.env_limits.items()},
+        }
@@ -0,0 +1,29 @@
+"""add (created_at, id) index to error_log
+
+Revision ID: 3d1e7a9c5b20
+Revises: 201724fb657b
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d1e7a9c5b20'
+down_revision: Union[str, None] = '201724fb657b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 오류 로그 키셋 페이지네이션 (created_at DESC, id DESC)
+    op.create_index('idx_error_log_created_at_id', 'error_log', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_error_log_created_at_id', table_name='error_log')
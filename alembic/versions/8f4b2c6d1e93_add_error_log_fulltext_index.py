@@ -0,0 +1,66 @@
+"""add full-text index to error_log
+
+Revision ID: 8f4b2c6d1e93
+Revises: 3d1e7a9c5b20
+Create Date: 2026-10-17 14:05:22.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f4b2c6d1e93'
+down_revision: Union[str, None] = '3d1e7a9c5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 이 리비전 시점의 DDL (모델 쪽 상수를 가져다 쓰지 않는다)
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS error_log_fts USING fts5("
+    "message, dev_message, stack, content='error_log', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS error_log_fts_insert AFTER INSERT ON error_log BEGIN "
+    "INSERT INTO error_log_fts(rowid, message, dev_message, stack) VALUES (new.id, new.message, new.dev_message, new.stack); END",
+    "CREATE TRIGGER IF NOT EXISTS error_log_fts_delete AFTER DELETE ON error_log BEGIN "
+    "INSERT INTO error_log_fts(error_log_fts, rowid, message, dev_message, stack) "
+    "VALUES ('delete', old.id, old.message, old.dev_message, old.stack); END",
+    "CREATE TRIGGER IF NOT EXISTS error_log_fts_update AFTER UPDATE OF message, dev_message, stack ON error_log BEGIN "
+    "INSERT INTO error_log_fts(error_log_fts, rowid, message, dev_message, stack) "
+    "VALUES ('delete', old.id, old.message, old.dev_message, old.stack); "
+    "INSERT INTO error_log_fts(rowid, message, dev_message, stack) VALUES (new.id, new.message, new.dev_message, new.stack); END",
+    # 이미 있던 행까지 색인
+    "INSERT INTO error_log_fts(error_log_fts) VALUES ('rebuild')",
+]
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE error_log ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(message, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(dev_message, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(stack, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_error_log_search_vector ON error_log USING GIN (search_vector)",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # keyword 검색용 전문 색인: sqlite 는 FTS5 테이블 + 트리거, PostgreSQL 은 tsvector 생성 컬럼 + GIN 색인
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect == "sqlite" and not bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar():
+        # FTS5 없이 빌드된 sqlite 는 LIKE 검색을 그대로 쓴다
+        return
+    for statement in {"sqlite": SQLITE_SEARCH_DDL, "postgresql": POSTGRES_SEARCH_DDL}.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("error_log_fts_insert", "error_log_fts_delete", "error_log_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS error_log_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_error_log_search_vector")
+        op.execute("ALTER TABLE error_log DROP COLUMN IF EXISTS search_vector")
@@ -28,6 +28,21 @@ class UserOut(BaseModel):
 # Security
 security = HTTPBearer()
 
+# 실행 경로에서 요청자 식별용 (토큰이 없어도 실패하지 않음)
+optional_security = HTTPBearer(auto_error=False)
+
+async def get_token_data(credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_security)) -> Optional[TokenData]:
+    """토큰이 있으면 DB 조회 없이 클레임만 읽는다. 토큰이 없거나 잘못되면 None"""
+    if credentials is None:
+        return None
+    try:
+        payload = decode_token(credentials.credentials)
+    except Exception:
+        return None
+    if payload.get("sub") is None:
+        return None
+    return TokenData(username=payload["sub"], scopes=payload.get("scopes", []))
+
 # DB 기반 사용자 조회
 async def get_user_by_username(username: str, db):
     result = await db.execute(select(User).where(User.username == username))
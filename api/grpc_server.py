@@ -1,16 +1,24 @@
 import json
 import grpc
 from concurrent import futures
-from typing import Any
+from typing import Any, Optional
 import asyncio
 from proto import executor_pb2, executor_pb2_grpc
-from models import ModuleSchema, ExecRequest as ModelExecRequest
+from models import ModuleSchema, ExecRequest as ModelExecRequest, Tenant
 from module_registry import ModuleRegistry
-from executor_manager import ExecutorManager
-from api.auth import get_current_user, User, SECRET_KEY, ALGORITHM
+from executor_manager import ExecutorManager, error_result, BATCH_MAX_SIZE
+from job_queue import JobQueue, JobQueueFull
+from admission import AdmissionRejected
+from fair_scheduler import tenant_from_token
+import tracing
+from api.auth import get_current_user, TokenData, SECRET_KEY, ALGORITHM
 from jose import jwt, JWTError
 import contextvars
 
+# ExecuteMany 스트림 하나가 동시에 실행할 수 있는 요청 수 (x-max-in-flight 메타데이터로 조정)
+STREAM_DEFAULT_IN_FLIGHT = 16
+STREAM_MAX_IN_FLIGHT = 64
+
 # --- gRPC JWT 인증 인터셉터 ---
 user_ctx_var = contextvars.ContextVar("grpc_user", default=None)
 
@@ -46,20 +54,40 @@ class JwtAuthInterceptor(grpc.aio.ServerInterceptor):
             scopes = payload.get('scopes', [])
             if not username:
                 raise JWTError('No subject in token')
-            user = User(username=username, scopes=scopes)
+            user = TokenData(username=username, scopes=scopes)
         except JWTError:
             for handler_type in ["unary_unary", "unary_stream", "stream_unary", "stream_stream"]:
                 if getattr(handler, handler_type, None):
                     return get_handler_wrapper(handler_type)
             return None
 
+        # 클라이언트가 metadata 로 보낸 traceparent 를 이어받아 RPC 마다 server span 을 연다
+        method = handler_call_details.method
+        parent = tracing.parse_traceparent(metadata.get(tracing.TRACEPARENT))
+        attributes = {"rpc.system": "grpc", "rpc.method": method}
+
         def wrap(orig_func):
             if not orig_func:
                 return None
             async def wrapper(request, context):
                 token = user_ctx_var.set(user)
                 try:
-                    return await orig_func(request, context)
+                    with tracing.span(method, "server", parent, attributes):
+                        return await orig_func(request, context)
+                finally:
+                    user_ctx_var.reset(token)
+            return wrapper
+
+        def wrap_stream(orig_func):
+            # 응답 스트리밍 핸들러는 async generator 이므로 await 대신 그대로 흘려보낸다
+            if not orig_func:
+                return None
+            async def wrapper(request, context):
+                token = user_ctx_var.set(user)
+                try:
+                    with tracing.span(method, "server", parent, attributes):
+                        async for response in orig_func(request, context):
+                            yield response
                 finally:
                     user_ctx_var.reset(token)
             return wrapper
@@ -73,7 +101,7 @@ class JwtAuthInterceptor(grpc.aio.ServerInterceptor):
             )
         if getattr(handler, "unary_stream", None):
             return grpc.unary_stream_rpc_method_handler(
-                wrap(handler.unary_stream),
+                wrap_stream(handler.unary_stream),
                 request_deserializer=handler.request_deserializer,
                 response_serializer=handler.response_serializer,
             )
@@ -85,7 +113,7 @@ class JwtAuthInterceptor(grpc.aio.ServerInterceptor):
             )
         if getattr(handler, "stream_stream", None):
             return grpc.stream_stream_rpc_method_handler(
-                wrap(handler.stream_stream),
+                wrap_stream(handler.stream_stream),
                 request_deserializer=handler.request_deserializer,
                 response_serializer=handler.response_serializer,
             )
@@ -97,33 +125,198 @@ async def require_scope(context, required_scope):
     if not user or required_scope not in user.scopes:
         await context.abort(grpc.StatusCode.PERMISSION_DENIED, f"Not enough permissions. Required scope: {required_scope}")
 
+async def require_execute_scope(context) -> Tenant:
+    """실행 권한을 확인하고 공정 스케줄링에 쓸 요청자(테넌트)를 돌려준다"""
+    user = user_ctx_var.get()
+    if not user or (('execute:all' not in user.scopes) and ('execute:limited' not in user.scopes)):
+        await context.abort(grpc.StatusCode.PERMISSION_DENIED, "Not enough permissions. Required scope: execute:all or execute:limited")
+    return tenant_from_token(user.username, user.scopes)
+
+def to_model_request(message, tenant: Optional[Tenant] = None) -> ModelExecRequest:
+    """proto ExecRequest/ExecManyRequest -> 모델. content_type 이 있으면 payload 바이트를 그대로 넘기고
+    json_input 은 생략할 수 있다. JSON 이 잘못되면 json.JSONDecodeError."""
+    input_json = json.loads(message.json_input) if message.json_input or not message.content_type else {}
+    exec_request = ModelExecRequest(module=message.module, input_json=input_json, tenant=tenant)
+    if message.content_type:
+        exec_request.payload = message.payload
+        exec_request.content_type = message.content_type
+    if getattr(message, "timeout", 0) > 0:
+        exec_request.timeout = message.timeout
+    return exec_request
+
+def to_exec_response(result) -> executor_pb2.ExecResponse:
+    response = executor_pb2.ExecResponse(
+        result=json.dumps(result.result_json),
+        exit_code=result.exit_code,
+        stderr=result.stderr or "",
+        stdout=result.stdout or "",
+        duration=result.duration
+    )
+    if result.content_type:
+        response.payload = result.payload or b""
+        response.content_type = result.content_type
+    if result.phases:
+        response.phases.update(result.phases)
+    return response
+
+def to_job_status(job) -> executor_pb2.JobStatus:
+    status = executor_pb2.JobStatus(id=job.id, module=job.module, status=job.status, execution_id=job.execution_id or 0)
+    if job.result is not None:
+        status.response.CopyFrom(to_exec_response(job.result))
+    return status
+
 class ExecutorServicer(executor_pb2_grpc.ExecutorServicer):
-    def __init__(self, module_registry: ModuleRegistry, executor_manager: ExecutorManager):
+    def __init__(self, module_registry: ModuleRegistry, executor_manager: ExecutorManager, job_queue: Optional[JobQueue] = None):
         self.module_registry = module_registry
         self.executor_manager = executor_manager
+        self.job_queue = job_queue
+
+    async def _require_job_queue(self, context) -> JobQueue:
+        if self.job_queue is None:
+            await context.abort(grpc.StatusCode.UNIMPLEMENTED, "Job queue is not enabled")
+        return self.job_queue
+
+    async def SubmitJob(self, request, context):
+        tenant = await require_execute_scope(context)
+        job_queue = await self._require_job_queue(context)
+        try:
+            exec_request = to_model_request(request, tenant)
+        except json.JSONDecodeError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid JSON input")
+        if not await self.module_registry.resolve_module(request.module):
+            await context.abort(grpc.StatusCode.NOT_FOUND, f"Module '{request.module}' not found")
+        try:
+            job = job_queue.submit(exec_request)
+        except JobQueueFull as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        return to_job_status(job)
+
+    async def GetJob(self, request, context):
+        await require_execute_scope(context)
+        job = await (await self._require_job_queue(context)).get(request.id)
+        if job is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Job not found")
+        return to_job_status(job)
+
+    async def CancelJob(self, request, context):
+        await require_execute_scope(context)
+        job = (await self._require_job_queue(context)).cancel(request.id)
+        if job is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Job not found")
+        return to_job_status(job)
 
     async def Execute(self, request, context):
-        user = user_ctx_var.get()
-        if not user or (('execute:all' not in user.scopes) and ('execute:limited' not in user.scopes)):
-            await context.abort(grpc.StatusCode.PERMISSION_DENIED, "Not enough permissions. Required scope: execute:all or execute:limited")
+        tenant = await require_execute_scope(context)
         try:
-            input_json = json.loads(request.json_input)
+            exec_request = to_model_request(request, tenant)
         except json.JSONDecodeError:
             context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
             context.set_details("Invalid JSON input")
             return executor_pb2.ExecResponse()
-        exec_request = ModelExecRequest(
-            module=request.module,
-            input_json=input_json
-        )
-        result = await self.executor_manager.execute(exec_request)
-        return executor_pb2.ExecResponse(
-            result=json.dumps(result.result_json),
-            exit_code=result.exit_code,
-            stderr=result.stderr,
-            stdout=result.stdout,
-            duration=result.duration
-        )
+        try:
+            result = await self.executor_manager.execute(exec_request)
+        except AdmissionRejected as e:
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(str(e))
+            return executor_pb2.ExecResponse()
+        return to_exec_response(result)
+
+    async def ExecuteStream(self, request, context):
+        tenant = await require_execute_scope(context)
+        try:
+            exec_request = to_model_request(request, tenant)
+        except json.JSONDecodeError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid JSON input")
+        try:
+            async for event in self.executor_manager.execute_stream(exec_request):
+                if event.type == "stdout":
+                    yield executor_pb2.ExecEvent(stdout=event.data)
+                elif event.type == "stderr":
+                    yield executor_pb2.ExecEvent(stderr=event.data)
+                elif event.type == "progress":
+                    yield executor_pb2.ExecEvent(progress=executor_pb2.ExecProgress(
+                        value=event.progress or 0.0, message=event.data
+                    ))
+                elif event.type == "result":
+                    yield executor_pb2.ExecEvent(result=to_exec_response(event.result))
+        except AdmissionRejected as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+
+    async def ExecuteMany(self, request_iterator, context):
+        # 인증은 스트림 시작 시 한 번 (인터셉터). 모듈 조회/검증은 메시지마다 해서(모듈 캐시가 받아 준다)
+        # 오래 열린 스트림도 재배포/롤백/비활성화/삭제를 바로 따른다
+        tenant = await require_execute_scope(context)
+        metadata = dict(context.invocation_metadata() or ())
+        try:
+            max_in_flight = int(metadata.get("x-max-in-flight", STREAM_DEFAULT_IN_FLIGHT))
+        except ValueError:
+            max_in_flight = STREAM_DEFAULT_IN_FLIGHT
+        semaphore = asyncio.Semaphore(max(1, min(max_in_flight, STREAM_MAX_IN_FLIGHT)))
+        responses: asyncio.Queue = asyncio.Queue()
+        tasks = set()
+
+        async def execute_one(message):
+            try:
+                exec_request = to_model_request(message, tenant)
+            except json.JSONDecodeError:
+                return error_result("Invalid JSON input")
+            return await self.executor_manager.execute(exec_request)
+
+        async def run(message):
+            try:
+                try:
+                    result = await execute_one(message)
+                except AdmissionRejected as e:
+                    result = error_result(str(e))
+                except Exception as e:
+                    result = error_result(f"Error executing module: {str(e)}")
+                await responses.put(executor_pb2.ExecManyResponse(id=message.id, response=to_exec_response(result)))
+            finally:
+                semaphore.release()
+
+        async def pump():
+            try:
+                async for message in request_iterator:
+                    # 실행 중인 요청이 K 개면 다음 메시지를 읽지 않아 클라이언트 쪽에 흐름 제어가 걸린다
+                    await semaphore.acquire()
+                    task = asyncio.ensure_future(run(message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*list(tasks))
+            except Exception as e:
+                # 요청 스트림 오류는 응답 루프로 넘겨 핸들러에서 다시 올린다
+                responses.put_nowait(e)
+            finally:
+                responses.put_nowait(None)
+
+        reader = asyncio.ensure_future(pump())
+        try:
+            while True:
+                response = await responses.get()
+                if response is None:
+                    break
+                if isinstance(response, Exception):
+                    raise response
+                yield response
+        finally:
+            reader.cancel()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(reader, *list(tasks), return_exceptions=True)
+
+    async def ExecuteBatch(self, request, context):
+        tenant = await require_execute_scope(context)
+        if len(request.json_inputs) > BATCH_MAX_SIZE:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"json_inputs is limited to {BATCH_MAX_SIZE} items")
+        try:
+            inputs = [json.loads(json_input) for json_input in request.json_inputs]
+        except json.JSONDecodeError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid JSON input")
+        async for index, result in self.executor_manager.iter_batch(
+            request.module, inputs, request.concurrency or 8, ordered=request.ordered, tenant=tenant
+        ):
+            yield executor_pb2.ExecBatchItem(index=index, response=to_exec_response(result))
 
     async def ListModules(self, request, context):
         await require_scope(context, "modules:read")
@@ -142,7 +335,7 @@ class ExecutorServicer(executor_pb2_grpc.ExecutorServicer):
 
     async def GetModule(self, request, context):
         await require_scope(context, "modules:read")
-        module = self.module_registry.get_module(request.name)
+        module = await self.module_registry.resolve_module(request.name)
         if not module:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details(f"Module '{request.name}' not found")
@@ -150,8 +343,8 @@ class ExecutorServicer(executor_pb2_grpc.ExecutorServicer):
         return executor_pb2.ModuleInfo(
             name=module.name,
             env=module.env,
-            version=module.version,
-            created_at=module.created_at.isoformat(),
+            version=module.version or "",
+            created_at=module.created_at.isoformat() if module.created_at else "",
             tags=module.tags
         )
 
@@ -186,11 +379,11 @@ class ExecutorServicer(executor_pb2_grpc.ExecutorServicer):
             context.set_details(f"Module '{request.name}' not found")
         return executor_pb2.DeleteModuleResponse(success=success)
 
-def serve(module_registry: ModuleRegistry, executor_manager: ExecutorManager, port=50051):
+def serve(module_registry: ModuleRegistry, executor_manager: ExecutorManager, port=50051, job_queue: Optional[JobQueue] = None):
     # --- 인터셉터 등록 ---
     server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10), interceptors=[JwtAuthInterceptor()])
     executor_pb2_grpc.add_ExecutorServicer_to_server(
-        ExecutorServicer(module_registry, executor_manager),
+        ExecutorServicer(module_registry, executor_manager, job_queue),
         server
     )
     server.add_insecure_port(f'[::]:{port}')
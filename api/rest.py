@@ -2,26 +2,35 @@ from fastapi import FastAPI, HTTPException, Depends, Body, Request, UploadFile,
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
 from models.module import Module
-from module_registry import ModuleRegistry
-from executor_manager import ExecutorManager
+from module_registry import ModuleRegistry, module_cache
+from executor_manager import ExecutorManager, BATCH_MAX_SIZE
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.db import get_db, Base, get_engine, init_engine
 from models.user import User
 from schemas.user import UserCreate, UserRead, UserLogin
 from utils.jwt import create_access_token
-from api.auth import verify_password, get_current_user, has_role
+from api.auth import verify_password, get_current_user, has_role, get_token_data, TokenData
 from utils.security import hash_password, validate_password_policy
+import asyncio
 import hashlib
+import json
 from utils.audit import log_audit_event
 from models.audit_log import AuditLog
 from schemas.audit_log import AuditLogRead
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from models import ExecRequest
+from models import ExecContext, ExecRequest, Job, Tenant
+from job_queue import JobQueue, JobQueueFull
+from execution_history import ExecutionHistory
+from admission import AdmissionRejected
+from fair_scheduler import tenant_from_token
+import metrics
+import tracing
+import time
 import tempfile
 import zipfile
 import os
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, PlainTextResponse
 from models.validation_log import ModuleValidationLog
 from models.module_history import ModuleHistory
 from models.version import Version
@@ -31,16 +40,22 @@ from sqlalchemy import update
 from utils.exceptions import CustomException
 import logging
 from models.error_log import ErrorLog
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, cast, type_coerce, String
 from schemas.error_log import ErrorLogRead
 import csv
 from fastapi.responses import StreamingResponse
 from io import StringIO
+from datetime import datetime
+from utils.pagination import encode_cursor, decode_cursor
+from utils.fulltext import apply_keyword
 import shutil
-import subprocess
+from utils.process import run_process
+from executors.code_cache import code_cache, CompiledModule
 
 def create_app() -> FastAPI:
     app = FastAPI(title="Operato Runner", description="Python module execution platform")
+    # traceparent 헤더를 이어받아 요청마다 server span 을 연다 (추적이 켜져 있을 때만)
+    app.add_middleware(tracing.TracingMiddleware)
 
     @app.on_event("startup")
     async def on_startup():
@@ -73,6 +88,23 @@ def create_app() -> FastAPI:
         stderr: str
         stdout: str
         duration: float
+        # 단계별 소요 시간(초). 느린 실행이 조회/대기/워커 기동/직렬화/handler 중 어디서 걸렸는지 본다
+        phases: Optional[Dict[str, float]] = None
+
+    class BatchRunRequest(BaseModel):
+        inputs: List[Dict[str, Any]]
+        concurrency: int = 8
+        # True 면 결과를 끝나는 순서대로 NDJSON 으로 스트리밍
+        stream: bool = False
+
+    class BatchRunResponse(BaseModel):
+        results: List[RunResponse]
+
+    class JobSubmitRequest(BaseModel):
+        module: str
+        input: Dict[str, Any] = {}
+        # 실행 제한 시간(초). 없으면 작업 큐 기본값
+        timeout: Optional[float] = None
 
     # DI: AsyncSession을 받아서 ModuleRegistry 생성
     async def get_module_registry(db: AsyncSession = Depends(get_db)):
@@ -81,6 +113,44 @@ def create_app() -> FastAPI:
     def get_executor_manager(request: Request):
         return request.app.state.executor_manager
 
+    def get_job_queue(request: Request) -> JobQueue:
+        job_queue = getattr(request.app.state, "job_queue", None)
+        if job_queue is None:
+            raise HTTPException(status_code=503, detail="비동기 작업 큐가 설정되지 않았습니다.")
+        return job_queue
+
+    def get_execution_history(request: Request) -> ExecutionHistory:
+        history = getattr(request.app.state, "history", None)
+        if history is None:
+            raise HTTPException(status_code=503, detail="실행 이력 저장소가 설정되지 않았습니다.")
+        return history
+
+    def get_tenant(token: Optional[TokenData] = Depends(get_token_data)) -> Tenant:
+        # 공정 스케줄링 단위. 토큰 없이 호출하면 익명 테넌트 하나로 묶인다
+        return tenant_from_token(token.username if token else None, token.scopes if token else [])
+
+    def job_body(job: Job) -> Dict[str, Any]:
+        # 바이너리 결과는 JSON 응답에 싣지 않는다
+        return job.model_dump(mode="json", exclude={"result": {"payload"}})
+
+    async def invalidate_module(request: Request, name: str):
+        # 모듈 정보/배포 상태가 바뀌면 메타데이터 캐시, 컴파일 캐시, 상주 워커 등을 정리
+        module_cache.invalidate(name)
+        code_cache.invalidate(name)
+        executor_manager = getattr(request.app.state, "executor_manager", None)
+        if executor_manager is not None:
+            await executor_manager.invalidate_module(name)
+
+    async def prepare_module(request: Request, name: str):
+        # 배포 직후 executor 준비 작업(docker 이미지 pull 등). 실패해도 등록은 유지하고 실행 시 다시 시도
+        executor_manager = getattr(request.app.state, "executor_manager", None)
+        if executor_manager is None:
+            return
+        try:
+            await executor_manager.prepare_module(name)
+        except Exception as e:
+            logging.warning(f"[{name}] prepare failed: {e}")
+
     # 라우트
     @app.get("/api/modules", response_model=List[ModuleResponse])
     async def list_modules(module_registry: ModuleRegistry = Depends(get_module_registry), db: AsyncSession = Depends(get_db)):
@@ -159,6 +229,7 @@ def create_app() -> FastAPI:
 
     @app.post("/api/modules", response_model=ModuleResponse, status_code=201)
     async def create_module(
+        http_request: Request,
         name: str = Form(...),
         env: str = Form(...),
         version: str = Form("0.1.0"),
@@ -198,6 +269,8 @@ def create_app() -> FastAPI:
             )
             db.add(module)
             await db.commit()
+            await invalidate_module(http_request, name)
+            await prepare_module(http_request, name)
             return {
                 "name": name,
                 "env": env,
@@ -271,6 +344,7 @@ def create_app() -> FastAPI:
                 # Module.version 필드도 갱신
                 module.version = version
                 await db.commit()
+                await invalidate_module(http_request, name)
                 return ModuleResponse(
                     name=module.name,
                     env=module.env,
@@ -329,6 +403,7 @@ def create_app() -> FastAPI:
             module.version = version
             await db.commit()
             await log_audit_event(db, action="module_deploy", detail=f"Module {module.name} deployed", user_id=current_user.id)
+            await invalidate_module(http_request, name)
             return ModuleResponse(
                 name=module.name,
                 env=module.env,
@@ -342,81 +417,103 @@ def create_app() -> FastAPI:
     @app.delete("/api/modules/{name}", status_code=204)
     async def delete_module(
         name: str,
+        http_request: Request,
         module_registry: ModuleRegistry = Depends(get_module_registry)
     ):
         deleted = await module_registry.delete_module(name)
         if not deleted:
             raise HTTPException(status_code=404, detail=f"Module '{name}' not found")
+        await invalidate_module(http_request, name)
         return None
 
-    @app.post("/run/{module}", response_model=RunResponse)
-    async def run_module(
-        module: str,
-        request: RunRequest = Body(...),
-        executor_manager: ExecutorManager = Depends(get_executor_manager),
-        db: AsyncSession = Depends(get_db)
-    ):
-        # 활성화된 버전의 code를 versions에서 읽어옴
-        result = await db.execute(select(Module).where(Module.name == module))
-        module_obj = result.scalars().first()
-        if not module_obj:
-            raise HTTPException(status_code=404, detail="Module not found")
-        active_version_result = await db.execute(
-            select(Version).join(Deployment, Deployment.version_id == Version.id)
-            .where(Version.module_id == module_obj.id, Deployment.status == "active")
-        )
-        version_obj = active_version_result.scalars().first()
-        if not version_obj:
+    def run_inline_body(module: str, module_obj, input_data, phases: Optional[Dict[str, float]] = None) -> RunResponse:
+        # 인라인 실행 시 code를 직접 eval/exec로 실행
+        code = module_obj.code
+        if not code:
             raise HTTPException(
                 status_code=400,
-                detail="활성화된 버전이 없습니다. 배포/버전 상태를 확인하세요."
+                detail="활성화된 버전의 코드가 비어 있습니다. 배포/버전 상태를 확인하세요."
             )
-        # 인라인 실행 시 code를 직접 eval/exec로 실행
-        if module_obj.env == "inline":
-            code = version_obj.code
-            if not code:
+        if not isinstance(input_data, dict):
+            try:
+                input_data = dict(input_data)
+            except Exception:
                 raise HTTPException(
                     status_code=400,
-                    detail="활성화된 버전의 코드가 비어 있습니다. 배포/버전 상태를 확인하세요."
+                    detail=f"input 파라미터가 dict 타입이 아닙니다. 실제 타입: {type(input_data)}"
                 )
-            input_data = request.input
-            if not isinstance(input_data, dict):
-                try:
-                    input_data = dict(input_data)
-                except Exception:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"input 파라미터가 dict 타입이 아닙니다. 실제 타입: {type(request.input)}"
-                    )
-            from io import StringIO
-            import sys
-            user_code = code
-            wrapped_code = "def handler(input):\n"
-            for line in user_code.splitlines():
-                wrapped_code += "    " + line + "\n"
+        import sys
+        start_time = time.perf_counter()
+        phases = dict(phases or {})
+
+        def load():
+            # 사용자 코드를 handler 함수 본문으로 감싸 한 번만 컴파일
+            wrapped_code = "def handler(input):\n" + "".join("    " + line + "\n" for line in code.splitlines())
+            compiled = compile(wrapped_code, f"<inline:{module}>", "exec")
             local_vars = {}
-            old_stdout = sys.stdout
-            sys.stdout = mystdout = StringIO()
-            try:
-                exec(wrapped_code, {}, local_vars)
-                result_data = local_vars["handler"](input_data)
-                stdout_value = mystdout.getvalue()
-            except Exception as e:
-                sys.stdout = old_stdout
-                raise HTTPException(status_code=500, detail=f"인라인 코드 실행 실패: {str(e)}")
-            finally:
-                sys.stdout = old_stdout
-            return RunResponse(
-                result=result_data,
-                exit_code=0,
-                stderr="",
-                stdout=stdout_value,
-                duration=0.0
+            exec(compiled, {}, local_vars)
+            return CompiledModule(compiled, local_vars["handler"])
+
+        old_stdout = sys.stdout
+        sys.stdout = mystdout = StringIO()
+        try:
+            # 캐시 hit 이면 컴파일/exec 없이 handler 호출 한 번으로 끝난다
+            handler = code_cache.get_or_load(
+                code_cache.make_key(module, module_obj.version_id, code, kind="body"), load
+            ).handler
+            handler_start = time.perf_counter()
+            phases["compile"] = handler_start - start_time
+            result_data = handler(input_data)
+            phases["handler"] = time.perf_counter() - handler_start
+            stdout_value = mystdout.getvalue()
+        except Exception as e:
+            sys.stdout = old_stdout
+            metrics.EXECUTION_DURATION.observe(time.perf_counter() - start_time, module, "inline", "1")
+            raise HTTPException(status_code=500, detail=f"인라인 코드 실행 실패: {str(e)}")
+        finally:
+            sys.stdout = old_stdout
+        duration = time.perf_counter() - start_time
+        metrics.EXECUTION_DURATION.observe(duration, module, "inline", "0")
+        return RunResponse(
+            result=result_data,
+            exit_code=0,
+            stderr="",
+            stdout=stdout_value,
+            duration=duration,
+            phases=phases
+        )
+
+    async def resolve_runnable(module_registry: ModuleRegistry, module: str):
+        # 모듈 + 활성화된 버전 정보 (캐시 hit 이면 DB 조회 없음)
+        module_obj = await module_registry.resolve_module(module)
+        if not module_obj:
+            raise HTTPException(status_code=404, detail="Module not found")
+        if module_obj.version_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="활성화된 버전이 없습니다. 배포/버전 상태를 확인하세요."
             )
+        return module_obj
+
+    @app.post("/run/{module}", response_model=RunResponse)
+    async def run_module(
+        module: str,
+        request: RunRequest = Body(...),
+        executor_manager: ExecutorManager = Depends(get_executor_manager),
+        module_registry: ModuleRegistry = Depends(get_module_registry),
+        tenant: Tenant = Depends(get_tenant)
+    ):
+        lookup_start = time.perf_counter()
+        module_obj = await resolve_runnable(module_registry, module)
+        if module_obj.env == "inline":
+            lookup = time.perf_counter() - lookup_start
+            with tracing.span("execute", attributes={"module": module, "executor": "inline"}):
+                return run_inline_body(module, module_obj, request.input, {"lookup": lookup})
         # 기존 venv/conda/docker 등은 기존 executor_manager 로직 사용
         exec_request = ExecRequest(
             module=module,
-            input_json=request.input
+            input_json=request.input,
+            tenant=tenant
         )
         result = await executor_manager.execute(exec_request)
         return RunResponse(
@@ -424,14 +521,155 @@ def create_app() -> FastAPI:
             exit_code=result.exit_code,
             stderr=result.stderr,
             stdout=result.stdout,
-            duration=result.duration
+            duration=result.duration,
+            phases=result.phases
+        )
+
+    @app.post("/run/{module}/batch", response_model=BatchRunResponse)
+    async def run_module_batch(
+        module: str,
+        request: BatchRunRequest = Body(...),
+        executor_manager: ExecutorManager = Depends(get_executor_manager),
+        module_registry: ModuleRegistry = Depends(get_module_registry),
+        tenant: Tenant = Depends(get_tenant)
+    ):
+        # 인증/모듈 조회는 한 번만 하고 입력들을 워커 풀에 나눠 실행
+        if len(request.inputs) > BATCH_MAX_SIZE:
+            raise HTTPException(status_code=400, detail=f"inputs 는 최대 {BATCH_MAX_SIZE}개까지 가능합니다.")
+        module_obj = await resolve_runnable(module_registry, module)
+
+        async def results():
+            if module_obj.env == "inline":
+                # run_inline_body 는 sys.stdout 을 바꿔 출력을 모으므로 한 번에 하나씩 스레드에서 돌린다.
+                # 다른 환경과 마찬가지로 입력마다 동시 실행 제한/공정 스케줄러 슬롯을 거친다
+                context = ExecContext(module=module_obj)
+                for index, input_data in enumerate(request.inputs):
+                    exec_request = ExecRequest(module=module, input_json=input_data, tenant=tenant)
+                    queued = time.perf_counter()
+                    try:
+                        with tracing.span("execute", attributes={"module": module, "executor": "inline"}):
+                            async with executor_manager._slot(exec_request, context):
+                                phases = {"queue": time.perf_counter() - queued}
+                                response = await asyncio.to_thread(run_inline_body, module, module_obj, input_data, phases)
+                    except AdmissionRejected as e:
+                        response = RunResponse(result={}, exit_code=1, stderr=str(e), stdout="", duration=0.0)
+                    except HTTPException as e:
+                        response = RunResponse(result={}, exit_code=1, stderr=str(e.detail), stdout="", duration=0.0)
+                    yield index, response
+                return
+            async for index, result in executor_manager.iter_batch(module, request.inputs, request.concurrency, tenant=tenant):
+                yield index, RunResponse(
+                    result=result.result_json,
+                    exit_code=result.exit_code,
+                    stderr=result.stderr or "",
+                    stdout=result.stdout or "",
+                    duration=result.duration,
+                    phases=result.phases
+                )
+
+        if request.stream:
+            # 끝나는 순서대로 한 줄씩 (NDJSON) 내보낸다
+            async def ndjson():
+                async for index, response in results():
+                    yield json.dumps({"index": index, **response.model_dump()}) + "\n"
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+        ordered: List[Optional[RunResponse]] = [None] * len(request.inputs)
+        async for index, response in results():
+            ordered[index] = response
+        return BatchRunResponse(results=ordered)
+
+    @app.post("/run/{module}/payload")
+    async def run_module_payload(
+        module: str,
+        raw: Request,
+        input: Optional[str] = None,
+        executor_manager: ExecutorManager = Depends(get_executor_manager),
+        module_registry: ModuleRegistry = Depends(get_module_registry),
+        tenant: Tenant = Depends(get_tenant)
+    ):
+        # 요청 본문(msgpack, Arrow IPC, 이미지 등)을 JSON 변환 없이 Content-Type 과 함께 handler 에 넘긴다.
+        # handler 가 바이너리를 반환하면 그 content type 으로 그대로 응답한다.
+        await resolve_runnable(module_registry, module)
+        try:
+            input_data = json.loads(input) if input else {}
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="input 쿼리는 JSON 이어야 합니다.")
+        exec_request = ExecRequest(
+            module=module,
+            input_json=input_data,
+            payload=await raw.body(),
+            content_type=raw.headers.get("content-type") or "application/octet-stream",
+            tenant=tenant
+        )
+        result = await executor_manager.execute(exec_request)
+        if result.exit_code == 0 and result.content_type:
+            return Response(content=result.payload or b"", media_type=result.content_type)
+        return RunResponse(
+            result=result.result_json,
+            exit_code=result.exit_code,
+            stderr=result.stderr,
+            stdout=result.stdout,
+            duration=result.duration,
+            phases=result.phases
+        )
+
+    @app.post("/jobs", status_code=202)
+    async def submit_job(
+        request: JobSubmitRequest = Body(...),
+        job_queue: JobQueue = Depends(get_job_queue),
+        module_registry: ModuleRegistry = Depends(get_module_registry),
+        tenant: Tenant = Depends(get_tenant)
+    ):
+        # 실행을 기다리지 않고 작업 id 를 바로 돌려준다. 상태/결과는 GET /jobs/{id} 로 조회
+        await resolve_runnable(module_registry, request.module)
+        try:
+            job = job_queue.submit(ExecRequest(
+                module=request.module, input_json=request.input, timeout=request.timeout, tenant=tenant
+            ))
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        return job_body(job)
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+        job = await job_queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job_body(job)
+
+    @app.post("/jobs/{job_id}/cancel")
+    async def cancel_job(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+        job = job_queue.cancel(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job_body(job)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def get_metrics(request: Request):
+        # Prometheus 스크레이프용 텍스트 형식
+        return PlainTextResponse(
+            metrics.render(
+                getattr(request.app.state, "executor_manager", None),
+                getattr(request.app.state, "job_queue", None),
+            ),
+            media_type="text/plain; version=0.0.4",
         )
 
     @app.get("/environments")
     async def list_environments(
         executor_manager: ExecutorManager = Depends(get_executor_manager)
     ):
-        return {"environments": executor_manager.get_available_environments()}
+        return {
+            "environments": executor_manager.get_available_environments(),
+            "details": executor_manager.describe_environments(),
+            "admission": executor_manager.describe_admission(),
+            "scheduler": executor_manager.describe_scheduler(),
+        }
+
+    # 모듈 메타데이터/컴파일 캐시 적중률 확인
+    @app.get("/health/cache")
+    async def cache_stats():
+        return {"module_cache": module_cache.stats(), "code_cache": code_cache.stats()}
 
     # DB 연결 상태 확인 엔드포인트
     @app.get("/health/db")
@@ -523,12 +761,28 @@ def create_app() -> FastAPI:
             module.tags = tags
         await db.commit()
         await db.refresh(module)
+        # 설명/태그만 바뀌므로 메타데이터 캐시만 비운다. 코드 캐시와 워커는 그대로 둔다
+        module_cache.invalidate(name)
         return {"detail": "모듈 정보가 수정되었습니다."}
 
     @app.get("/admin")
     async def admin_only(current_user=Depends(has_role("admin"))):
         return {"message": f"Hello, admin {current_user.username}!"}
 
+    @app.get("/admin/retention")
+    async def get_retention(request: Request, current_user=Depends(has_role("admin"))):
+        retention = getattr(request.app.state, "retention", None)
+        if retention is None:
+            raise HTTPException(status_code=404, detail="보존 정책이 설정되지 않았습니다.")
+        return retention.describe()
+
+    @app.post("/admin/retention/run")
+    async def run_retention(request: Request, current_user=Depends(has_role("admin"))):
+        retention = getattr(request.app.state, "retention", None)
+        if retention is None:
+            raise HTTPException(status_code=404, detail="보존 정책이 설정되지 않았습니다.")
+        return await retention.run_once()
+
     @app.get("/audit/logs", response_model=List[AuditLogRead])
     async def get_audit_logs(db: AsyncSession = Depends(get_db), current_user=Depends(has_role("admin"))):
         result = await db.execute(AuditLog.__table__.select().order_by(AuditLog.created_at.desc()))
@@ -596,7 +850,7 @@ def create_app() -> FastAPI:
             return {"detail": "구조/필수 파일 및 handler 함수 검증 통과, venv 환경 생성 및 의존성 설치, 모듈 정보 갱신 완료"}
 
     @app.post("/api/modules/{module_id}/upload")
-    async def upload_module_for_id(module_id: int, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+    async def upload_module_for_id(module_id: int, http_request: Request, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
         # 1. 모듈 존재 확인
         result = await db.execute(select(Module).where(Module.id == module_id))
         module = result.scalars().first()
@@ -696,9 +950,9 @@ def create_app() -> FastAPI:
                 if not os.path.exists(os.path.join(dst_dir, "venv", "bin", "activate")):
                     venv_dir = os.path.join(dst_dir, "venv")
                     try:
-                        subprocess.run(["python3", "-m", "venv", venv_dir], check=True)
+                        await run_process(["python3", "-m", "venv", venv_dir], check=True)
                         venv_python = os.path.join(venv_dir, "bin", "python")
-                        upgrade_pip(venv_python)
+                        await upgrade_pip(venv_python)
                         log_module_action(module.name, getattr(module, 'version', 'unknown'), "venv", "venv 및 pip 업그레이드 성공")
                     except Exception as e:
                         log_module_action(module.name, getattr(module, 'version', 'unknown'), "venv", f"venv 생성 실패: {str(e)}")
@@ -711,7 +965,7 @@ def create_app() -> FastAPI:
                 if os.path.exists(requirements_path):
                     venv_python = os.path.join(dst_dir, "venv", "bin", "python")
                     try:
-                        install_requirements(venv_python, requirements_path)
+                        await install_requirements(venv_python, requirements_path)
                         log_module_action(module.name, getattr(module, 'version', 'unknown'), "requirements", "requirements.txt 의존성 설치 성공")
                         log = ModuleValidationLog(filename="requirements.txt", status="success", message=f"venv 내 requirements.txt 의존성 설치 성공")
                         db.add(log)
@@ -735,9 +989,9 @@ def create_app() -> FastAPI:
                 if not os.path.exists(dockerfile_path):
                     return JSONResponse(status_code=400, content={"detail": "Dockerfile이 존재하지 않습니다."})
                 try:
-                    proc = subprocess.run([
+                    proc = await run_process([
                         "docker", "build", "-t", docker_tag, src_dir
-                    ], capture_output=True, text=True, check=False)
+                    ])
                     if proc.returncode == 0:
                         log_module_action(module.name, getattr(module, 'version', 'unknown'), "docker", f"docker 이미지 빌드 성공\n{proc.stdout}")
                         log = ModuleValidationLog(filename="Dockerfile", status="success", message=f"docker 이미지 빌드 성공\n{proc.stdout}")
@@ -767,10 +1021,11 @@ def create_app() -> FastAPI:
             db.add(log)
             module.path = zip_path  # 실제 운영시에는 영구 저장소로 이동 필요
             await db.commit()
+            await invalidate_module(http_request, module.name)
             return {"detail": f"구조/필수 파일 및 handler 함수 검증 통과, {env_type} 환경 생성 및 의존성 설치, 모듈 정보 갱신 완료"}
 
     @app.post("/modules/{module_id}/activate")
-    async def activate_module(id: int, db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
+    async def activate_module(id: int, http_request: Request, db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
         result = await db.execute(select(Module).where(Module.id == id))
         module = result.scalars().first()
         if not module:
@@ -799,11 +1054,12 @@ def create_app() -> FastAPI:
             raise HTTPException(status_code=400, detail=f"핸들러 동작 확인 실패: {str(e)}")
         module.status = 'active'
         await db.commit()
+        await invalidate_module(http_request, module.name)
         await log_audit_event(db, action="module_activate", detail=f"Module {module.name} activated", user_id=current_user.id)
         return {"detail": "모듈이 활성화되었습니다."}
 
     @app.post("/modules/{module_id}/deactivate")
-    async def deactivate_module(id: int, db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
+    async def deactivate_module(id: int, http_request: Request, db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
         result = await db.execute(select(Module).where(Module.id == id))
         module = result.scalars().first()
         if not module:
@@ -812,11 +1068,12 @@ def create_app() -> FastAPI:
             raise HTTPException(status_code=400, detail="이미 비활성화된 모듈입니다.")
         module.status = 'inactive'
         await db.commit()
+        await invalidate_module(http_request, module.name)
         await log_audit_event(db, action="module_deactivate", detail=f"Module {module.name} deactivated", user_id=current_user.id)
         return {"detail": "모듈이 비활성화되었습니다."}
 
     @app.delete("/modules/{id}/delete")
-    async def delete_module_api(id: int, db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
+    async def delete_module_api(id: int, http_request: Request, db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
         result = await db.execute(select(Module).where(Module.id == id))
         module = result.scalars().first()
         if not module:
@@ -826,6 +1083,7 @@ def create_app() -> FastAPI:
         module.status = 'deleted'
         await db.commit()
         await log_audit_event(db, action="module_delete", detail=f"Module {module.name} deleted", user_id=current_user.id)
+        await invalidate_module(http_request, module.name)
         # 환경/파일 정리
         # venv 환경 삭제
         if os.path.exists(os.path.join("module_envs", module.name, "venv")):
@@ -835,9 +1093,8 @@ def create_app() -> FastAPI:
                 pass
         # conda 환경 삭제
         if os.path.exists(os.path.join("module_envs", module.name, "conda_env")):
-            import subprocess
             try:
-                subprocess.run(["conda", "remove", "-y", "-p", os.path.join("module_envs", module.name, "conda_env"), "--all"], check=False)
+                await run_process(["conda", "remove", "-y", "-p", os.path.join("module_envs", module.name, "conda_env"), "--all"])
             except Exception:
                 pass
             try:
@@ -849,7 +1106,7 @@ def create_app() -> FastAPI:
         if module.env == "docker":
             try:
                 docker_tag = f"mod_{module.name}:{module.version}"
-                subprocess.run(["docker", "rmi", "-f", docker_tag], check=False)
+                await run_process(["docker", "rmi", "-f", docker_tag])
             except Exception:
                 pass
         # 실행환경 폴더 전체 삭제
@@ -912,6 +1169,7 @@ def create_app() -> FastAPI:
     @app.post("/api/modules/{name}/versions", status_code=201)
     async def upload_module_version(
         name: str,
+        http_request: Request,
         env: str = Form(...),
         version: str = Form("0.1.0"),
         code: str = Form(None),
@@ -988,6 +1246,7 @@ def create_app() -> FastAPI:
                 # Module.version 필드도 갱신
                 module.version = version
                 await db.commit()
+                await invalidate_module(http_request, name)
                 return {"detail": f"새 버전 업로드 완료: {name} v{version}"}
         elif code:
             # 인라인 코드 업로드 (code, description 등 저장)
@@ -1021,12 +1280,13 @@ def create_app() -> FastAPI:
             # Module.version 필드도 갱신
             module.version = version
             await db.commit()
+            await invalidate_module(http_request, name)
             return {"detail": f"인라인 코드 새 버전 업로드 완료: {name} v{version}"}
         else:
             raise HTTPException(status_code=400, detail="파일 또는 코드가 필요합니다.")
 
     @app.post("/api/modules/{name}/rollback")
-    async def rollback_module(name: str, version: str = Body(..., embed=True), db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
+    async def rollback_module(name: str, http_request: Request, version: str = Body(..., embed=True), db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
         # 롤백: 해당 모듈의 지정 버전을 활성화, 나머지는 비활성화
         result = await db.execute(select(Module).where(Module.name == name))
         module = result.scalars().first()
@@ -1062,10 +1322,11 @@ def create_app() -> FastAPI:
         history = ModuleHistory(module_id=module.id, version_id=version_obj.id, action="rollback", operator=current_user.username)
         db.add(history)
         await db.commit()
+        await invalidate_module(http_request, name)
         return {"detail": f"롤백 완료: {name} v{version}"}
 
     @app.post("/api/modules/{name}/activate")
-    async def activate_module_version(name: str, version: str = Body(..., embed=True), db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
+    async def activate_module_version(name: str, http_request: Request, version: str = Body(..., embed=True), db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
         result = await db.execute(select(Module).where(Module.name == name))
         module = result.scalars().first()
         if not module:
@@ -1105,10 +1366,11 @@ def create_app() -> FastAPI:
         history = ModuleHistory(module_id=module.id, version_id=version_obj.id, action="activate", operator=current_user.username)
         db.add(history)
         await db.commit()
+        await invalidate_module(http_request, name)
         return {"detail": f"활성화 완료: {name} v{version}"}
 
     @app.post("/api/modules/{name}/deactivate")
-    async def deactivate_module_version(name: str, version: str = Body(..., embed=True), db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
+    async def deactivate_module_version(name: str, http_request: Request, version: str = Body(..., embed=True), db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_user)):
         result = await db.execute(select(Module).where(Module.name == name))
         module = result.scalars().first()
         if not module:
@@ -1134,6 +1396,7 @@ def create_app() -> FastAPI:
         history = ModuleHistory(module_id=module.id, version_id=version_obj.id, action="deactivate", operator=current_user.username)
         db.add(history)
         await db.commit()
+        await invalidate_module(http_request, name)
         return {"detail": f"비활성화 완료: {name} v{version}"}
 
     @app.get("/api/modules/{name}/history", response_model=List[ModuleHistoryRead])
@@ -1145,8 +1408,54 @@ def create_app() -> FastAPI:
         history_result = await db.execute(select(ModuleHistory).where(ModuleHistory.module_id == module.id).order_by(ModuleHistory.timestamp.desc()))
         return history_result.scalars().all()
 
+    @app.get("/api/modules/{name}/stats")
+    async def get_module_execution_stats(name: str, history: ExecutionHistory = Depends(get_execution_history)):
+        # 실행 행을 훑지 않고 롤업 테이블에서 읽는다
+        return await asyncio.to_thread(history.get_module_stats, name)
+
+    @app.get("/api/modules/{name}/stats/timeseries")
+    async def get_module_execution_timeseries(
+        name: str,
+        granularity: str = "hour",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 1000,
+        history: ExecutionHistory = Depends(get_execution_history)
+    ):
+        try:
+            buckets = await asyncio.to_thread(history.get_module_timeseries, name, granularity, since, until, min(limit, 10000))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"module": name, "granularity": granularity, "buckets": buckets}
+
+    def error_log_filters(code, user, from_, to) -> list:
+        filters = []
+        if code:
+            filters.append(ErrorLog.code == code)
+        if user:
+            filters.append(ErrorLog.user == user)
+        if from_:
+            filters.append(ErrorLog.created_at >= from_)
+        if to:
+            filters.append(ErrorLog.created_at <= to)
+        return filters
+
+    def error_log_after(cursor: str, dialect: str):
+        # 최신순 (created_at DESC, id DESC) 에서 cursor 다음 행들.
+        # cursor 에는 DB 에 저장된 created_at 문자열을 그대로 담는다. sqlite 는 server_default 로 쓴 행("YYYY-MM-DD HH:MM:SS")과
+        # 값을 넣어 쓴 행(".ffffff" 포함)의 형식이 달라 datetime 으로 바인딩하면 문자열 비교가 어긋나므로 저장된 그대로 비교한다
+        try:
+            created_at, last_id = decode_cursor(cursor)
+            if dialect != "sqlite":
+                created_at = datetime.fromisoformat(created_at)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        column = type_coerce(ErrorLog.created_at, String) if dialect == "sqlite" else ErrorLog.created_at
+        return or_(column < created_at, and_(column == created_at, ErrorLog.id < last_id))
+
     @app.get("/api/logs/errors", response_model=list[ErrorLogRead])
     async def get_error_logs(
+        response: Response,
         code: str = None,
         user: str = None,
         from_: str = None,
@@ -1154,26 +1463,31 @@ def create_app() -> FastAPI:
         keyword: str = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        sort: str = "recent",
         db: AsyncSession = Depends(get_db)
     ):
-        from models.error_log import ErrorLog
-        filters = []
-        if code:
-            filters.append(ErrorLog.code == code)
-        if user:
-            filters.append(ErrorLog.user == user)
-        if from_:
-            filters.append(ErrorLog.created_at >= from_)
-        if to:
-            filters.append(ErrorLog.created_at <= to)
+        # 다음 페이지는 X-Next-Cursor 헤더의 값을 cursor 로 넘긴다 (offset 은 cursor 가 없을 때만 쓴다).
+        # sort=relevance 는 keyword 관련도 순이라 키셋 대신 offset 으로 넘긴다
+        if sort not in ("recent", "relevance"):
+            raise HTTPException(status_code=400, detail="sort 는 recent 또는 relevance 이어야 합니다.")
+        ranked = sort == "relevance" and bool(keyword)
+        if ranked and cursor:
+            raise HTTPException(status_code=400, detail="관련도 순 정렬에서는 cursor 대신 offset 을 사용하세요.")
+        filters = error_log_filters(code, user, from_, to)
+        if cursor:
+            filters.append(error_log_after(cursor, db.bind.dialect.name))
+            offset = 0
+        # 다음 cursor 용으로 저장된 created_at 문자열도 함께 읽는다
+        q = select(ErrorLog, cast(ErrorLog.created_at, String).label("created_at_raw"))
+        q = q.where(and_(*filters)) if filters else q
         if keyword:
-            kw = f"%{keyword}%"
-            filters.append(or_(ErrorLog.message.like(kw), ErrorLog.dev_message.like(kw), ErrorLog.stack.like(kw)))
-        q = select(ErrorLog).where(and_(*filters)) if filters else select(ErrorLog)
-        q = q.order_by(ErrorLog.created_at.desc()).offset(offset).limit(limit)
-        result = await db.execute(q)
-        logs = result.scalars().all()
-        return logs
+            q = await apply_keyword(db, q, keyword, ranked=ranked)
+        q = q.order_by(ErrorLog.created_at.desc(), ErrorLog.id.desc()).offset(offset).limit(limit)
+        rows = (await db.execute(q)).all()
+        if rows and len(rows) == limit and not ranked:
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at_raw, rows[-1][0].id)
+        return [row[0] for row in rows]
 
     @app.get("/api/logs/errors/download")
     async def download_error_logs(
@@ -1182,35 +1496,38 @@ def create_app() -> FastAPI:
         from_: str = None,
         to: str = None,
         keyword: str = None,
+        format: str = "csv",
         db: AsyncSession = Depends(get_db)
     ):
-        from models.error_log import ErrorLog
-        filters = []
-        if code:
-            filters.append(ErrorLog.code == code)
-        if user:
-            filters.append(ErrorLog.user == user)
-        if from_:
-            filters.append(ErrorLog.created_at >= from_)
-        if to:
-            filters.append(ErrorLog.created_at <= to)
-        if keyword:
-            kw = f"%{keyword}%"
-            filters.append(or_(ErrorLog.message.like(kw), ErrorLog.dev_message.like(kw), ErrorLog.stack.like(kw)))
+        if format not in ("csv", "jsonl"):
+            raise HTTPException(status_code=400, detail="format 은 csv 또는 jsonl 이어야 합니다.")
+        filters = error_log_filters(code, user, from_, to)
         q = select(ErrorLog).where(and_(*filters)) if filters else select(ErrorLog)
-        q = q.order_by(ErrorLog.created_at.desc())
-        result = await db.execute(q)
-        logs = result.scalars().all()
-        # CSV 변환
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["id", "code", "message", "dev_message", "url", "stack", "user", "created_at"])
-        for l in logs:
-            writer.writerow([
-                l.id, l.code, l.message, l.dev_message, l.url, l.stack, l.user, l.created_at
-            ])
-        output.seek(0)
-        return StreamingResponse(output, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=error_logs.csv"})
+        if keyword:
+            q = await apply_keyword(db, q, keyword)
+        q = q.order_by(ErrorLog.created_at.desc(), ErrorLog.id.desc()).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        columns = ["id", "code", "message", "dev_message", "url", "stack", "user", "created_at"]
+
+        async def rows():
+            # 전체를 메모리에 올리지 않고 EXPORT_CHUNK_SIZE 행씩 읽어 바로 내보낸다
+            if format == "csv":
+                output = StringIO()
+                csv.writer(output).writerow(columns)
+                yield output.getvalue()
+            result = await db.stream_scalars(q)
+            async for chunk in result.partitions():
+                output = StringIO()
+                writer = csv.writer(output)
+                for l in chunk:
+                    values = [getattr(l, column) for column in columns]
+                    if format == "csv":
+                        writer.writerow(values)
+                    else:
+                        output.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False, default=str) + "\n")
+                yield output.getvalue()
+
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(rows(), media_type=media_type, headers={"Content-Disposition": f"attachment; filename=error_logs.{format}"})
 
     @app.get("/api/templates/module")
     async def download_module_template():
@@ -1221,7 +1538,7 @@ def create_app() -> FastAPI:
         )
 
     @app.post("/api/modules/{name}/deploy")
-    async def deploy_module(name: str, db: AsyncSession = Depends(get_db)):
+    async def deploy_module(name: str, http_request: Request, db: AsyncSession = Depends(get_db)):
         # 1. 모듈 정보 조회
         result = await db.execute(select(Module).where(Module.name == name))
         module = result.scalars().first()
@@ -1235,7 +1552,7 @@ def create_app() -> FastAPI:
             if os.path.exists(src_dir):
                 shutil.rmtree(src_dir)
             try:
-                subprocess.run(["git", "clone", module.artifact_uri, src_dir], check=True)
+                await run_process(["git", "clone", module.artifact_uri, src_dir], check=True)
             except Exception as e:
                 log_module_action(module.name, getattr(module, 'version', 'unknown'), "git", f"git clone 실패: {str(e)}")
                 return JSONResponse(status_code=500, content={"detail": f"git clone 실패: {str(e)}"})
@@ -1269,13 +1586,14 @@ def create_app() -> FastAPI:
             venv_dir = os.path.join(dst_dir, "venv")
             if not os.path.exists(os.path.join(venv_dir, "bin", "activate")):
                 try:
-                    subprocess.run(["python3", "-m", "venv", venv_dir], check=True)
+                    await run_process(["python3", "-m", "venv", venv_dir], check=True)
                     venv_python = os.path.join(venv_dir, "bin", "python")
-                    upgrade_pip(venv_python)
+                    await upgrade_pip(venv_python)
                     log_module_action(module.name, getattr(module, 'version', 'unknown'), "venv", "venv 및 pip 업그레이드 성공")
                 except Exception as e:
                     log_module_action(module.name, getattr(module, 'version', 'unknown'), "venv", f"venv 생성 실패: {str(e)}")
                     return JSONResponse(status_code=500, content={"detail": f"venv 생성 실패: {str(e)}"})
+                await invalidate_module(http_request, module.name)
                 return {"detail": f"git clone 및 venv 환경 생성/의존성 설치 완료"}
         # --- 기존 venv zip 업로드 방식 ---
         if module.env != "venv":
@@ -1322,9 +1640,9 @@ def create_app() -> FastAPI:
         if not os.path.exists(os.path.join(dst_dir, "venv", "bin", "activate")):
             venv_dir = os.path.join(dst_dir, "venv")
             try:
-                subprocess.run(["python3", "-m", "venv", venv_dir], check=True)
+                await run_process(["python3", "-m", "venv", venv_dir], check=True)
                 venv_python = os.path.join(venv_dir, "bin", "python")
-                upgrade_pip(venv_python)
+                await upgrade_pip(venv_python)
                 log_module_action(module.name, getattr(module, 'version', 'unknown'), "venv", "venv 및 pip 업그레이드 성공")
             except Exception as e:
                 log_module_action(module.name, getattr(module, 'version', 'unknown'), "venv", f"venv 생성 실패: {str(e)}")
@@ -1337,15 +1655,18 @@ def create_app() -> FastAPI:
         if os.path.exists(requirements_path):
             venv_python = os.path.join(dst_dir, "venv", "bin", "python")
             try:
-                install_requirements(venv_python, requirements_path)
+                await install_requirements(venv_python, requirements_path)
                 log_module_action(module.name, getattr(module, 'version', 'unknown'), "requirements", "requirements.txt 의존성 설치 성공")
             except Exception as e:
                 log_module_action(module.name, getattr(module, 'version', 'unknown'), "requirements", f"requirements.txt 설치 중 예외: {str(e)}")
                 return JSONResponse(status_code=500, content={"detail": f"venv 내 requirements.txt 설치 중 예외: {str(e)}"})
+            await invalidate_module(http_request, module.name)
             return {"detail": f"소스 복사 및 venv 환경 생성/의존성 설치 완료"}
+        await invalidate_module(http_request, module.name)
 
     @app.delete("/api/modules/{name}/deploy")
-    async def undeploy_module(name: str):
+    async def undeploy_module(name: str, http_request: Request):
+        await invalidate_module(http_request, name)
         module_env_dir = os.path.abspath(os.path.join("module_envs", name))
         venv_dir = os.path.join(module_env_dir, "venv")
         conda_env_dir = os.path.join(module_env_dir, "conda_env")
@@ -1357,9 +1678,8 @@ def create_app() -> FastAPI:
                 pass
         # conda 환경 삭제
         if os.path.exists(conda_env_dir):
-            import subprocess
             try:
-                subprocess.run(["conda", "remove", "-y", "-p", conda_env_dir, "--all"], check=False)
+                await run_process(["conda", "remove", "-y", "-p", conda_env_dir, "--all"])
             except Exception:
                 pass
             try:
@@ -1375,6 +1695,15 @@ def create_app() -> FastAPI:
                 pass
         return {"success": True, "log": "전개 환경이 제거되었습니다."}
 
+    @app.exception_handler(AdmissionRejected)
+    async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+        # 모듈/환경 동시 실행 제한 초과: 기다리게 하지 않고 바로 돌려보낸다
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(max(1, int(exc.retry_after)))}
+        )
+
     @app.exception_handler(CustomException)
     async def custom_exception_handler(request: Request, exc: CustomException):
         logger.error(f"[{exc.code}] {exc.dev_message} | {request.url}")
@@ -1409,19 +1738,24 @@ def create_app() -> FastAPI:
 
     return app
 
-def upgrade_pip(venv_python):
+# pip 설치가 멈춘 경우 프로세스 그룹째 정리하기 위한 상한(초)
+PIP_TIMEOUT = 1800
+# 오류 로그 내보내기에서 한 번에 읽어 내보내는 행 수
+EXPORT_CHUNK_SIZE = 1000
+
+async def upgrade_pip(venv_python):
     env = os.environ.copy()
     env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
-    subprocess.run([
+    await run_process([
         venv_python, "-m", "pip", "install", "--upgrade", "pip"
-    ], check=True, env=env)
+    ], check=True, env=env, timeout=PIP_TIMEOUT)
 
-def install_requirements(venv_python, requirements_path):
+async def install_requirements(venv_python, requirements_path):
     env = os.environ.copy()
     env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
-    subprocess.run([
+    await run_process([
         venv_python, "-m", "pip", "install", "-r", requirements_path
-    ], check=True, env=env)
+    ], check=True, env=env, timeout=PIP_TIMEOUT)
 
 def log_module_action(module_name, version, action, message):
     logging.info(f"[{module_name}][v{version}][{action}] {message}")
@@ -1,18 +1,186 @@
 import os
+import gzip
+import hashlib
 import json
+import logging
+import math
+import queue
 import sqlite3
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple
 from models import ExecResult
+from utils.pagination import decode_cursor, encode_cursor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 큐가 가득 찼을 때: block 은 자리가 날 때까지 기다리고, drop 은 기록을 버린다
+OVERFLOW_POLICIES = ("block", "drop")
+_FLUSH = object()
+_STOP = object()
+
+# 롤업 단위 -> 버킷 키로 쓰는 ISO 타임스탬프 앞부분 길이 ("2024-05-01T12:34", "2024-05-01T12", "2024-05-01")
+ROLLUP_GRANULARITIES = {"minute": 16, "hour": 13, "day": 10}
+# 지연 시간 분위수 스케치: 폭이 SKETCH_GAMMA 배씩 커지는 로그 구간별 개수 (DDSketch 방식, 상대 오차 약 2%)
+SKETCH_GAMMA = 1.04
+SKETCH_MIN_DURATION = 1e-6
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+
+def sketch_bin(duration: float) -> int:
+    return math.ceil(math.log(max(duration, SKETCH_MIN_DURATION)) / _LOG_GAMMA)
+
+def sketch_percentiles(bins: Dict[int, int], low: float, high: float, quantiles=(0.5, 0.95, 0.99)) -> Dict[str, Optional[float]]:
+    """구간별 개수에서 분위수를 추정한다. 추정값은 실제 최소/최대값 범위로 자른다."""
+    total = sum(bins.values())
+    result = {}
+    for q in quantiles:
+        value = None
+        if total:
+            rank, seen = q * (total - 1), 0
+            for b in sorted(bins):
+                seen += bins[b]
+                if seen > rank:
+                    value = min(max(2 * SKETCH_GAMMA ** b / (SKETCH_GAMMA + 1), low), high)
+                    break
+        result[f"p{round(q * 100)}"] = value
+    return result
+
+# 행 밖(execution_blobs)에 둘 수 있는 컬럼
+BLOB_FIELDS = ("input_json", "result_json", "stdout", "stderr")
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """zstandard 가 있으면 zstd, 없으면 gzip 으로 압축해 (codec, 압축 데이터) 를 돌려준다."""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    return "gzip", gzip.compress(data, compresslevel=6)
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed execution payloads")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+def truncate_output(text: Optional[str], limit: int) -> Optional[str]:
+    """limit 자를 넘는 출력은 앞/뒤 절반씩만 남긴다."""
+    if text is None or len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}\n...[truncated {len(text) - 2 * half} characters]...\n{text[-half:]}"
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _update_rollups(conn: sqlite3.Connection, records) -> None:
+    """레코드를 모듈/단위/버킷별로 모아 롤업과 스케치에 더한다 (호출한 쪽 트랜잭션 안에서)."""
+    rollups: Dict[tuple, list] = {}
+    sketches: Dict[tuple, int] = {}
+    for r in records:
+        duration, failed = r["duration"], 1 if r["exit_code"] != 0 else 0
+        b = sketch_bin(duration)
+        for granularity, width in ROLLUP_GRANULARITIES.items():
+            key = (r["module_name"], granularity, r["timestamp"][:width])
+            agg = rollups.get(key)
+            if agg is None:
+                rollups[key] = [1, duration, duration, duration, failed]
+            else:
+                agg[0] += 1
+                agg[1] += duration
+                agg[2] = min(agg[2], duration)
+                agg[3] = max(agg[3], duration)
+                agg[4] += failed
+            sketches[key + (b,)] = sketches.get(key + (b,), 0) + 1
+    conn.executemany("""
+    INSERT INTO execution_rollups
+    (module_name, granularity, bucket, count, duration_sum, duration_min, duration_max, error_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (module_name, granularity, bucket) DO UPDATE SET
+        count = count + excluded.count,
+        duration_sum = duration_sum + excluded.duration_sum,
+        duration_min = MIN(duration_min, excluded.duration_min),
+        duration_max = MAX(duration_max, excluded.duration_max),
+        error_count = error_count + excluded.error_count
+    """, [key + tuple(agg) for key, agg in rollups.items()])
+    conn.executemany("""
+    INSERT INTO execution_rollup_sketches (module_name, granularity, bucket, bin, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (module_name, granularity, bucket, bin) DO UPDATE SET count = count + excluded.count
+    """, [key + (count,) for key, count in sketches.items()])
 
 class ExecutionHistory:
-    def __init__(self, db_path="./executions.db"):
+    """실행 이력 저장소 (SQLite, WAL).
+
+    record_execution 은 id 를 먼저 매겨 레코드를 메모리 큐에 넣고 바로 돌아온다. 백그라운드 writer 스레드가
+    batch_size 개 또는 flush_interval 초 동안 모인 레코드를 한 트랜잭션으로 쓴다. 큐가 max_pending 에 닿으면
+    overflow 정책(block/drop)을 따른다. 아직 쓰지 않은 레코드도 get_execution/get_execution_by_job 으로 보이고,
+    목록/통계 조회는 먼저 flush 한다. 읽기는 read_pool_size 개의 연결을 돌려 쓴다.
+
+    통계는 실행 행을 훑지 않고, 기록할 때 같은 트랜잭션에서 갱신하는 모듈별 분/시/일 롤업
+    (개수, 합계, 최소/최대, 오류 수, 지연 시간 스케치)에서 읽는다.
+
+    inline_threshold 자를 넘는 입력/결과/출력은 압축해 내용 해시로 execution_blobs 에 한 번만 저장하고
+    (참조 수 관리), 행에는 참조(blob_refs)와 출력 앞부분(preview_size 자)만 남긴다. stdout/stderr 는
+    max_output_size 자를 넘으면 앞/뒤만 남기고 자른다.
+
+    id 를 프로세스 안에서 매기므로 한 DB 파일에는 한 프로세스만 기록해야 한다.
+    """
+
+    def __init__(
+        self,
+        db_path="./executions.db",
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        max_pending: int = 10000,
+        overflow: str = "block",
+        read_pool_size: int = 4,
+        inline_threshold: int = 4096,
+        preview_size: int = 512,
+        max_output_size: int = 4 * 1024 * 1024,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.inline_threshold = inline_threshold
+        self.preview_size = preview_size
+        self.max_output_size = max_output_size
+        self.dropped = 0
+        self.write_errors = 0
+        # 아직 쓰지 않은 레코드 (id -> 조회 결과와 같은 형태)
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._readers: queue.Queue = queue.Queue(maxsize=read_pool_size)
         self._init_db()
+        self._writer = threading.Thread(target=self._writer_loop, name="execution-history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 읽기 연결은 asyncio.to_thread 의 여러 스레드에서 돌려 쓴다
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
 
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
+        # WAL: writer 의 트랜잭션이 읽기를 막지 않는다. 설정은 DB 파일에 남는다
+        # 새 DB 는 지운 페이지를 reclaim() 에서 조금씩 돌려줄 수 있게 (기존 DB 에는 VACUUM 전까지 적용되지 않음)
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode = WAL")
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS executions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -23,102 +191,445 @@ class ExecutionHistory:
             input_json TEXT NOT NULL,
             result_json TEXT NOT NULL,
             stdout TEXT,
-            stderr TEXT
+            stderr TEXT,
+            job_id TEXT
         )
         """)
-        conn.commit()
-        conn.close()
-
-    def record_execution(self, module_name: str, input_json: Dict[str, Any], result: ExecResult) -> int:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        timestamp = datetime.now().isoformat()
+        # job_id 컬럼이 없던 기존 DB 업그레이드
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(executions)")]
+        if "job_id" not in columns:
+            cursor.execute("ALTER TABLE executions ADD COLUMN job_id TEXT")
+        # 행 밖에 둔 컬럼 -> execution_blobs.hash (JSON)
+        if "blob_refs" not in columns:
+            cursor.execute("ALTER TABLE executions ADD COLUMN blob_refs TEXT")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS execution_blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            refcount INTEGER NOT NULL
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_executions_job_id ON executions (job_id)")
+        # 모듈별/전체 최신순 목록
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_executions_module_timestamp ON executions (module_name, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_executions_timestamp ON executions (timestamp)")
+        has_rollups = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'execution_rollups'"
+        ).fetchone() is not None
         cursor.execute("""
-        INSERT INTO executions 
-        (module_name, timestamp, duration, exit_code, input_json, result_json, stdout, stderr)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            module_name,
-            timestamp,
-            result.duration,
-            result.exit_code,
-            json.dumps(input_json),
-            json.dumps(result.result_json),
-            result.stdout,
-            result.stderr
-        ))
-        execution_id = cursor.lastrowid
+        CREATE TABLE IF NOT EXISTS execution_rollups (
+            module_name TEXT NOT NULL,
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            duration_sum REAL NOT NULL,
+            duration_min REAL NOT NULL,
+            duration_max REAL NOT NULL,
+            error_count INTEGER NOT NULL,
+            PRIMARY KEY (module_name, granularity, bucket)
+        ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS execution_rollup_sketches (
+            module_name TEXT NOT NULL,
+            granularity TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            bin INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (module_name, granularity, bucket, bin)
+        ) WITHOUT ROWID
+        """)
         conn.commit()
+        if not has_rollups:
+            # 롤업 테이블이 없던 DB 는 기존 실행 기록으로 한 번 채운다
+            rows = conn.execute("SELECT module_name, timestamp, duration, exit_code FROM executions")
+            with conn:
+                while True:
+                    chunk = rows.fetchmany(10000)
+                    if not chunk:
+                        break
+                    _update_rollups(conn, chunk)
+        # AUTOINCREMENT 와 같이 지운 id 도 다시 쓰지 않는다
+        last_id = cursor.execute("SELECT MAX(id) FROM executions").fetchone()[0] or 0
+        seq = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'executions'").fetchone()
+        self._next_id = max(last_id, seq[0] if seq else 0) + 1
         conn.close()
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def record_execution(self, module_name: str, input_json: Dict[str, Any], result: ExecResult, job_id: Optional[str] = None) -> int:
+        """레코드를 쓰기 큐에 넣고 id 를 돌려준다. overflow="drop" 으로 버려진 경우에도 id 는 매겨진다."""
+        with self._lock:
+            execution_id = self._next_id
+            self._next_id += 1
+            record = {
+                "id": execution_id,
+                "module_name": module_name,
+                "timestamp": datetime.now().isoformat(),
+                "duration": result.duration,
+                "exit_code": result.exit_code,
+                "input_json": input_json,
+                "result_json": result.result_json,
+                "stdout": truncate_output(result.stdout, self.max_output_size),
+                "stderr": truncate_output(result.stderr, self.max_output_size),
+                "job_id": job_id
+            }
+            self._pending[execution_id] = record
+        try:
+            if self.overflow == "block":
+                self._queue.put(record)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._pending.pop(execution_id, None)
+            self.dropped += 1
+            logging.warning(f"execution history queue is full, dropped record for '{module_name}'")
         return execution_id
 
-    def get_execution(self, execution_id: int) -> Optional[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM executions WHERE id = ?", (execution_id,))
-        row = cursor.fetchone()
-        conn.close()
-        if not row:
-            return None
+    def _writer_loop(self) -> None:
+        conn = self._connect()
+        # WAL 에서는 NORMAL 이어도 DB 가 깨지지 않고, 커밋마다 fsync 하지 않는다
+        conn.execute("PRAGMA synchronous = NORMAL")
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # 첫 레코드 이후 flush_interval 동안 더 모아서 한 번에 쓴다
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size and batch[-1] is not _FLUSH and batch[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                records = [item for item in batch if item is not _FLUSH and item is not _STOP]
+                if records:
+                    self._write(conn, records)
+                for _ in batch:
+                    self._queue.task_done()
+                if batch[-1] is _STOP:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        try:
+            self._insert(conn, records)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            if len(records) == 1:
+                self.write_errors += 1
+                logging.warning(f"failed to write execution record {records[0]['id']}: {e}")
+            else:
+                # 문제가 된 레코드만 빠지도록 하나씩 다시 쓴다
+                for record in records:
+                    self._write(conn, [record])
+        finally:
+            with self._lock:
+                for r in records:
+                    self._pending.pop(r["id"], None)
+
+    def _insert(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        rows = []
+        blobs: Dict[str, bytes] = {}
+        refcounts: Dict[str, int] = {}
+        for r in records:
+            values = {
+                "input_json": json.dumps(r["input_json"]),
+                "result_json": json.dumps(r["result_json"]),
+                "stdout": r["stdout"],
+                "stderr": r["stderr"],
+            }
+            refs = {}
+            for field in BLOB_FIELDS:
+                text = values[field]
+                if text is None or len(text) <= self.inline_threshold:
+                    continue
+                data = text.encode("utf-8")
+                digest = hashlib.sha256(data).hexdigest()
+                blobs[digest] = data
+                refcounts[digest] = refcounts.get(digest, 0) + 1
+                refs[field] = digest
+                # JSON 컬럼은 비워 두고, 출력은 목록/미리보기용으로 앞부분만 남긴다
+                values[field] = "" if field.endswith("_json") else text[:self.preview_size]
+            rows.append((
+                r["id"],
+                r["module_name"],
+                r["timestamp"],
+                r["duration"],
+                r["exit_code"],
+                values["input_json"],
+                values["result_json"],
+                values["stdout"],
+                values["stderr"],
+                r["job_id"],
+                json.dumps(refs) if refs else None
+            ))
+        with conn:
+            if blobs:
+                # 쓰기 잠금을 먼저 잡아 조회와 참조 수 갱신 사이에 prune 이 blob 을 지우지 못하게 한다
+                conn.execute("BEGIN IMMEDIATE")
+                placeholders = ",".join("?" * len(blobs))
+                existing = {h for (h,) in conn.execute(f"SELECT hash FROM execution_blobs WHERE hash IN ({placeholders})", list(blobs))}
+                new_blobs = []
+                for digest, data in blobs.items():
+                    if digest not in existing:
+                        # 이미 있는 내용은 다시 압축하지 않고 참조 수만 늘린다
+                        codec, compressed = compress(data)
+                        new_blobs.append((digest, codec, len(data), compressed, 0))
+                conn.executemany("INSERT INTO execution_blobs (hash, codec, size, data, refcount) VALUES (?, ?, ?, ?, ?)", new_blobs)
+                conn.executemany("UPDATE execution_blobs SET refcount = refcount + ? WHERE hash = ?",
+                                 [(count, digest) for digest, count in refcounts.items()])
+            conn.executemany("""
+            INSERT INTO executions
+            (id, module_name, timestamp, duration, exit_code, input_json, result_json, stdout, stderr, job_id, blob_refs)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            _update_rollups(conn, records)
+
+    def flush(self) -> None:
+        """큐에 있는 레코드를 모두 쓸 때까지 기다린다."""
+        if self._writer.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self) -> None:
+        """남은 레코드를 쓰고 writer 스레드와 읽기 연결을 정리한다."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": self._queue.qsize(), "dropped": self.dropped, "write_errors": self.write_errors}
+
+    def get_execution(self, execution_id: int, include_payloads: bool = True) -> Optional[Dict[str, Any]]:
+        """include_payloads=False 면 행 밖에 둔 값은 읽지 않는다 (JSON 은 None, 출력은 앞부분).
+        그런 컬럼 이름은 "offloaded" 에 담기고 get_execution_payload 로 따로 읽을 수 있다."""
+        with self._lock:
+            record = self._pending.get(execution_id)
+        if record is not None:
+            return dict(record, offloaded=[])
+        return self._get_one("SELECT * FROM executions WHERE id = ?", (execution_id,), include_payloads)
+
+    def get_execution_by_job(self, job_id: str, include_payloads: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = next((r for r in reversed(list(self._pending.values())) if r["job_id"] == job_id), None)
+        if record is not None:
+            return dict(record, offloaded=[])
+        return self._get_one("SELECT * FROM executions WHERE job_id = ? ORDER BY id DESC LIMIT 1", (job_id,), include_payloads)
+
+    def get_execution_payload(self, execution_id: int, field: str) -> Any:
+        """입력/결과/출력 하나만 읽는다 (행 밖에 있으면 풀어서). 실행이 없으면 KeyError."""
+        if field not in BLOB_FIELDS:
+            raise ValueError(f"field must be one of {BLOB_FIELDS}, got {field!r}")
+        row = self.get_execution(execution_id, include_payloads=False)
+        if row is None:
+            raise KeyError(execution_id)
+        if field not in row["offloaded"]:
+            return row[field]
+        with self._reader() as conn:
+            refs = json.loads(conn.execute("SELECT blob_refs FROM executions WHERE id = ?", (execution_id,)).fetchone()[0])
+            text = self._load_blob(conn, refs[field])
+        return json.loads(text) if field.endswith("_json") else text
+
+    @staticmethod
+    def _load_blob(conn: sqlite3.Connection, digest: str) -> str:
+        codec, data = conn.execute("SELECT codec, data FROM execution_blobs WHERE hash = ?", (digest,)).fetchone()
+        return decompress(codec, data).decode("utf-8")
+
+    def _get_one(self, query: str, params, include_payloads: bool = True) -> Optional[Dict[str, Any]]:
+        with self._reader() as conn:
+            row = conn.execute(query, params).fetchone()
+            if not row:
+                return None
+            return self._row_dict(conn, row, include_payloads)
+
+    def _row_dict(self, conn: sqlite3.Connection, row: sqlite3.Row, include_payloads: bool = True) -> Dict[str, Any]:
+        values = {field: row[field] for field in BLOB_FIELDS}
+        refs = json.loads(row["blob_refs"]) if row["blob_refs"] else {}
+        if include_payloads:
+            for field, digest in refs.items():
+                values[field] = self._load_blob(conn, digest)
+        for field in ("input_json", "result_json"):
+            values[field] = None if field in refs and not include_payloads else json.loads(values[field])
         return {
             "id": row["id"],
             "module_name": row["module_name"],
             "timestamp": row["timestamp"],
             "duration": row["duration"],
             "exit_code": row["exit_code"],
-            "input_json": json.loads(row["input_json"]),
-            "result_json": json.loads(row["result_json"]),
-            "stdout": row["stdout"],
-            "stderr": row["stderr"]
+            "input_json": values["input_json"],
+            "result_json": values["result_json"],
+            "stdout": values["stdout"],
+            "stderr": values["stderr"],
+            "job_id": row["job_id"],
+            "offloaded": [] if include_payloads else list(refs)
         }
 
-    def list_executions(self, module_name: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def prune(
+        self,
+        max_age_days: Optional[float] = None,
+        max_rows: Optional[int] = None,
+        keep_last_per_module: Optional[int] = None,
+        batch_size: int = 1000,
+        archive: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ) -> int:
+        """보존 조건을 넘는 실행 기록을 batch_size 개씩 지우고 지운 수를 돌려준다.
+
+        조건은 각각 따로 적용된다: max_age_days 보다 오래된 기록, 최신 max_rows 개 밖의 기록,
+        모듈별 최신 keep_last_per_module 개 밖의 기록. archive 를 주면 지우기 전에 배치마다 전체 레코드
+        (행 밖 값 포함) 목록으로 호출한다. 참조가 없어진 blob 도 함께 지운다. 롤업은 그대로 남는다.
+        """
+        self.flush()
+        conn = self._connect()
+        try:
+            conditions = []
+            if max_age_days is not None:
+                conditions.append(("timestamp < ?", ((datetime.now() - timedelta(days=max_age_days)).isoformat(),)))
+            if max_rows is not None:
+                row = conn.execute("SELECT id FROM executions ORDER BY id DESC LIMIT 1 OFFSET ?", (max_rows,)).fetchone()
+                if row:
+                    conditions.append(("id <= ?", (row[0],)))
+            if keep_last_per_module is not None:
+                for (module_name,) in conn.execute("SELECT DISTINCT module_name FROM executions").fetchall():
+                    row = conn.execute(
+                        "SELECT id FROM executions WHERE module_name = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                        (module_name, keep_last_per_module)
+                    ).fetchone()
+                    if row:
+                        conditions.append(("module_name = ? AND id <= ?", (module_name, row[0])))
+            columns = "*" if archive is not None else "id, blob_refs"
+            deleted = 0
+            for where, params in conditions:
+                while True:
+                    rows = conn.execute(f"SELECT {columns} FROM executions WHERE {where} ORDER BY id LIMIT ?", (*params, batch_size)).fetchall()
+                    if not rows:
+                        break
+                    if archive is not None:
+                        archive([self._row_dict(conn, row) for row in rows])
+                    self._delete_rows(conn, rows)
+                    deleted += len(rows)
+            return deleted
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _delete_rows(conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> None:
+        refcounts: Dict[str, int] = {}
+        for row in rows:
+            for digest in (json.loads(row["blob_refs"]) if row["blob_refs"] else {}).values():
+                refcounts[digest] = refcounts.get(digest, 0) + 1
+        with conn:
+            if refcounts:
+                conn.executemany("UPDATE execution_blobs SET refcount = refcount - ? WHERE hash = ?",
+                                 [(count, digest) for digest, count in refcounts.items()])
+                conn.execute(f"DELETE FROM execution_blobs WHERE refcount <= 0 AND hash IN ({','.join('?' * len(refcounts))})", list(refcounts))
+            conn.execute(f"DELETE FROM executions WHERE id IN ({','.join('?' * len(rows))})", [row["id"] for row in rows])
+
+    def prune_rollups(self, max_age_days: float, granularities=("minute",)) -> int:
+        """오래된 분(기본)/시 단위 롤업을 지운다. 일 단위는 누적 통계에 쓰이므로 남겨 둔다."""
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        conn = self._connect()
+        try:
+            deleted = 0
+            with conn:
+                for granularity in granularities:
+                    if granularity == "day" or granularity not in ROLLUP_GRANULARITIES:
+                        raise ValueError(f"cannot prune {granularity!r} rollups")
+                    bucket = cutoff[:ROLLUP_GRANULARITIES[granularity]]
+                    deleted += conn.execute(
+                        "DELETE FROM execution_rollups WHERE granularity = ? AND bucket < ?", (granularity, bucket)
+                    ).rowcount
+                    conn.execute("DELETE FROM execution_rollup_sketches WHERE granularity = ? AND bucket < ?", (granularity, bucket))
+            return deleted
+        finally:
+            conn.close()
+
+    def reclaim(self) -> int:
+        """지운 페이지를 파일에서 돌려주고 (auto_vacuum=INCREMENTAL 인 경우) WAL 을 비운 뒤 줄어든 바이트 수를 돌려준다."""
+        conn = self._connect()
+        try:
+            before = _file_size(self.db_path) + _file_size(self.db_path + "-wal")
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                conn.execute("PRAGMA incremental_vacuum").fetchall()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            return max(before - _file_size(self.db_path) - _file_size(self.db_path + "-wal"), 0)
+        finally:
+            conn.close()
+
+    def list_executions(
+        self,
+        module_name: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """최신순 목록. cursor 를 주면 그 위치 다음부터 (timestamp, id) 키셋으로 읽어 OFFSET 으로 건너뛰지 않는다.
+        다음 페이지의 cursor 는 마지막 행의 "cursor" 값이다."""
+        self.flush()
+        conditions, params = [], []
         if module_name:
-            cursor.execute("""
-            SELECT id, module_name, timestamp, duration, exit_code
-            FROM executions
-            WHERE module_name = ?
-            ORDER BY timestamp DESC
-            LIMIT ? OFFSET ?
-            """, (module_name, limit, offset))
-        else:
-            cursor.execute("""
+            conditions.append("module_name = ?")
+            params.append(module_name)
+        if cursor:
+            timestamp, last_id = decode_cursor(cursor)
+            conditions.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params += [timestamp, timestamp, last_id]
+            offset = 0
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._reader() as conn:
+            rows = conn.execute(f"""
             SELECT id, module_name, timestamp, duration, exit_code
             FROM executions
-            ORDER BY timestamp DESC
+            {where}
+            ORDER BY timestamp DESC, id DESC
             LIMIT ? OFFSET ?
-            """, (limit, offset))
-        rows = cursor.fetchall()
-        conn.close()
+            """, (*params, limit, offset)).fetchall()
         return [{
             "id": row["id"],
             "module_name": row["module_name"],
             "timestamp": row["timestamp"],
             "duration": row["duration"],
-            "exit_code": row["exit_code"]
+            "exit_code": row["exit_code"],
+            "cursor": encode_cursor(row["timestamp"], row["id"]),
         } for row in rows]
 
     def get_module_stats(self, module_name: str) -> Dict[str, Any]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT 
-            COUNT(*) as total_executions,
-            AVG(duration) as avg_duration,
-            MIN(duration) as min_duration,
-            MAX(duration) as max_duration,
-            SUM(CASE WHEN exit_code = 0 THEN 1 ELSE 0 END) as successful_executions,
-            SUM(CASE WHEN exit_code != 0 THEN 1 ELSE 0 END) as failed_executions
-        FROM executions
-        WHERE module_name = ?
-        """, (module_name,))
-        row = cursor.fetchone()
-        conn.close()
-        if not row:
+        """모듈의 누적 실행 통계 (일 단위 롤업 합계). 실행 기록을 지워도 롤업은 남는다."""
+        self.flush()
+        with self._reader() as conn:
+            row = conn.execute("""
+            SELECT SUM(count), SUM(duration_sum), MIN(duration_min), MAX(duration_max), SUM(error_count)
+            FROM execution_rollups
+            WHERE module_name = ? AND granularity = 'day'
+            """, (module_name,)).fetchone()
+            bins = dict(conn.execute("""
+            SELECT bin, SUM(count) FROM execution_rollup_sketches
+            WHERE module_name = ? AND granularity = 'day'
+            GROUP BY bin
+            """, (module_name,)).fetchall())
+        total = row[0] or 0
+        if not total:
             return {
                 "total_executions": 0,
                 "avg_duration": 0,
@@ -128,14 +639,59 @@ class ExecutionHistory:
                 "failed_executions": 0,
                 "success_rate": 0
             }
-        total = row[0]
-        success_rate = (row[4] / total) * 100 if total > 0 else 0
+        failed = row[4]
         return {
-            "total_executions": row[0],
-            "avg_duration": row[1],
+            "total_executions": total,
+            "avg_duration": row[1] / total,
             "min_duration": row[2],
             "max_duration": row[3],
-            "successful_executions": row[4],
-            "failed_executions": row[5],
-            "success_rate": success_rate
-        } 
\ No newline at end of file
+            "successful_executions": total - failed,
+            "failed_executions": failed,
+            "success_rate": (total - failed) / total * 100,
+            **sketch_percentiles(bins, row[2], row[3])
+        }
+
+    def get_module_timeseries(
+        self,
+        module_name: str,
+        granularity: str = "hour",
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """분/시/일 버킷별 실행 통계를 오래된 순으로 돌려준다. since/until 은 ISO 타임스탬프 (버킷 단위로 자름)."""
+        width = ROLLUP_GRANULARITIES.get(granularity)
+        if width is None:
+            raise ValueError(f"granularity must be one of {list(ROLLUP_GRANULARITIES)}, got {granularity!r}")
+        self.flush()
+        where, params = "module_name = ? AND granularity = ?", [module_name, granularity]
+        if since:
+            where += " AND bucket >= ?"
+            params.append(since[:width])
+        if until:
+            where += " AND bucket <= ?"
+            params.append(until[:width])
+        with self._reader() as conn:
+            rows = conn.execute(f"""
+            SELECT bucket, count, duration_sum, duration_min, duration_max, error_count
+            FROM execution_rollups
+            WHERE {where}
+            ORDER BY bucket DESC
+            LIMIT ?
+            """, (*params, limit)).fetchall()
+            bins: Dict[str, Dict[int, int]] = {}
+            if rows:
+                for bucket, b, count in conn.execute("""
+                SELECT bucket, bin, count FROM execution_rollup_sketches
+                WHERE module_name = ? AND granularity = ? AND bucket BETWEEN ? AND ?
+                """, (module_name, granularity, rows[-1]["bucket"], rows[0]["bucket"])):
+                    bins.setdefault(bucket, {})[b] = count
+        return [{
+            "bucket": row["bucket"],
+            "count": row["count"],
+            "error_count": row["error_count"],
+            "avg_duration": row["duration_sum"] / row["count"],
+            "min_duration": row["duration_min"],
+            "max_duration": row["duration_max"],
+            **sketch_percentiles(bins.get(row["bucket"], {}), row["duration_min"], row["duration_max"])
+        } for row in reversed(rows)]
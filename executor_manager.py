@@ -1,44 +1,195 @@
-from typing import Dict, List, Any, Optional
+import asyncio
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Deque, Dict, Iterable, List, Any, Optional, AsyncIterator, Tuple
 from executors.base import Executor
 from executors.inline import InlineExecutor
 from executors.venv import VenvExecutor
 from module_registry import ModuleRegistry
-from models import ExecRequest, ExecResult
+from admission import AdmissionController, AdmissionRejected
+from fair_scheduler import FairScheduler
+from metrics import EXECUTION_DURATION, MODULE_LOOKUP
+import tracing
+from models import ExecRequest, ExecResult, ExecContext, ExecEvent, Tenant
+
+# 배치 실행 시 한 요청이 동시에 점유할 수 있는 실행 수 상한
+BATCH_MAX_CONCURRENCY = 64
+# 배치 요청(REST /run/{module}/batch, gRPC ExecuteBatch) 한 번에 받을 수 있는 입력 수
+BATCH_MAX_SIZE = 10000
+
+def error_result(message: str) -> ExecResult:
+    return ExecResult(result_json={}, exit_code=1, stderr=message, stdout="", duration=0)
 
 class ExecutorManager:
-    def __init__(self, module_registry: ModuleRegistry):
+    def __init__(
+        self,
+        module_registry: ModuleRegistry,
+        admission: Optional[AdmissionController] = None,
+        scheduler: Optional[FairScheduler] = None,
+    ):
         self.module_registry = module_registry
         self.executors: Dict[str, Executor] = {}
+        # 모듈별/환경별 동시 실행 제한 (None 이면 제한 없음)
+        self.admission = admission
+        # 사용자/scope 별 가중 공정 큐 (None 이면 도착 순서대로)
+        self.scheduler = scheduler
 
-    async def execute(self, request: ExecRequest) -> ExecResult:
-        module_name = request.module
-        module = await self.module_registry.get_module(module_name)
+    async def resolve(
+        self, module_name: str, phases: Optional[Dict[str, float]] = None
+    ) -> Tuple[Optional[Executor], Optional[ExecContext], Optional[ExecResult]]:
+        """모듈/활성 버전/코드/경로/artifact 를 한 번만 조회하고 실행 가능한지 확인한다.
+
+        실행할 수 없으면 (None, None, 오류 결과) 를 반환한다. phases 를 주면 조회("lookup")와
+        실행 환경 확인("validate") 시간을 기록한다.
+        """
+        phases = {} if phases is None else phases
+        start = time.perf_counter()
+        with tracing.span("module.lookup", attributes={"module": module_name}):
+            module = await self.module_registry.resolve_module(module_name)
+        phases["lookup"] = time.perf_counter() - start
+        MODULE_LOOKUP.observe(phases["lookup"])
         if not module:
-            return ExecResult(
-                result_json={},
-                exit_code=1,
-                stderr=f"Module '{module_name}' not found",
-                stdout="",
-                duration=0
-            )
+            return None, None, error_result(f"Module '{module_name}' not found")
         executor = self.executors.get(module.env)
         if not executor:
-            return ExecResult(
-                result_json={},
-                exit_code=1,
-                stderr=f"No executor available for environment '{module.env}'",
-                stdout="",
-                duration=0
-            )
-        if not await executor.validate(module_name):
-            return ExecResult(
-                result_json={},
-                exit_code=1,
-                stderr=f"Module '{module_name}' cannot be executed in environment '{module.env}'",
-                stdout="",
-                duration=0
-            )
-        return await executor.execute(request)
+            return None, None, error_result(f"No executor available for environment '{module.env}'")
+        context = ExecContext(module=module)
+        start = time.perf_counter()
+        with tracing.span("module.validate", attributes={"module": module_name, "executor": executor.executor_type}):
+            valid = await executor.validate(module_name, context=context)
+        phases["validate"] = time.perf_counter() - start
+        if not valid:
+            return None, None, error_result(f"Module '{module_name}' cannot be executed in environment '{module.env}'")
+        return executor, context, None
+
+    @asynccontextmanager
+    async def _slot(self, request: ExecRequest, context: ExecContext):
+        # 모듈/환경 동시 실행 제한을 먼저 통과한 뒤 공정 스케줄러 차례를 받는다.
+        # 반대 순서면 제한에 걸려 기다리는 요청이 전체 스케줄러 슬롯을 붙잡아 다른 테넌트/모듈까지 막는다
+        async with AsyncExitStack() as stack:
+            if self.admission is not None:
+                await stack.enter_async_context(self.admission.admit(request.module, context.env))
+            if self.scheduler is not None:
+                await stack.enter_async_context(self.scheduler.slot(request.tenant))
+            yield
+
+    async def run(
+        self, executor: Executor, context: ExecContext, request: ExecRequest, phases: Optional[Dict[str, float]] = None
+    ) -> ExecResult:
+        """resolve 로 찾은 executor 로 실행한다. 동시 실행 제한을 넘으면 AdmissionRejected.
+
+        결과의 phases 에는 resolve 에서 잰 단계(phases), 슬롯 대기("queue"), executor 가 잰 단계가 합쳐진다."""
+        queued = time.perf_counter()
+        with tracing.span("execute", attributes={"module": request.module, "executor": executor.executor_type}) as span:
+            async with self._slot(request, context):
+                start = time.perf_counter()
+                result = await executor.execute(request, context=context)
+            if span is not None:
+                span.set_attribute("queue_seconds", start - queued)
+                span.set_attribute("exit_code", result.exit_code)
+                if result.exit_code != 0:
+                    span.set_error((result.stderr or "")[-500:])
+        EXECUTION_DURATION.observe(time.perf_counter() - start, request.module, executor.executor_type, str(result.exit_code))
+        result.phases = {**(phases or {}), "queue": start - queued, **(result.phases or {})}
+        return result
+
+    async def execute(self, request: ExecRequest) -> ExecResult:
+        phases: Dict[str, float] = {}
+        executor, context, error = await self.resolve(request.module, phases)
+        if error is not None:
+            error.phases = phases
+            return error
+        return await self.run(executor, context, request, phases)
+
+    async def execute_stream(self, request: ExecRequest) -> AsyncIterator[ExecEvent]:
+        phases: Dict[str, float] = {}
+        executor, context, error = await self.resolve(request.module, phases)
+        if error is not None:
+            error.phases = phases
+            yield ExecEvent(type="result", result=error)
+            return
+        queued = time.perf_counter()
+        # run 과 같은 execute span 과 슬롯 대기("queue") 를 남긴다
+        with tracing.span("execute", attributes={"module": request.module, "executor": executor.executor_type}) as span:
+            async with self._slot(request, context):
+                phases["queue"] = time.perf_counter() - queued
+                if span is not None:
+                    span.set_attribute("queue_seconds", phases["queue"])
+                async for event in executor.execute_stream(request, context=context):
+                    if event.type == "result" and event.result is not None:
+                        result = event.result
+                        EXECUTION_DURATION.observe(result.duration, request.module, executor.executor_type, str(result.exit_code))
+                        result.phases = {**phases, **(result.phases or {})}
+                        if span is not None:
+                            span.set_attribute("exit_code", result.exit_code)
+                            if result.exit_code != 0:
+                                span.set_error((result.stderr or "")[-500:])
+                    yield event
+
+    async def iter_batch(
+        self,
+        module_name: str,
+        inputs: Iterable[Dict[str, Any]],
+        concurrency: int = 8,
+        ordered: bool = False,
+        tenant: Optional[Tenant] = None,
+    ) -> AsyncIterator[Tuple[int, ExecResult]]:
+        """같은 모듈을 여러 입력으로 실행해 (입력 인덱스, 결과) 를 돌려준다.
+
+        모듈 조회/검증은 한 번만 하고, 최대 concurrency 개씩 executor(워커 풀)에 나눠 실행한다.
+        ordered=False 면 끝난 순서대로, True 면 입력 순서대로 내보낸다. inputs 는 필요한 만큼만 꺼내 읽으므로
+        입력 수와 관계없이 태스크는 concurrency 개(순서대로 내보낼 때는 앞 결과를 기다리는 것까지 두 배)까지만 만든다.
+        """
+        executor, context, error = await self.resolve(module_name)
+        if error is not None:
+            for index, _ in enumerate(inputs):
+                yield index, error
+            return
+        limit = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(index: int, input_json: Dict[str, Any]) -> Tuple[int, ExecResult]:
+            async with semaphore:
+                try:
+                    result = await self.run(executor, context, ExecRequest(module=module_name, input_json=input_json, tenant=tenant))
+                except AdmissionRejected as e:
+                    result = error_result(str(e))
+                except Exception as e:
+                    result = error_result(f"Error executing module: {str(e)}")
+                return index, result
+
+        pending = enumerate(inputs)
+        window = limit * 2 if ordered else limit
+        tasks: Deque[asyncio.Future] = deque()
+
+        def fill() -> None:
+            for index, input_json in pending:
+                tasks.append(asyncio.ensure_future(run(index, input_json)))
+                if len(tasks) >= window:
+                    return
+
+        try:
+            fill()
+            while tasks:
+                if ordered:
+                    yield await tasks.popleft()
+                else:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        tasks.remove(task)
+                    for task in done:
+                        yield task.result()
+                fill()
+        finally:
+            # 클라이언트가 중간에 끊으면 남은 실행은 취소
+            for task in tasks:
+                task.cancel()
+
+    async def execute_batch(
+        self, module_name: str, inputs: List[Dict[str, Any]], concurrency: int = 8, tenant: Optional[Tenant] = None
+    ) -> List[ExecResult]:
+        return [result async for _, result in self.iter_batch(module_name, inputs, concurrency, ordered=True, tenant=tenant)]
 
     def register_executor(self, env: str, executor: Executor) -> None:
         self.executors[env] = executor
@@ -46,6 +197,28 @@ class ExecutorManager:
     def get_available_environments(self) -> List[str]:
         return list(self.executors.keys())
 
+    def describe_environments(self) -> Dict[str, Dict[str, Any]]:
+        return {env: executor.describe() for env, executor in self.executors.items()}
+
+    def describe_admission(self) -> Dict[str, Any]:
+        """동시 실행 제한별 실행/대기 수, 거절 수, 대기 시간 (제한이 없으면 빈 dict)"""
+        return self.admission.stats() if self.admission is not None else {}
+
+    def describe_scheduler(self) -> Dict[str, Any]:
+        """테넌트별 실행/대기 수와 관측된 대기/실행 시간 (스케줄러가 없으면 빈 dict)"""
+        return self.scheduler.stats() if self.scheduler is not None else {}
+
+    async def invalidate_module(self, module_name: str) -> None:
+        for executor in self.executors.values():
+            await executor.invalidate(module_name)
+
+    async def prepare_module(self, module_name: str) -> None:
+        """배포 직후 호출: 해당 환경 executor 가 이미지 pull 등 준비 작업을 미리 하도록 한다."""
+        module = await self.module_registry.resolve_module(module_name)
+        executor = self.executors.get(module.env) if module else None
+        if executor is not None:
+            await executor.prepare(ExecContext(module=module))
+
     async def cleanup(self) -> None:
         for executor in self.executors.values():
-            await executor.cleanup() 
\ No newline at end of file
+            await executor.cleanup()
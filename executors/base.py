@@ -1,18 +1,58 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Any
-from models import ExecRequest, ExecResult
+from typing import Any, AsyncIterator, Dict, Optional
+from models import ExecRequest, ExecResult, ExecContext, ExecEvent
 
 class Executor(ABC):
     @abstractmethod
-    async def execute(self, request: ExecRequest) -> ExecResult:
-        """주어진 입력으로 모듈을 실행하고 결과를 반환"""
+    async def execute(self, request: ExecRequest, context: Optional[ExecContext] = None) -> ExecResult:
+        """주어진 입력으로 모듈을 실행하고 결과를 반환 (context 는 ExecutorManager 가 조회한 모듈 정보)"""
         pass
 
     @abstractmethod
-    async def validate(self, module_name: str) -> bool:
+    async def validate(self, module_name: str, context: Optional[ExecContext] = None) -> bool:
         """이 executor가 해당 모듈을 실행할 수 있는지 검증"""
         pass
 
+    async def resolve_context(self, module_name: str, context: Optional[ExecContext] = None) -> Optional[ExecContext]:
+        """context 가 없으면 (executor 단독 호출 시) module_registry 로 직접 조회"""
+        if context is not None:
+            return context
+        module_registry = getattr(self, "module_registry", None)
+        if module_registry is None:
+            return None
+        module = await module_registry.resolve_module(module_name)
+        return ExecContext(module=module) if module else None
+
+    def timeout_for(self, request: ExecRequest) -> Optional[float]:
+        """요청에 실행 제한 시간이 있으면 그것을, 없으면 executor 기본 타임아웃을 쓴다"""
+        return request.timeout or getattr(self, "timeout", None)
+
+    async def execute_stream(self, request: ExecRequest, context: Optional[ExecContext] = None) -> AsyncIterator[ExecEvent]:
+        """출력/진행 이벤트를 실행 중에 내보내고 마지막에 결과 이벤트를 내보낸다.
+
+        기본 구현은 execute 가 끝난 뒤 모아 둔 출력을 한 번에 내보낸다.
+        """
+        result = await self.execute(request, context=context)
+        if result.stdout:
+            yield ExecEvent(type="stdout", data=result.stdout)
+        if result.stderr:
+            yield ExecEvent(type="stderr", data=result.stderr)
+        yield ExecEvent(type="result", result=result)
+
+    async def invalidate(self, module_name: str) -> None:
+        """모듈이 재배포/삭제되었을 때 executor가 보유한 워커/캐시 정리 (기본: 없음)"""
+        pass
+
+    async def prepare(self, context: ExecContext) -> None:
+        """배포 시점에 실행 준비 (이미지 pull 등, 기본: 없음)"""
+        pass
+
+    def describe(self) -> Dict[str, Any]:
+        """/environments 에 노출할 executor 상태 (기본: 타입만)"""
+        return {"type": self.executor_type}
+
     @abstractmethod
     async def cleanup(self) -> None:
         """executor가 사용한 리소스 정리"""
@@ -22,4 +62,51 @@ class Executor(ABC):
     @abstractmethod
     def executor_type(self) -> str:
         """executor의 타입(inline, venv, conda, docker) 반환"""
-        pass 
\ No newline at end of file
+        pass
+
+def result_from_worker(response: Dict[str, Any], duration: float) -> ExecResult:
+    """워커 최종 응답을 ExecResult 로 바꾼다. dict 가 아닌 결과는 {"result": ...} 로 감싼다."""
+    stdout = response.get("stdout", "")
+    stderr = response.get("stderr", "")
+    phases = response.get("phases")
+    if not response.get("ok"):
+        return ExecResult(
+            result_json={}, exit_code=1, stderr=stderr + response.get("error", ""), stdout=stdout, duration=duration, phases=phases
+        )
+    result_json = response.get("result")
+    if result_json is None and "content_type" in response:
+        result_json = {}
+    elif not isinstance(result_json, dict):
+        result_json = {"result": result_json}
+    return ExecResult(
+        result_json=result_json,
+        exit_code=0,
+        stderr=stderr,
+        stdout=stdout,
+        duration=duration,
+        payload=response.get("payload") if "content_type" in response else None,
+        content_type=response.get("content_type"),
+        phases=phases,
+    )
+
+async def stream_worker_events(pool, request: ExecRequest, timeout: Optional[float]) -> AsyncIterator[ExecEvent]:
+    """WorkerPool.run_stream 의 프레임을 ExecEvent 로 바꾼다. 출력은 이미 흘려보냈으므로
+    최종 결과의 stdout/stderr 에는 handler 오류 메시지만 담긴다."""
+    start_time = time.time()
+    result = None
+    try:
+        async for message in pool.run_stream(
+            request.input_json, timeout=timeout, payload=request.payload, content_type=request.content_type
+        ):
+            event = message.get("event")
+            if event in ("stdout", "stderr"):
+                yield ExecEvent(type=event, data=message.get("data", ""))
+            elif event == "progress":
+                yield ExecEvent(type="progress", progress=message.get("value"), data=message.get("message", ""))
+            else:
+                result = result_from_worker(message, time.time() - start_time)
+    except asyncio.TimeoutError:
+        result = ExecResult(result_json={}, exit_code=124, stderr=f"Execution timed out after {timeout} seconds", stdout="", duration=time.time() - start_time)
+    except Exception as e:
+        result = ExecResult(result_json={}, exit_code=1, stderr=f"Error executing module: {str(e)}", stdout="", duration=time.time() - start_time)
+    yield ExecEvent(type="result", result=result)
@@ -0,0 +1,62 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class CompiledModule:
+    """컴파일된 인라인 모듈 코드와, 찾았다면 호출할 handler"""
+    __slots__ = ("code", "handler")
+
+    def __init__(self, code, handler: Optional[Callable] = None):
+        self.code = code
+        self.handler = handler
+
+
+class CodeCache:
+    """(모듈명, 버전, 코드 해시) 키로 컴파일 결과를 보관하는 LRU 캐시.
+
+    같은 코드에 대해 매 요청마다 ast.parse/compile/exec 하지 않도록 한다.
+    활성 버전이 바뀌면 invalidate(module_name) 으로 해당 모듈 항목을 비운다.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, CompiledModule]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(module_name: str, version_id: Hashable, code: str, kind: str = "module") -> Tuple:
+        # kind: 코드를 모듈로 실행("module")하는지, handler 본문으로 감싸는지("body") 구분
+        return (module_name, version_id, kind, hashlib.sha256(code.encode("utf-8")).hexdigest())
+
+    def get_or_load(self, key: Tuple, loader: Callable[[], CompiledModule]) -> CompiledModule:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        # loader 에서 SyntaxError 등이 나면 캐시하지 않고 그대로 전파
+        entry = loader()
+        self._entries[key] = entry
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, module_name: str) -> None:
+        for key in [k for k in self._entries if k[0] == module_name]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# InlineExecutor 와 REST 인라인 실행 경로가 함께 쓰는 프로세스 전역 캐시
+code_cache = CodeCache()
@@ -1,109 +1,145 @@
 import os
-import subprocess
-import tempfile
-import json
+import asyncio
 import time
-from executors.base import Executor
-from models import ExecRequest, ExecResult
+import logging
+from executors.base import Executor, result_from_worker, stream_worker_events
+from typing import Any, AsyncIterator, Dict, Optional
+from models import ExecRequest, ExecResult, ExecContext, ExecEvent
 from module_registry import ModuleRegistry
+from executors.conda_envs import CondaEnvIndex
+from executors.worker_pool import WorkerPool, WORKER_SCRIPT
+
+def conda_python_bin(prefix: str) -> str:
+    if os.name == 'nt':
+        return os.path.join(prefix, 'python.exe')
+    return os.path.join(prefix, 'bin', 'python')
+
+def conda_env_vars(prefix: str) -> Dict[str, str]:
+    """`conda activate` 가 해 주는 최소한의 환경 변수 설정 (PATH, CONDA_PREFIX)"""
+    env = os.environ.copy()
+    bin_dirs = [prefix, os.path.join(prefix, 'Library', 'bin'), os.path.join(prefix, 'Scripts')] if os.name == 'nt' else [os.path.join(prefix, 'bin')]
+    env["PATH"] = os.pathsep.join(bin_dirs + [env.get("PATH", "")])
+    env["CONDA_PREFIX"] = prefix
+    env["CONDA_DEFAULT_ENV"] = prefix
+    env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
+    return env
 
 class CondaExecutor(Executor):
-    def __init__(self, module_registry: ModuleRegistry = None):
+    def __init__(
+        self,
+        module_registry: ModuleRegistry = None,
+        timeout=60,
+        env_index: Optional[CondaEnvIndex] = None,
+        module_root="module_envs",
+        pool_min_size=0,
+        pool_max_size=4,
+        pool_idle_timeout=300.0,
+        pool_max_requests=1000,
+    ):
         self.module_registry = module_registry
+        self.timeout = timeout
+        self.env_index = env_index or CondaEnvIndex()
+        self.module_root = module_root
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_max_requests = pool_max_requests
+        # 모듈별 상주 워커 풀 (conda run 없이 env 의 python 을 직접 실행)
+        self.pools: Dict[str, WorkerPool] = {}
 
-    async def validate(self, module_name: str) -> bool:
-        # 모듈이 존재하고 env가 'conda'인지, conda 환경이 존재하는지 확인
-        try:
-            # conda 설치 확인
-            subprocess.run(["conda", "--version"], check=True, capture_output=True)
-            # 환경 목록 확인
-            result = subprocess.run(
-                ["conda", "env", "list", "--json"],
-                check=True,
-                capture_output=True,
-                text=True
+    async def validate(self, module_name: str, context: Optional[ExecContext] = None) -> bool:
+        # conda 를 매번 띄우지 않고 인덱스에서 모듈 이름과 같은 conda 환경을 찾는다
+        await self.env_index.ensure_loaded()
+        return self.env_index.lookup(module_name) is not None
+
+    def _module_dir(self, module_name: str, context: Optional[ExecContext]) -> str:
+        path = context.path if context is not None else None
+        if path and os.path.isfile(path):
+            return os.path.abspath(os.path.dirname(path))
+        if path and os.path.isdir(path):
+            return os.path.abspath(path)
+        return os.path.abspath(os.path.join(self.module_root, module_name))
+
+    def _get_pool(self, module_name: str, context: Optional[ExecContext]) -> WorkerPool:
+        pool = self.pools.get(module_name)
+        if pool is None:
+            prefix = self.env_index.lookup(module_name)
+            if prefix is None:
+                raise RuntimeError(f"Conda environment for '{module_name}' not found")
+            pool = WorkerPool(
+                [conda_python_bin(prefix), WORKER_SCRIPT, self._module_dir(module_name, context)],
+                env=conda_env_vars(prefix),
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
+                idle_timeout=self.pool_idle_timeout,
+                max_requests=self.pool_max_requests,
+                executor_type="conda",
             )
-            envs = json.loads(result.stdout)["envs"]
-            # 환경 이름이 모듈 이름과 일치하는지 확인
-            return any(env.endswith(module_name) for env in envs)
-        except (subprocess.SubprocessError, json.JSONDecodeError, FileNotFoundError):
-            return False
+            self.pools[module_name] = pool
+        return pool
 
-    async def execute(self, request: ExecRequest) -> ExecResult:
+    async def execute(self, request: ExecRequest, context: Optional[ExecContext] = None) -> ExecResult:
         start_time = time.time()
+        timeout = self.timeout_for(request)
         module_name = request.module
-        
-        # 입력 파일 생성 - NamedTemporaryFile 사용
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as input_file:
-            json.dump(request.input_json, input_file)
-            input_path = input_file.name
-        
-        # 출력 파일 경로만 확보 (파일은 미리 생성하지 않음)
-        output_path = tempfile.mktemp(suffix='.json')
-        
-        # 모듈 경로 획득
-        module_path = ""
-        if self.module_registry:
-            module = await self.module_registry.get_module(module_name)
-            if module and module.path:
-                module_path = module.path
-        # 명령어 구성
-        cmd = [
-            "conda", "run", "-n", module_name,
-            "python", "-c",
-            f"import json; import sys; sys.path.append('{os.path.dirname(module_path)}'); from handler import handler; "
-            f"with open('{input_path}', 'r') as f: input_data = json.load(f); "
-            f"result = handler(input_data); "
-            f"with open('{output_path}', 'w') as f: json.dump(result, f)"
-        ]
+        context = await self.resolve_context(module_name, context)
+        await self.env_index.ensure_loaded()
         try:
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
+            response = await self._get_pool(module_name, context).run(
+                request.input_json, timeout=timeout, payload=request.payload, content_type=request.content_type
             )
-            result_json = {}
-            if process.returncode == 0:
-                try:
-                    with open(output_path, 'r') as f:
-                        result_json = json.load(f)
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    print(f"Error reading output file: {str(e)}")
-                    result_json = {}
-            exit_code = process.returncode
-            stderr = process.stderr
-            stdout = process.stdout
-        except subprocess.TimeoutExpired:
+            return result_from_worker(response, time.time() - start_time)
+        except asyncio.TimeoutError:
             exit_code = 124
-            stderr = "Execution timed out after 60 seconds"
-            stdout = ""
-            result_json = {}
+            stderr = f"Execution timed out after {timeout} seconds"
         except Exception as e:
             exit_code = 1
             stderr = f"Error executing module: {str(e)}"
-            stdout = ""
-            result_json = {}
-        finally:
-            try:
-                if os.path.exists(input_path):
-                    os.unlink(input_path)
-                if os.path.exists(output_path):
-                    os.unlink(output_path)
-            except Exception as e:
-                print(f"Error cleaning up temporary files: {str(e)}")
+            logging.warning(f"[{module_name}] conda execute error: {e}")
         duration = time.time() - start_time
         return ExecResult(
-            result_json=result_json,
+            result_json={},
             exit_code=exit_code,
             stderr=stderr,
-            stdout=stdout,
+            stdout="",
             duration=duration
         )
 
+    async def execute_stream(self, request: ExecRequest, context: Optional[ExecContext] = None) -> AsyncIterator[ExecEvent]:
+        context = await self.resolve_context(request.module, context)
+        await self.env_index.ensure_loaded()
+        try:
+            pool = self._get_pool(request.module, context)
+        except RuntimeError as e:
+            yield ExecEvent(type="result", result=ExecResult(
+                result_json={}, exit_code=1, stderr=f"Error executing module: {str(e)}", stdout="", duration=0
+            ))
+            return
+        async for event in stream_worker_events(pool, request, self.timeout_for(request)):
+            yield event
+
+    async def invalidate(self, module_name: str) -> None:
+        # 재배포/삭제 시 이전 handler 를 import 한 워커를 내리고,
+        # conda 환경이 생기거나 없어질 수 있으므로 인덱스도 백그라운드 갱신
+        pool = self.pools.pop(module_name, None)
+        if pool is not None:
+            await pool.close()
+        self.env_index.request_refresh()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "type": self.executor_type,
+            "conda": self.env_index.snapshot(),
+            "pools": {name: pool.stats() for name, pool in self.pools.items()},
+        }
+
     async def cleanup(self) -> None:
-        pass
+        pools = list(self.pools.values())
+        self.pools.clear()
+        for pool in pools:
+            await pool.close()
+        await self.env_index.stop()
 
     @property
     def executor_type(self) -> str:
-        return "conda" 
\ No newline at end of file
+        return "conda"
@@ -0,0 +1,96 @@
+import os
+import json
+import asyncio
+import logging
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, Optional
+from utils.process import run_process
+
+
+def env_name_from_prefix(prefix: str) -> str:
+    """conda env prefix 경로에서 모듈 이름을 얻는다.
+
+    -n 으로 만든 env 는 .../envs/{name}, 이 프로젝트가 -p 로 만드는 env 는
+    module_envs/{name}/conda_env 형태이므로 후자는 상위 폴더 이름을 쓴다.
+    """
+    prefix = prefix.rstrip("/\\")
+    name = os.path.basename(prefix)
+    if name == "conda_env":
+        name = os.path.basename(os.path.dirname(prefix))
+    return name
+
+
+class CondaEnvIndex:
+    """`conda env list --json` 결과를 메모리에 유지하는 인덱스.
+
+    validate 마다 conda 를 띄우지 않도록 시작 시 한 번, 이후 주기적으로 또는
+    배포/삭제 시 request_refresh() 로 백그라운드 갱신한다.
+    """
+
+    def __init__(self, conda_bin: str = "conda", refresh_interval: float = 300.0, timeout: float = 120.0):
+        self.conda_bin = conda_bin
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.envs: Dict[str, str] = {}  # 모듈(env) 이름 -> prefix
+        self.available = False
+        self.last_refresh: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            try:
+                result = await run_process([self.conda_bin, "env", "list", "--json"], check=True, timeout=self.timeout)
+                prefixes = json.loads(result.stdout)["envs"]
+                self.envs = {env_name_from_prefix(p): p for p in prefixes}
+                self.available = True
+                self.last_error = None
+            except FileNotFoundError as e:
+                # conda 미설치
+                self.envs = {}
+                self.available = False
+                self.last_error = str(e)
+            except (subprocess.SubprocessError, json.JSONDecodeError, KeyError, OSError) as e:
+                # 일시적 실패는 직전 인덱스를 유지
+                self.last_error = str(e)
+                logging.warning(f"conda env index refresh failed: {e}")
+            self.last_refresh = datetime.now()
+
+    async def ensure_loaded(self) -> None:
+        if self.last_refresh is None:
+            await self.refresh()
+
+    def lookup(self, name: str) -> Optional[str]:
+        return self.envs.get(name)
+
+    def request_refresh(self) -> None:
+        """이미 갱신 중이면 합쳐서 한 번만 백그라운드 갱신"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self.refresh())
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._loop_task = None
+        self._refresh_task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "envs": dict(self.envs),
+            "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None,
+            "last_error": self.last_error,
+        }
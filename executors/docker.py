@@ -1,44 +1,195 @@
 import os
-import tempfile
-import json
+import asyncio
+import hashlib
 import time
-import shutil
+import uuid
+import logging
 import docker
-from executors.base import Executor
-from models import ExecRequest, ExecResult
+from pydantic import BaseModel, ConfigDict
+from executors.base import Executor, result_from_worker, stream_worker_events
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from models import ExecRequest, ExecResult, ExecContext, ExecEvent
 from module_registry import ModuleRegistry
+from executors.worker_pool import WorkerPool, PooledWorker
+from utils.process import run_process
+
+# 컨테이너 안에 워커 스크립트를 마운트할 위치
+EXECUTORS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTAINER_WORKER_DIR = "/opt/operato"
+CONTAINER_LABEL = "operato-runner"
+
+class DockerPoolConfig(BaseModel):
+    """이미지별 상주 컨테이너 풀 설정. 모듈별로 일부 값을 덮어쓸 수 있다."""
+    model_config = ConfigDict(frozen=True)
+
+    min_size: int = 0
+    max_size: int = 2
+    idle_timeout: float = 300.0
+    max_requests: int = 1000
+    mem_limit: str = "512m"
+    cpu_period: int = 100000
+    cpu_quota: int = 50000
+    network: str = "none"
+    # 이미지 안에서 handler.py 가 있는 디렉토리 (기본: 이미지 WORKDIR)
+    workdir: str = "."
+
+class ContainerWorkerPool(WorkerPool):
+    """워커 하나가 `docker run -i` 로 띄운 컨테이너 하나인 WorkerPool.
+
+    컨테이너의 메인 프로세스가 worker_main.py 요청 루프이므로, docker CLI 프로세스만
+    죽여서는 컨테이너가 남을 수 있다. 워커를 버릴 때 컨테이너도 `docker rm -f` 한다.
+    close 뒤에 반납되는 워커도 _discard 를 거치므로 실행 중인 컨테이너는 끝난 뒤에 지워진다.
+    """
+
+    def __init__(self, image_ref: str, config: DockerPoolConfig, start_timeout: float = 60.0):
+        super().__init__(
+            [],
+            min_size=config.min_size,
+            max_size=config.max_size,
+            idle_timeout=config.idle_timeout,
+            max_requests=config.max_requests,
+            start_timeout=start_timeout,
+            executor_type="docker",
+        )
+        self.image_ref = image_ref
+        self.config = config
+        # 같은 이미지/설정이라 이 풀을 함께 쓰는 모듈. 마지막 모듈이 빠질 때만 풀을 닫는다
+        self.modules: Set[str] = set()
+        self.config_digest = hashlib.sha256(config.model_dump_json().encode("utf-8")).hexdigest()[:12]
+        self._containers: Dict[PooledWorker, str] = {}
+
+    def container_command(self, name: str) -> List[str]:
+        c = self.config
+        return [
+            "docker", "run", "-i", "--rm",
+            "--name", name,
+            "--label", CONTAINER_LABEL,
+            "--label", f"{CONTAINER_LABEL}.image={self.image_ref}",
+            "--label", f"{CONTAINER_LABEL}.config={self.config_digest}",
+            "--network", c.network,
+            "--memory", c.mem_limit,
+            "--cpu-period", str(c.cpu_period),
+            "--cpu-quota", str(c.cpu_quota),
+            "-v", f"{EXECUTORS_DIR}:{CONTAINER_WORKER_DIR}:ro",
+            "--entrypoint", "python",
+            self.image_ref,
+            f"{CONTAINER_WORKER_DIR}/worker_main.py", c.workdir,
+        ]
+
+    async def _spawn(self) -> PooledWorker:
+        name = f"{CONTAINER_LABEL}-{uuid.uuid4().hex[:12]}"
+        try:
+            worker = await self._start_worker(self.container_command(name))
+        except BaseException:
+            await self._remove_container(name)
+            raise
+        self._containers[worker] = name
+        return worker
+
+    async def _discard(self, worker: PooledWorker) -> None:
+        await super()._discard(worker)
+        name = self._containers.pop(worker, None)
+        if name:
+            await self._remove_container(name)
+
+    @staticmethod
+    async def _remove_container(name: str) -> None:
+        try:
+            await run_process(["docker", "rm", "-f", name], timeout=30)
+        except Exception:
+            pass
 
 class DockerExecutor(Executor):
-    def __init__(self, module_registry: ModuleRegistry = None, base_image="python:3.10-slim"):
+    def __init__(
+        self,
+        module_registry: ModuleRegistry = None,
+        base_image="python:3.10-slim",
+        timeout=60,
+        pool_config: Optional[DockerPoolConfig] = None,
+        module_pool_configs: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
         self.client = docker.from_env()
         self.base_image = base_image
         self.module_registry = module_registry
+        self.timeout = timeout
+        self.pool_config = pool_config or DockerPoolConfig()
+        # 모듈 이름 -> 기본 설정에서 덮어쓸 값
+        self.module_pool_configs = module_pool_configs or {}
+        # (이미지, 설정) 별 상주 컨테이너 풀. 같은 이미지/설정을 쓰는 모듈은 풀을 공유한다.
+        self.pools: Dict[Tuple[str, DockerPoolConfig], ContainerWorkerPool] = {}
+        self._module_pools: Dict[str, Tuple[str, DockerPoolConfig]] = {}
+        # 로컬에 있는 것으로 확인된 이미지 (요청마다 registry 에 pull 하지 않는다)
+        self._present_images: Set[str] = set()
 
-    async def validate(self, module_name: str) -> bool:
+    async def validate(self, module_name: str, context: Optional[ExecContext] = None) -> bool:
         try:
-            self.client.ping()
-            # 실제로는 module_registry에서 env 체크 필요
-            if self.module_registry:
-                module = await self.module_registry.get_module(module_name)
-                return module and module.env == "docker"
-            return True
+            await asyncio.to_thread(self.client.ping)
+            context = await self.resolve_context(module_name, context)
+            if context is not None:
+                return context.env == "docker"
+            return self.module_registry is None
         except Exception:
             return False
 
-    async def execute(self, request: ExecRequest) -> ExecResult:
+    def config_for(self, module_name: str) -> DockerPoolConfig:
+        overrides = self.module_pool_configs.get(module_name)
+        if not overrides:
+            return self.pool_config
+        return self.pool_config.model_copy(update=overrides)
+
+    async def ensure_image(self, image_ref: str, pull: bool = False) -> None:
+        """이미지가 로컬에 있는지 확인한다. pull=True 면 항상 registry 에서 새로 받는다."""
+        if not pull:
+            if image_ref in self._present_images:
+                return
+            try:
+                await asyncio.to_thread(self.client.images.get, image_ref)
+                self._present_images.add(image_ref)
+                return
+            except docker.errors.ImageNotFound:
+                # 배포 시 pull 되지 않은 (이전에 등록된) 모듈: 최초 한 번만 받는다
+                logging.info(f"docker image {image_ref} not found locally, pulling")
+        await asyncio.to_thread(self.client.images.pull, image_ref)
+        self._present_images.add(image_ref)
+
+    async def prepare(self, context: ExecContext) -> None:
+        # 배포 시점에 이미지를 미리 받아 둔다
+        if context.artifact_type == "docker" and context.artifact_uri:
+            await self.ensure_image(context.artifact_uri, pull=True)
+
+    async def _get_pool(self, module_name: str, image_ref: str) -> ContainerWorkerPool:
+        key = (image_ref, self.config_for(module_name))
+        previous = self._module_pools.get(module_name)
+        if previous is not None and previous != key:
+            # 모듈이 다른 이미지/설정으로 옮겨 갔으면 예전 풀에서 뺀다
+            await self._release_pool(module_name, previous)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = ContainerWorkerPool(image_ref, key[1])
+            self.pools[key] = pool
+        pool.modules.add(module_name)
+        self._module_pools[module_name] = key
+        return pool
+
+    async def _release_pool(self, module_name: str, key: Tuple[str, DockerPoolConfig]) -> None:
+        pool = self.pools.get(key)
+        if pool is None:
+            return
+        pool.modules.discard(module_name)
+        # 같은 풀을 쓰는 다른 모듈이 남아 있으면 그 모듈들의 실행 중인 컨테이너를 죽이지 않도록 그대로 둔다
+        if not pool.modules:
+            del self.pools[key]
+            await pool.close()
+
+    async def execute(self, request: ExecRequest, context: Optional[ExecContext] = None) -> ExecResult:
         start_time = time.time()
+        timeout = self.timeout_for(request)
         module_name = request.module
-        temp_dir = tempfile.mkdtemp()
-        input_path = os.path.join(temp_dir, "input.json")
-        with open(input_path, "w") as f:
-            json.dump(request.input_json, f)
-        output_path = os.path.join(temp_dir, "output.json")
         # artifact 기반 이미지 주소 사용
         image_ref = None
-        if self.module_registry:
-            module = await self.module_registry.get_module(module_name)
-            if module and getattr(module, "artifact_type", None) == "docker":
-                image_ref = getattr(module, "artifact_uri", None)
+        context = await self.resolve_context(module_name, context)
+        if context is not None and context.artifact_type == "docker":
+            image_ref = context.artifact_uri
         if not image_ref:
             return ExecResult(
                 result_json={},
@@ -47,73 +198,70 @@ class DockerExecutor(Executor):
                 stdout="",
                 duration=0
             )
-        script_path = os.path.join(temp_dir, "script.py")
-        with open(script_path, "w") as f:
-            f.write("import json\n")
-            f.write("import sys\n")
-            f.write(f"sys.path.insert(0, '{temp_dir}')\n")
-            f.write("from handler import handler\n")
-            f.write("with open('/data/input.json', 'r') as f:\n")
-            f.write("    input_data = json.load(f)\n")
-            f.write("result = handler(input_data)\n")
-            f.write("with open('/data/output.json', 'w') as f:\n")
-            f.write("    json.dump(result, f)\n")
-        container = None
         try:
-            # 이미지 pull (최초 실행 시)
-            self.client.images.pull(image_ref)
-            container = self.client.containers.run(
-                image_ref,
-                command=["python", "/data/script.py"],
-                volumes={temp_dir: {"bind": "/data", "mode": "rw"}},
-                detach=True,
-                mem_limit="512m",
-                cpu_period=100000,
-                cpu_quota=50000,
-                network_mode="none"
+            await self.ensure_image(image_ref)
+            pool = await self._get_pool(module_name, image_ref)
+            response = await pool.run(
+                request.input_json, timeout=timeout, payload=request.payload, content_type=request.content_type
             )
-            exit_code = container.wait(timeout=60)["StatusCode"]
-            logs = container.logs(stdout=True, stderr=True).decode("utf-8")
-            stdout = ""
-            stderr = ""
-            if exit_code == 0:
-                stdout = logs
-            else:
-                stderr = logs
-            if os.path.exists(output_path):
-                with open(output_path, "r") as f:
-                    result_json = json.load(f)
-            else:
-                result_json = {}
-        except docker.errors.ContainerError as e:
-            exit_code = e.exit_status
-            stderr = str(e)
-            stdout = ""
-            result_json = {}
+            return result_from_worker(response, time.time() - start_time)
+        except asyncio.TimeoutError:
+            exit_code = 124
+            stderr = f"Execution timed out after {timeout} seconds"
         except Exception as e:
             exit_code = 1
             stderr = f"Error executing module: {str(e)}"
-            stdout = ""
-            result_json = {}
-        finally:
-            if container:
-                try:
-                    container.remove(force=True)
-                except Exception:
-                    pass
-            shutil.rmtree(temp_dir, ignore_errors=True)
         duration = time.time() - start_time
         return ExecResult(
-            result_json=result_json,
+            result_json={},
             exit_code=exit_code,
             stderr=stderr,
-            stdout=stdout,
+            stdout="",
             duration=duration
         )
 
+    async def execute_stream(self, request: ExecRequest, context: Optional[ExecContext] = None) -> AsyncIterator[ExecEvent]:
+        context = await self.resolve_context(request.module, context)
+        image_ref = context.artifact_uri if context is not None and context.artifact_type == "docker" else None
+        error = None if image_ref else "docker artifact_uri가 지정되지 않았습니다."
+        if error is None:
+            try:
+                await self.ensure_image(image_ref)
+            except Exception as e:
+                error = f"Error executing module: {str(e)}"
+        if error is not None:
+            yield ExecEvent(type="result", result=ExecResult(result_json={}, exit_code=1, stderr=error, stdout="", duration=0))
+            return
+        pool = await self._get_pool(request.module, image_ref)
+        async for event in stream_worker_events(pool, request, self.timeout_for(request)):
+            yield event
+
+    async def invalidate(self, module_name: str) -> None:
+        # 재배포 시 같은 태그로 이미지가 바뀔 수 있으므로 이미지 확인 결과를 버리고 풀에서 모듈을 뺀다
+        key = self._module_pools.pop(module_name, None)
+        if key is None:
+            return
+        self._present_images.discard(key[0])
+        await self._release_pool(module_name, key)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "type": self.executor_type,
+            "images": sorted(self._present_images),
+            "pools": {
+                f"{image}#{pool.config_digest}": {**pool.stats(), "modules": sorted(pool.modules)}
+                for (image, _), pool in self.pools.items()
+            },
+        }
+
     async def cleanup(self) -> None:
+        pools = list(self.pools.values())
+        self.pools.clear()
+        self._module_pools.clear()
+        for pool in pools:
+            await pool.close()
         try:
-            containers = self.client.containers.list(all=True, filters={"label": "operato-runner"})
+            containers = self.client.containers.list(all=True, filters={"label": CONTAINER_LABEL})
             for container in containers:
                 container.remove(force=True)
         except Exception:
@@ -121,4 +269,4 @@ class DockerExecutor(Executor):
 
     @property
     def executor_type(self) -> str:
-        return "docker" 
\ No newline at end of file
+        return "docker"
@@ -1,9 +1,12 @@
-import ast
 import sys
+import types
 from io import StringIO
 import time
 from executors.base import Executor
-from models import ExecRequest, ExecResult
+from executors.code_cache import code_cache, CompiledModule
+from executors.worker_main import call_handler, accepts_payload
+from models import ExecRequest, ExecResult, ExecContext
+from typing import Optional
 import json
 
 class InlineExecutor(Executor):
@@ -14,18 +17,20 @@ class InlineExecutor(Executor):
     def executor_type(self) -> str:
         return "inline"
 
-    async def validate(self, module_name: str) -> bool:
+    async def validate(self, module_name: str, context: Optional[ExecContext] = None) -> bool:
         # 실제 구현에서는 ModuleRegistry 연동 필요, 여기서는 항상 True
         return True
 
-    async def execute(self, request: ExecRequest) -> ExecResult:
+    async def execute(self, request: ExecRequest, context: Optional[ExecContext] = None) -> ExecResult:
         start_time = time.time()
-        # 모듈 레지스트리에서 코드 가져오기
+        phases = {}
+        # 실행 컨텍스트(없으면 모듈 레지스트리)에서 코드 가져오기
         code = None
-        if self.module_registry is not None and hasattr(request, 'module'):
-            module_obj = await self.module_registry.get_module(request.module)
-            if module_obj and getattr(module_obj, 'code', None):
-                code = module_obj.code
+        version = None
+        context = await self.resolve_context(request.module, context)
+        if context is not None and context.code:
+            code = context.code
+            version = context.version_id if context.version_id is not None else context.version
         if not code:
             code = request.input_json.get("code", "")
         old_stdout, old_stderr = sys.stdout, sys.stderr
@@ -33,28 +38,50 @@ class InlineExecutor(Executor):
         sys.stdout, sys.stderr = stdout_capture, stderr_capture
         result_json = {}
         exit_code = 0
+        payload = None
+        content_type = None
         try:
-            # 샌드박싱: 문법 및 위험 코드 체크 (RestrictedPython 등은 추후)
-            ast.parse(code)
             input_obj = request.input_json
             if isinstance(input_obj, str):
                 try:
                     input_obj = json.loads(input_obj)
                 except Exception:
                     input_obj = {}
-            namespace = {"input": input_obj}
-            exec(code, namespace)
-            entry = None
-            for fname in ["handler", "run", "main"]:
-                if fname in namespace and callable(namespace[fname]):
-                    entry = namespace[fname]
-                    break
-            if not entry:
-                funcs = [v for v in namespace.values() if callable(v)]
-                if funcs:
-                    entry = funcs[0]
+            namespace = None
+
+            def load():
+                nonlocal namespace
+                # 샌드박싱: 문법 및 위험 코드 체크 (RestrictedPython 등은 추후)
+                # compile 이 ast.parse 와 같은 문법 검사를 수행한다
+                compiled = compile(code, f"<inline:{request.module}>", "exec")
+                if self._uses_input_global(compiled):
+                    # 전역 input 을 읽는 코드는 handler 를 캐시하면 다른 요청의 input 이 남으므로 컴파일 결과만 캐시
+                    return CompiledModule(compiled)
+                # 캐시되는 handler 의 globals 에는 요청 데이터를 두지 않는다
+                namespace = {}
+                exec(compiled, namespace)
+                return CompiledModule(compiled, self._find_entry(namespace))
+
+            # 캐시 hit 이면 exec 없이 이전에 찾아 둔 handler 를 바로 호출
+            compile_start = time.perf_counter()
+            compiled_module = code_cache.get_or_load(
+                code_cache.make_key(request.module, version, code), load
+            )
+            phases["compile"] = time.perf_counter() - compile_start
+            handler_start = time.perf_counter()
+            entry = compiled_module.handler
+            if entry is None and namespace is None:
+                # 스크립트형 코드나 전역 input 을 읽는 코드는 컴파일 결과만 재사용해 요청마다 새 namespace 에서 다시 실행
+                namespace = {"input": input_obj}
+                exec(compiled_module.code, namespace)
+                entry = self._find_entry(namespace)
             if entry:
-                handler_result = entry(request.input_json)
+                # 바이너리 입력/결과는 워커와 같은 규칙으로 JSON 변환 없이 주고받는다
+                handler_result, blob, content_type = call_handler(
+                    entry, accepts_payload(entry), request.input_json, request.payload or b"", request.content_type
+                )
+                if content_type is not None:
+                    payload, handler_result = blob, {}
                 if not isinstance(handler_result, dict):
                     handler_result = {"result": handler_result}
                 result_json = handler_result
@@ -66,6 +93,7 @@ class InlineExecutor(Executor):
                     result_json = {"stdout": stdout_capture.getvalue()}
                 else:
                     result_json = {}
+            phases["handler"] = time.perf_counter() - handler_start
         except Exception as e:
             exit_code = 1
             print(f"Error executing module: {str(e)}", file=sys.stderr)
@@ -77,8 +105,31 @@ class InlineExecutor(Executor):
             exit_code=exit_code,
             stderr=stderr_capture.getvalue(),
             stdout=stdout_capture.getvalue(),
-            duration=duration
+            duration=duration,
+            payload=payload,
+            content_type=content_type,
+            phases=phases or None
         )
 
+    @staticmethod
+    def _uses_input_global(code: types.CodeType) -> bool:
+        # 모듈 본문이나 그 안의 함수 어디서든 input 을 전역 이름으로 참조하는지 (인자로 받는 input 은 지역 변수)
+        if "input" in code.co_names:
+            return True
+        return any(InlineExecutor._uses_input_global(const) for const in code.co_consts if isinstance(const, types.CodeType))
+
+    @staticmethod
+    def _find_entry(namespace):
+        for fname in ["handler", "run", "main"]:
+            if fname in namespace and callable(namespace[fname]):
+                return namespace[fname]
+        funcs = [v for v in namespace.values() if callable(v)]
+        if funcs:
+            return funcs[0]
+        return None
+
+    async def invalidate(self, module_name: str) -> None:
+        code_cache.invalidate(module_name)
+
     async def cleanup(self) -> None:
         pass 
\ No newline at end of file
@@ -1,130 +1,114 @@
 import os
-import subprocess
-import tempfile
-import json
+import asyncio
 import time
 import logging
-from executors.base import Executor
-from models import ExecRequest, ExecResult
+from typing import AsyncIterator, Dict, Optional
+from executors.base import Executor, result_from_worker, stream_worker_events
+from executors.worker_pool import WorkerPool, WORKER_SCRIPT
+from models import ExecRequest, ExecResult, ExecContext, ExecEvent
 
 def log_module_action(module_name, version, action, message):
     logging.info(f"[{module_name}][v{version}][{action}] {message}")
 
 class VenvExecutor(Executor):
-    def __init__(self, venv_path="module_envs", module_registry=None):
+    def __init__(
+        self,
+        venv_path="module_envs",
+        module_registry=None,
+        timeout=60,
+        pool_min_size=0,
+        pool_max_size=4,
+        pool_idle_timeout=300.0,
+        pool_max_requests=1000,
+    ):
         self.venv_path = venv_path
         self.module_registry = module_registry
+        self.timeout = timeout
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_max_requests = pool_max_requests
+        # 모듈별 상주 워커 풀 (handler를 한 번만 import 해서 재사용)
+        self.pools: Dict[str, WorkerPool] = {}
         os.makedirs(venv_path, exist_ok=True)
 
-    async def validate(self, module_name: str) -> bool:
+    async def validate(self, module_name: str, context: Optional[ExecContext] = None) -> bool:
         venv_dir = os.path.join(self.venv_path, module_name, "venv")
         return os.path.exists(venv_dir)
 
-    async def execute(self, request: ExecRequest) -> ExecResult:
-        start_time = time.time()
-        module_name = request.module
-        module = await self.module_registry.get_module(module_name)
-        # if not module or not module.path:
-        #     log_module_action(module_name, getattr(module, 'version', 'unknown'), "execute", "Module path not found")
-        #     return ExecResult(
-        #         result_json={},
-        #         exit_code=1,
-        #         stderr=f"Module path not found for {module_name}",
-        #         stdout="",
-        #         duration=0
-        #     )
-            
-        # 가상환경과 모듈 경로 설정
+    def _python_bin(self, module_name: str) -> str:
         venv_dir = os.path.join(self.venv_path, module_name, "venv")
-        module_dir = os.path.join(self.venv_path, module_name)  # 소스는 module_envs/{module_name}/
-        
-        # Python 실행 파일 경로
         if os.name == 'nt':
-            python_bin = os.path.join(venv_dir, 'Scripts', 'python.exe')
-        else:
-            python_bin = os.path.join(venv_dir, 'bin', 'python')
-            
-        # 임시 파일 생성
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as input_file:
-            json.dump(request.input_json, input_file)
-            input_path = input_file.name
-        output_path = tempfile.mktemp(suffix='.json')
-            
-        # Python 스크립트 작성
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as script_file:
-            script_content = f"""
-import json
-import sys
-import os
-
-# 모듈 디렉토리를 Python 경로에 추가
-sys.path.insert(0, '{module_dir}')
-
-# handler.py에서 handler 함수 import
-from handler import handler
+            return os.path.join(venv_dir, 'Scripts', 'python.exe')
+        return os.path.join(venv_dir, 'bin', 'python')
 
-with open('{input_path}', 'r') as f:
-    input_data = json.load(f)
-
-result = handler(input_data)
-
-with open('{output_path}', 'w') as f:
-    json.dump(result, f)
-"""
-            script_file.write(script_content)
-            script_path = script_file.name
-
-        try:
+    def _get_pool(self, module_name: str) -> WorkerPool:
+        pool = self.pools.get(module_name)
+        if pool is None:
+            # 소스는 module_envs/{module_name}/
+            module_dir = os.path.abspath(os.path.join(self.venv_path, module_name))
             env = os.environ.copy()
             env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
-            process = subprocess.run(
-                [python_bin, script_path],
-                capture_output=True,
-                text=True,
-                timeout=60,
-                env=env
+            pool = WorkerPool(
+                [self._python_bin(module_name), WORKER_SCRIPT, module_dir],
+                env=env,
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
+                idle_timeout=self.pool_idle_timeout,
+                max_requests=self.pool_max_requests,
+                executor_type="venv",
             )
-            if os.path.exists(output_path):
-                with open(output_path, 'r') as f:
-                    result_json = json.load(f)
-            else:
-                result_json = {}
-            exit_code = process.returncode
-            stderr = process.stderr
-            stdout = process.stdout
-            log_module_action(module_name, getattr(module, 'version', 'unknown'), "execute", f"실행 완료 (exit_code={exit_code})")
-        except subprocess.TimeoutExpired:
+            self.pools[module_name] = pool
+        return pool
+
+    async def execute(self, request: ExecRequest, context: Optional[ExecContext] = None) -> ExecResult:
+        start_time = time.time()
+        timeout = self.timeout_for(request)
+        module_name = request.module
+        context = await self.resolve_context(module_name, context)
+        version = context.version if context is not None else 'unknown'
+        try:
+            response = await self._get_pool(module_name).run(
+                request.input_json, timeout=timeout, payload=request.payload, content_type=request.content_type
+            )
+            result = result_from_worker(response, time.time() - start_time)
+            log_module_action(module_name, version, "execute", f"실행 완료 (exit_code={result.exit_code})")
+            return result
+        except asyncio.TimeoutError:
             exit_code = 124
-            stderr = "Execution timed out after 60 seconds"
-            stdout = ""
-            result_json = {}
-            log_module_action(module_name, getattr(module, 'version', 'unknown'), "execute", "실행 타임아웃")
+            stderr = f"Execution timed out after {timeout} seconds"
+            log_module_action(module_name, version, "execute", "실행 타임아웃")
         except Exception as e:
             exit_code = 1
             stderr = f"Error executing module: {str(e)}"
-            stdout = ""
-            result_json = {}
-            log_module_action(module_name, getattr(module, 'version', 'unknown'), "execute", f"실행 에러: {str(e)}")
-        finally:
-            if os.path.exists(input_path):
-                os.unlink(input_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-            if os.path.exists(script_path):
-                os.unlink(script_path)
-                
+            log_module_action(module_name, version, "execute", f"실행 에러: {str(e)}")
+
         duration = time.time() - start_time
         return ExecResult(
-            result_json=result_json,
+            result_json={},
             exit_code=exit_code,
             stderr=stderr,
-            stdout=stdout,
+            stdout="",
             duration=duration
         )
 
+    async def execute_stream(self, request: ExecRequest, context: Optional[ExecContext] = None) -> AsyncIterator[ExecEvent]:
+        # handler 가 print 하는 대로 출력 이벤트를 흘려보낸다
+        async for event in stream_worker_events(self._get_pool(request.module), request, self.timeout_for(request)):
+            yield event
+
+    async def invalidate(self, module_name: str) -> None:
+        # 재배포/삭제 시 이전 handler를 import 한 워커를 모두 내린다
+        pool = self.pools.pop(module_name, None)
+        if pool is not None:
+            await pool.close()
+
     async def cleanup(self) -> None:
-        pass
+        pools = list(self.pools.values())
+        self.pools.clear()
+        for pool in pools:
+            await pool.close()
 
     @property
     def executor_type(self) -> str:
-        return "venv" 
\ No newline at end of file
+        return "venv"
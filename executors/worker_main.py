@@ -0,0 +1,243 @@
+"""모듈 실행 환경(venv/conda 등) 안에서 상주하며 handler 호출을 처리하는 워커 프로세스.
+
+이 파일은 모듈 환경의 인터프리터로 직접 실행되므로 표준 라이브러리만 사용한다.
+
+    python worker_main.py <module_dir>
+
+프로토콜: stdin/stdout 위의 길이 접두 프레임
+    헤더 8바이트 (big-endian JSON 길이, 바이너리 길이) + UTF-8 JSON + 바이너리 첨부(없으면 0바이트)
+
+    시작 시  -> {"ready": true} 또는 {"ready": false, "error": "..."}
+    요청     <- {"input": {...}, "stream": false, "content_type": null}
+    응답     -> {"ok": true, "result": ..., "stdout": "...", "stderr": "...", "timing": {...}}
+               {"ok": false, "error": "...", "stdout": "...", "stderr": "...", "timing": {...}}
+
+응답의 timing 은 워커 안에서 잰 요청 JSON 디코딩("decode")과 handler 실행("handler") 시간(초)이다.
+요청에 "traceparent" 가 있으면 handler 구간에 span id 를 새로 붙여 timing 에 ("span_id", "start_ns", "end_ns") 돌려주고,
+handler 실행 동안 TRACEPARENT 환경 변수로 노출해 handler 나 그 자식 프로세스가 같은 trace 를 이어 갈 수 있게 한다.
+
+요청에 content_type 이 있으면 첨부 바이트가 JSON 변환 없이 Payload 로 handler 에 전달된다.
+handler 가 `payload` 인자를 받으면 handler(input, payload=Payload(data, content_type)) 로,
+아니면 content_type 이 application/json 인 경우에만 디코딩해서 handler(input) 으로 호출한다.
+handler 가 bytes 나 Payload 를 반환하면 응답에 {"content_type": ...} 과 함께 첨부로 돌려준다.
+
+stream 이 true 면 최종 응답 전에 출력/진행 이벤트 프레임을 보내고, 최종 응답의 stdout/stderr 는 비운다.
+    이벤트   -> {"event": "stdout" | "stderr", "data": "..."}
+               {"event": "progress", "value": 0.5, "message": "..."}
+
+handler 는 `from operato_worker import progress, Payload` 로 진행 이벤트를 보내거나 바이너리 결과를 만들 수 있다.
+"""
+import inspect
+import io
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import traceback
+import types
+
+HEADER = struct.Struct(">II")
+OCTET_STREAM = "application/octet-stream"
+
+
+class Payload:
+    """JSON 을 거치지 않고 주고받는 바이너리 데이터와 그 content type (msgpack, Arrow IPC, 이미지 등)"""
+    __slots__ = ("data", "content_type")
+
+    def __init__(self, data, content_type=OCTET_STREAM):
+        self.data = data
+        self.content_type = content_type
+
+    def __repr__(self):
+        return f"Payload({self.content_type}, {len(self.data)} bytes)"
+
+
+def accepts_payload(handler):
+    try:
+        params = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == "payload" or p.kind is inspect.Parameter.VAR_KEYWORD for p in params)
+
+
+def call_handler(handler, takes_payload, input, blob, content_type):
+    """요청의 바이너리 첨부 여부에 따라 handler 를 호출하고 (결과, 첨부, content_type) 을 돌려준다."""
+    if content_type is None:
+        result = handler(input)
+    elif takes_payload:
+        result = handler(input, payload=Payload(blob, content_type))
+    elif content_type == "application/json":
+        result = handler(json.loads(blob))
+    else:
+        raise TypeError(f"handler does not accept binary payloads ({content_type}); add a 'payload' parameter")
+    if isinstance(result, Payload):
+        return None, bytes(result.data), result.content_type
+    if isinstance(result, (bytes, bytearray, memoryview)):
+        return None, bytes(result), OCTET_STREAM
+    return result, b"", None
+
+
+def _open_channel():
+    # 프로토콜 전용 fd를 확보하고, fd 1은 stderr로, fd 0은 /dev/null 로 돌려서
+    # C 확장/서브프로세스의 직접 출력이나 handler 의 stdin 읽기가 프레임 스트림을 건드리지 않도록 한다.
+    out_fd = os.dup(1)
+    in_fd = os.dup(0)
+    os.dup2(2, 1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    return os.fdopen(in_fd, "rb"), os.fdopen(out_fd, "wb")
+
+
+_send_lock = threading.Lock()
+
+
+def _send(channel, message, blob=b""):
+    # 직렬화 실패(TypeError/ValueError)는 쓰기 전에 발생하므로 스트림이 깨지지 않는다
+    data = json.dumps(message).encode("utf-8")
+    # handler 가 만든 스레드에서 print/progress 를 호출해도 프레임이 섞이지 않도록
+    with _send_lock:
+        channel.write(HEADER.pack(len(data), len(blob)))
+        channel.write(data)
+        if blob:
+            channel.write(blob)
+        channel.flush()
+
+
+class _StreamWriter(io.TextIOBase):
+    """print 출력을 줄 단위로 모아 이벤트 프레임으로 바로 보내는 sys.stdout/stderr 대체"""
+
+    def __init__(self, channel, name):
+        self._channel = channel
+        self._name = name
+        self._buffer = ""
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer += text
+        if "\n" in self._buffer:
+            head, _, self._buffer = self._buffer.rpartition("\n")
+            _send(self._channel, {"event": self._name, "data": head + "\n"})
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            data, self._buffer = self._buffer, ""
+            _send(self._channel, {"event": self._name, "data": data})
+
+
+class _Progress:
+    def __init__(self, channel):
+        self._channel = channel
+        self.streaming = False
+
+    def __call__(self, value=None, message=""):
+        if self.streaming:
+            _send(self._channel, {"event": "progress", "value": value, "message": str(message)})
+
+
+def _recv(channel):
+    """(JSON 바이트, 첨부) 를 읽는다. 스트림이 끝났으면 (None, b"")"""
+    header = channel.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None, b""
+    size, blob_size = HEADER.unpack(header)
+    data = channel.read(size)
+    blob = channel.read(blob_size) if blob_size else b""
+    if len(data) < size or len(blob) < blob_size:
+        return None, b""
+    return data, blob
+
+
+def _handler_traceparent(traceparent):
+    """호스트가 넘긴 traceparent 에서 handler 구간용 (span id, traceparent) 를 만든다."""
+    parts = (traceparent or "").split("-")
+    if len(parts) < 4 or len(parts[1]) != 32:
+        return None, None
+    span_id = os.urandom(8).hex()
+    return span_id, f"00-{parts[1]}-{span_id}-{parts[3][:2]}"
+
+
+def main():
+    module_dir = sys.argv[1] if len(sys.argv) > 1 else ""
+    inbox, channel = _open_channel()
+    if module_dir:
+        sys.path.insert(0, os.path.abspath(module_dir))
+    progress = _Progress(channel)
+    api = types.ModuleType("operato_worker")
+    api.progress = progress
+    api.Payload = Payload
+    sys.modules["operato_worker"] = api
+    try:
+        from handler import handler
+    except Exception:
+        _send(channel, {"ready": False, "error": traceback.format_exc()})
+        return 1
+    takes_payload = accepts_payload(handler)
+    _send(channel, {"ready": True})
+
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    while True:
+        data, blob = _recv(inbox)
+        if data is None:
+            break
+        decode_started = time.perf_counter()
+        request = json.loads(data)
+        handler_started = time.perf_counter()
+        span_id, traceparent = _handler_traceparent(request.get("traceparent"))
+        if traceparent:
+            os.environ["TRACEPARENT"] = traceparent
+        start_ns = time.time_ns()
+        streaming = bool(request.get("stream"))
+        if streaming:
+            stdout_capture, stderr_capture = _StreamWriter(channel, "stdout"), _StreamWriter(channel, "stderr")
+        else:
+            stdout_capture, stderr_capture = io.StringIO(), io.StringIO()
+        progress.streaming = streaming
+        sys.stdout, sys.stderr = stdout_capture, stderr_capture
+        result_blob = b""
+        try:
+            result, result_blob, content_type = call_handler(
+                handler, takes_payload, request.get("input"), blob, request.get("content_type")
+            )
+            response = {"ok": True, "result": result}
+            if content_type is not None:
+                response["content_type"] = content_type
+        except Exception:
+            response = {"ok": False, "error": traceback.format_exc()}
+        finally:
+            sys.stdout, sys.stderr = real_stdout, real_stderr
+            progress.streaming = False
+            if traceparent:
+                os.environ.pop("TRACEPARENT", None)
+        timing = {"decode": handler_started - decode_started, "handler": time.perf_counter() - handler_started}
+        if span_id:
+            timing.update(span_id=span_id, start_ns=start_ns, end_ns=time.time_ns())
+        response["timing"] = timing
+        if streaming:
+            stdout_capture.flush()
+            stderr_capture.flush()
+            response["stdout"] = response["stderr"] = ""
+        else:
+            response["stdout"] = stdout_capture.getvalue()
+            response["stderr"] = stderr_capture.getvalue()
+        try:
+            _send(channel, response, result_blob)
+        except (TypeError, ValueError) as e:
+            # 결과가 JSON 직렬화 불가한 경우
+            _send(channel, {
+                "ok": False,
+                "error": f"handler result is not JSON serializable: {e}",
+                "stdout": response["stdout"],
+                "stderr": response["stderr"],
+                "timing": timing,
+            })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
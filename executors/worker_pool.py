@@ -0,0 +1,370 @@
+import asyncio
+import collections
+import json
+import os
+import struct
+import time
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+from utils.process import kill_process_group
+from metrics import WORKER_SPAWN
+import tracing
+
+# 모듈 환경 인터프리터로 실행되는 워커 스크립트
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker_main.py")
+# worker_main.py 와 같은 프레임 헤더: big-endian (JSON 길이, 바이너리 첨부 길이) + UTF-8 JSON + 첨부
+FRAME_HEADER = struct.Struct(">II")
+# 깨진 헤더로 거대한 버퍼를 잡지 않도록 프레임 크기 상한
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+
+
+def encode_frame(message: Any, blob: bytes = b"") -> bytes:
+    data = json.dumps(message).encode("utf-8")
+    return FRAME_HEADER.pack(len(data), len(blob)) + data + blob
+
+
+async def read_frame(reader: asyncio.StreamReader, phases: Optional[Dict[str, float]] = None) -> Optional[Any]:
+    """프레임 하나를 읽는다. 스트림이 끝났으면 None. 바이너리 첨부는 message["payload"] 로 붙인다.
+
+    phases 를 주면 JSON 디코딩 시간을 phases["deserialize"] 에 기록한다."""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        size, blob_size = FRAME_HEADER.unpack(header)
+        if size + blob_size > MAX_FRAME_SIZE:
+            raise ValueError(f"frame too large: {size + blob_size} bytes")
+        data = await reader.readexactly(size)
+        blob = await reader.readexactly(blob_size) if blob_size else b""
+    except asyncio.IncompleteReadError:
+        return None
+    started = time.perf_counter()
+    message = json.loads(data)
+    if phases is not None:
+        phases["deserialize"] = time.perf_counter() - started
+    if blob_size:
+        message["payload"] = blob
+    return message
+
+
+def merge_worker_timing(phases: Dict[str, float], response: Dict[str, Any]) -> None:
+    """워커가 잰 시간(요청 디코딩, handler 실행)을 호스트 쪽 단계별 시간에 합치고,
+    워커가 handler span 을 보고했으면 현재 span 의 자식으로 남긴다."""
+    timing = response.pop("timing", None) or {}
+    if "decode" in timing:
+        phases["serialize"] = phases.get("serialize", 0.0) + timing["decode"]
+    if "handler" in timing:
+        phases["handler"] = timing["handler"]
+    if "span_id" in timing:
+        tracing.record_span("handler", timing["start_ns"], timing["end_ns"], span_id=timing["span_id"], attributes={"ok": response.get("ok")})
+
+
+class WorkerError(Exception):
+    """워커 프로세스 기동 실패, 비정상 종료 등 프로토콜 수준 오류"""
+
+
+class PooledWorker:
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.requests_served = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.stderr_tail: Deque[str] = collections.deque(maxlen=50)
+        self._stderr_task = asyncio.get_running_loop().create_task(self._drain_stderr())
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def _drain_stderr(self):
+        # stderr 파이프가 가득 차서 워커가 멈추지 않도록 계속 비우고, 마지막 몇 줄만 보관
+        try:
+            async for line in self.process.stderr:
+                self.stderr_tail.append(line.decode("utf-8", errors="replace"))
+        except Exception:
+            pass
+
+    async def _read(self, phases: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        try:
+            message = await read_frame(self.process.stdout, phases)
+        except ValueError as e:
+            raise WorkerError(f"invalid frame from worker: {e}")
+        if message is None:
+            await self.process.wait()
+            tail = "".join(self.stderr_tail)
+            raise WorkerError(f"worker exited with code {self.process.returncode}\n{tail}".rstrip())
+        return message
+
+    async def wait_ready(self) -> None:
+        message = await self._read()
+        if not message.get("ready"):
+            raise WorkerError(message.get("error") or "worker failed to start")
+
+    async def send(
+        self,
+        input_json: Any,
+        stream: bool = False,
+        payload: Optional[bytes] = None,
+        content_type: Optional[str] = None,
+        phases: Optional[Dict[str, float]] = None,
+    ) -> None:
+        message = {"input": input_json, "stream": stream}
+        if content_type is not None:
+            message["content_type"] = content_type
+        traceparent = tracing.current_traceparent()
+        if traceparent is not None:
+            message["traceparent"] = traceparent
+        started = time.perf_counter()
+        frame = encode_frame(message, payload or b"")
+        if phases is not None:
+            phases["serialize"] = time.perf_counter() - started
+        self.process.stdin.write(frame)
+        await self.process.stdin.drain()
+
+    def _completed(self) -> None:
+        self.requests_served += 1
+        self.last_used = time.monotonic()
+
+    async def call(
+        self,
+        input_json: Any,
+        payload: Optional[bytes] = None,
+        content_type: Optional[str] = None,
+        phases: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Any]:
+        await self.send(input_json, payload=payload, content_type=content_type, phases=phases)
+        response = await self._read(phases)
+        self._completed()
+        if phases is not None:
+            merge_worker_timing(phases, response)
+        return response
+
+    async def stop(self, grace: float = 1.0) -> None:
+        if self.alive:
+            try:
+                self.process.stdin.close()
+                await asyncio.wait_for(self.process.wait(), grace)
+            except (asyncio.TimeoutError, ConnectionError, ProcessLookupError):
+                await self.kill()
+        self._stderr_task.cancel()
+
+    async def kill(self) -> None:
+        # handler가 띄운 자식 프로세스까지 프로세스 그룹 단위로 정리
+        kill_process_group(self.process)
+        await self.process.wait()
+        self._stderr_task.cancel()
+
+
+class WorkerPool:
+    """한 모듈에 대한 상주 워커 프로세스 풀.
+
+    워커는 handler를 한 번만 import 하고 파이프로 요청을 반복 처리한다.
+    max_size 만큼 동시 실행을 허용하고, idle_timeout 동안 쓰이지 않은 워커는 정리하며,
+    max_requests 건을 처리한 워커는 새 프로세스로 교체한다.
+    """
+
+    def __init__(
+        self,
+        command: List[str],
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+        min_size: int = 0,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        max_requests: int = 1000,
+        start_timeout: float = 30.0,
+        executor_type: str = "process",
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.command = command
+        self.env = env
+        self.cwd = cwd
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_requests = max_requests
+        self.start_timeout = start_timeout
+        # 지표 라벨 (venv, conda, docker)
+        self.executor_type = executor_type
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._idle: Deque[PooledWorker] = collections.deque()
+        self._workers: Set[PooledWorker] = set()
+        self._closed = False
+        self._reaper: Optional[asyncio.Task] = None
+        self.spawned_total = 0
+        self.recycled_total = 0
+        self.evicted_total = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "idle": self.idle_count,
+            "busy": self.size - self.idle_count,
+            "spawned_total": self.spawned_total,
+            "recycled_total": self.recycled_total,
+            "evicted_total": self.evicted_total,
+        }
+
+    async def start(self) -> None:
+        """min_size 만큼 워커를 미리 띄워 둔다."""
+        self._ensure_reaper()
+        while self.size < self.min_size:
+            self._idle.append(await self._spawn())
+
+    async def _spawn(self) -> PooledWorker:
+        return await self._start_worker(self.command)
+
+    async def _start_worker(self, command: List[str]) -> PooledWorker:
+        with tracing.span("worker.spawn", attributes={"executor": self.executor_type}):
+            started_at = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self.env,
+                cwd=self.cwd,
+                start_new_session=True,
+            )
+            worker = PooledWorker(process)
+            try:
+                await asyncio.wait_for(worker.wait_ready(), self.start_timeout)
+            except BaseException:
+                await worker.kill()
+                raise
+        self._workers.add(worker)
+        self.spawned_total += 1
+        WORKER_SPAWN.observe(time.monotonic() - started_at, self.executor_type)
+        return worker
+
+    async def _discard(self, worker: PooledWorker) -> None:
+        self._workers.discard(worker)
+        await worker.stop()
+
+    async def acquire(self) -> PooledWorker:
+        if self._closed:
+            raise WorkerError("worker pool is closed")
+        self._ensure_reaper()
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                # LIFO: 최근에 쓴 워커를 우선 재사용해야 오래 쉰 워커가 idle 정리 대상이 된다
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                await self._discard(worker)
+            return await self._spawn()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, worker: PooledWorker, reusable: bool = True) -> None:
+        try:
+            if reusable and not self._closed and worker.alive and worker.requests_served < self.max_requests:
+                self._idle.append(worker)
+            else:
+                if worker.alive and worker.requests_served >= self.max_requests:
+                    self.recycled_total += 1
+                await self._discard(worker)
+        finally:
+            self._semaphore.release()
+
+    async def run(
+        self,
+        input_json: Any,
+        timeout: Optional[float] = None,
+        payload: Optional[bytes] = None,
+        content_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """워커 하나를 빌려 handler를 실행한다. 타임아웃 시 해당 워커는 폐기된다.
+
+        content_type 을 주면 payload 바이트를 JSON 변환 없이 handler 에 넘긴다.
+        응답의 "phases" 에 워커 확보/직렬화/handler/역직렬화/반납 시간(초)을 담는다."""
+        with tracing.span("worker.call", "client", attributes={"executor": self.executor_type}):
+            started = time.perf_counter()
+            worker = await self.acquire()
+            phases = {"acquire": time.perf_counter() - started}
+            reusable = False
+            try:
+                response = await asyncio.wait_for(worker.call(input_json, payload, content_type, phases), timeout)
+                reusable = True
+            finally:
+                released = time.perf_counter()
+                await self.release(worker, reusable)
+                phases["cleanup"] = time.perf_counter() - released
+        response["phases"] = phases
+        return response
+
+    async def run_stream(
+        self,
+        input_json: Any,
+        timeout: Optional[float] = None,
+        payload: Optional[bytes] = None,
+        content_type: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """run 의 스트리밍 버전. handler 실행 중 출력/진행 이벤트({"event": ...})를 내보내고
+        마지막으로 최종 응답을 내보낸다. 타임아웃이나 중도 종료 시 해당 워커는 폐기된다."""
+        started = time.perf_counter()
+        worker = await self.acquire()
+        phases = {"acquire": time.perf_counter() - started}
+        reusable = False
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            await worker.send(input_json, stream=True, payload=payload, content_type=content_type, phases=phases)
+            while True:
+                remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                message = await asyncio.wait_for(worker._read(), remaining)
+                if "event" not in message:
+                    worker._completed()
+                    reusable = True
+                    # 반납은 소비자가 다음 값을 요청한 뒤에 일어나므로 cleanup 은 빠진다
+                    merge_worker_timing(phases, message)
+                    message["phases"] = phases
+                    yield message
+                    return
+                yield message
+        finally:
+            await self.release(worker, reusable)
+
+    async def evict_idle(self) -> None:
+        now = time.monotonic()
+        victims = []
+        # deque 왼쪽이 가장 오래 쉰 워커
+        for worker in list(self._idle):
+            if not worker.alive:
+                victims.append(worker)
+            elif now - worker.last_used > self.idle_timeout and self.size - len(victims) > self.min_size:
+                victims.append(worker)
+        for worker in victims:
+            self._idle.remove(worker)
+        for worker in victims:
+            self.evicted_total += 1
+            await self._discard(worker)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def close(self) -> None:
+        """새 요청을 막고 쉬고 있는 워커만 내린다. 실행 중인 워커는 반납될 때 release 가 정리한다."""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        idle = list(self._idle)
+        self._idle.clear()
+        for worker in idle:
+            await self._discard(worker)
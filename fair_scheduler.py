@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+from models import Tenant
+from metrics import QUEUE_WAIT
+
+# 실행 권한 scope. 둘 다 있으면 앞쪽(execute:all)으로 분류
+EXECUTE_SCOPES = ("execute:all", "execute:limited")
+ANONYMOUS = "anonymous"
+
+def tenant_from_token(username: Optional[str], scopes: List[str]) -> Tenant:
+    scope = next((s for s in EXECUTE_SCOPES if s in scopes), None)
+    return Tenant(name=username or ANONYMOUS, scope=scope)
+
+class TenantConfig(BaseModel):
+    """테넌트(사용자 또는 scope) 하나의 가중치와 동시 실행 상한"""
+    model_config = ConfigDict(frozen=True)
+
+    weight: float = 1.0
+    # None 이면 전체 capacity 까지 쓸 수 있다
+    max_concurrency: Optional[int] = None
+
+class _TenantState:
+    def __init__(self, config: TenantConfig):
+        self.config = config
+        self.waiters: deque = deque()  # (tag, seq, future)
+        self.active = 0
+        # 마지막으로 배정한 요청의 가상 종료 시각
+        self.finish_tag = 0.0
+        self.dispatched = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+        self.run_seconds_max = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        done = max(self.dispatched - self.active, 0)
+        return {
+            "weight": self.config.weight,
+            "max_concurrency": self.config.max_concurrency,
+            "active": self.active,
+            "waiting": len(self.waiters),
+            "dispatched": self.dispatched,
+            "wait_seconds_avg": self.wait_seconds_total / self.dispatched if self.dispatched else 0.0,
+            "run_seconds_avg": self.run_seconds_total / done if done else 0.0,
+            "run_seconds_max": self.run_seconds_max,
+        }
+
+class FairScheduler:
+    """테넌트별 가중 공정 큐 (start-time fair queuing).
+
+    전체 동시 실행 수를 capacity 로 제한하고, 자리가 나면 대기 중인 테넌트 가운데 가상 시작 시각이
+    가장 이른 요청에 배정한다. 요청마다 테넌트의 가상 시각이 1/weight 씩 늘어나므로, 한 사용자가
+    배치로 수천 건을 넣어도 다른 사용자의 요청은 weight 비율만큼 사이사이에 끼어 실행된다.
+
+    key_by="user" 면 사용자별로, "scope" 면 execute:all / execute:limited 단위로 큐를 나눈다.
+    설정은 tenants[키] -> scopes[scope] -> default 순으로 찾는다.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 16,
+        key_by: str = "user",
+        default: Optional[TenantConfig] = None,
+        scopes: Optional[Dict[str, TenantConfig]] = None,
+        tenants: Optional[Dict[str, TenantConfig]] = None,
+    ):
+        if key_by not in ("user", "scope"):
+            raise ValueError(f"key_by must be 'user' or 'scope', got {key_by!r}")
+        self.capacity = capacity
+        self.key_by = key_by
+        self.default = default or TenantConfig()
+        self.scope_configs = scopes or {}
+        self.tenant_configs = tenants or {}
+        self.active = 0
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._tenants: Dict[str, _TenantState] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FairScheduler":
+        """{"capacity": 16, "key_by": "user", "default": {...}, "scopes": {...}, "tenants": {...}} 형태의 설정"""
+        default = data.get("default")
+        return cls(
+            capacity=data.get("capacity", 16),
+            key_by=data.get("key_by", "user"),
+            default=TenantConfig(**default) if default is not None else None,
+            scopes={scope: TenantConfig(**c) for scope, c in (data.get("scopes") or {}).items()},
+            tenants={name: TenantConfig(**c) for name, c in (data.get("tenants") or {}).items()},
+        )
+
+    def _state(self, tenant: Optional[Tenant]) -> _TenantState:
+        tenant = tenant or Tenant(name=ANONYMOUS)
+        key = tenant.name if self.key_by == "user" else (tenant.scope or ANONYMOUS)
+        state = self._tenants.get(key)
+        if state is None:
+            config = self.tenant_configs.get(key) or self.scope_configs.get(tenant.scope) or self.default
+            state = self._tenants[key] = _TenantState(config)
+        return state
+
+    def _dispatch(self) -> None:
+        while self.active < self.capacity:
+            best = None
+            for state in self._tenants.values():
+                if not state.waiters:
+                    continue
+                limit = state.config.max_concurrency
+                if limit is not None and state.active >= limit:
+                    continue
+                if best is None or state.waiters[0][:2] < best.waiters[0][:2]:
+                    best = state
+            if best is None:
+                return
+            tag, _, future = best.waiters.popleft()
+            self._vtime = max(self._vtime, tag)
+            best.active += 1
+            self.active += 1
+            future.set_result(None)
+
+    def _release(self, state: _TenantState) -> None:
+        state.active -= 1
+        self.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: Optional[Tenant]) -> AsyncIterator[None]:
+        state = self._state(tenant)
+        tag = max(self._vtime, state.finish_tag)
+        state.finish_tag = tag + 1.0 / max(state.config.weight, 1e-6)
+        entry = (tag, next(self._seq), asyncio.get_running_loop().create_future())
+        state.waiters.append(entry)
+        queued_at = time.monotonic()
+        self._dispatch()
+        try:
+            await entry[2]
+        except asyncio.CancelledError:
+            if entry[2].done() and not entry[2].cancelled():
+                # 자리를 배정받은 직후 취소된 경우
+                self._release(state)
+            else:
+                state.waiters.remove(entry)
+            raise
+        started_at = time.monotonic()
+        state.dispatched += 1
+        state.wait_seconds_total += started_at - queued_at
+        QUEUE_WAIT.observe(started_at - queued_at, "scheduler")
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started_at
+            state.run_seconds_total += elapsed
+            state.run_seconds_max = max(state.run_seconds_max, elapsed)
+            self._release(state)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "tenants": {key: state.stats() for key, state in self._tenants.items()},
+        }
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from models import ExecRequest, ExecResult, Job
+from executor_manager import error_result
+from execution_history import ExecutionHistory
+from metrics import QUEUE_WAIT
+import tracing
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+class JobQueueFull(Exception):
+    """대기 중인 작업 수가 max_queue_size 에 도달해 더 받을 수 없음"""
+    pass
+
+def job_from_history(row: Dict[str, Any]) -> Job:
+    """메모리에서 내려간 (또는 재시작 전의) 작업을 ExecutionHistory 레코드로 복원"""
+    finished_at = datetime.fromisoformat(row["timestamp"])
+    return Job(
+        id=row["job_id"],
+        module=row["module_name"],
+        status="succeeded" if row["exit_code"] == 0 else "failed",
+        created_at=finished_at,
+        finished_at=finished_at,
+        result=ExecResult(
+            result_json=row["result_json"],
+            exit_code=row["exit_code"],
+            stderr=row["stderr"],
+            stdout=row["stdout"],
+            duration=row["duration"],
+        ),
+        execution_id=row["id"],
+    )
+
+class JobQueue:
+    """실행이 끝날 때까지 HTTP/gRPC 연결을 붙잡지 않는 비동기 실행 큐.
+
+    submit 은 작업 id 를 바로 돌려주고, workers 개의 태스크가 크기가 제한된 큐에서 작업을 꺼내
+    ExecutorManager 로 실행한다. 대기 작업은 요청자별로 돌아가며 꺼내므로 한 사용자가 많이 넣어도
+    다른 사용자의 작업이 뒤로 밀리지 않는다. 끝난 작업의 결과는 ExecutionHistory 에 저장되고,
+    메모리에는 최근 max_finished 개만 남긴다 (그 이전 작업은 history 에서 조회).
+    """
+
+    def __init__(
+        self,
+        executor_manager,
+        history: Optional[ExecutionHistory] = None,
+        workers: int = 4,
+        max_queue_size: int = 1000,
+        job_timeout: Optional[float] = 3600.0,
+        max_finished: int = 10000,
+    ):
+        self.executor_manager = executor_manager
+        self.history = history
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        # 요청에 timeout 이 없을 때 쓸 실행 제한 시간 (동기 /run 의 executor 기본값보다 길게)
+        self.job_timeout = job_timeout
+        self.max_finished = max_finished
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._requests: Dict[str, ExecRequest] = {}
+        # 제출한 요청의 trace context. 워커 태스크는 미리 떠 있으므로 직접 넘겨 이어 붙인다
+        self._trace_parents: Dict[str, tracing.SpanContext] = {}
+        # 대기 작업 수만큼 토큰을 넣는 큐 (크기 제한/워커 깨우기용), 실제 순서는 _pending 에서 정한다
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._pending: "OrderedDict[str, deque]" = OrderedDict()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._finished: deque = deque()
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._worker_tasks:
+            self._worker_tasks = [asyncio.ensure_future(self._worker_loop()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks = self._worker_tasks + list(self._running.values())
+        self._worker_tasks = []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, request: ExecRequest) -> Job:
+        if self._queue.full():
+            raise JobQueueFull(f"job queue is full ({self.max_queue_size} pending)")
+        if request.timeout is None and self.job_timeout:
+            request = request.model_copy(update={"timeout": self.job_timeout})
+        job = Job(id=uuid.uuid4().hex, module=request.module, created_at=datetime.now())
+        self.jobs[job.id] = job
+        self._requests[job.id] = request
+        parent = tracing.current_context()
+        if parent is not None:
+            self._trace_parents[job.id] = parent
+        self._pending.setdefault(request.tenant.name if request.tenant else "", deque()).append(job.id)
+        self._queue.put_nowait(None)
+        self.start()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is not None or self.history is None:
+            return job
+        row = await asyncio.to_thread(self.history.get_execution_by_job, job_id)
+        return job_from_history(row) if row else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """대기 중이면 꺼내지 않고 버리고, 실행 중이면 실행을 취소한다 (해당 워커 프로세스는 폐기됨)."""
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        task = self._running.get(job_id)
+        self._requests.pop(job_id, None)
+        self._trace_parents.pop(job_id, None)
+        self._finish(job, "cancelled")
+        if task is not None:
+            task.cancel()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self._queue.qsize(), "running": len(self._running), "workers": len(self._worker_tasks)}
+
+    async def _worker_loop(self) -> None:
+        while True:
+            await self._queue.get()
+            job_id = self._next_pending()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"[job {job_id}] unexpected error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _next_pending(self) -> str:
+        # 요청자별 대기열을 돌아가며 하나씩 꺼낸다
+        tenant, pending = next(iter(self._pending.items()))
+        job_id = pending.popleft()
+        del self._pending[tenant]
+        if pending:
+            self._pending[tenant] = pending
+        return job_id
+
+    async def _run(self, job_id: str) -> None:
+        job = self.jobs.get(job_id)
+        request = self._requests.pop(job_id, None)
+        parent = self._trace_parents.pop(job_id, None)
+        if job is None or request is None or job.status != "queued":
+            return
+        job.status = "running"
+        job.started_at = datetime.now()
+        waited = (job.started_at - job.created_at).total_seconds()
+        QUEUE_WAIT.observe(waited, "job")
+        with tracing.span("job.run", "consumer", parent, {"job.id": job_id, "module": request.module, "queue_seconds": waited}):
+            # 태스크는 만들 때의 context 를 복사하므로 실행 span 들이 job.run 아래에 붙는다
+            task = asyncio.ensure_future(self.executor_manager.execute(request))
+            self._running[job_id] = task
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                if job.status == "cancelled":
+                    return
+                raise
+            except Exception as e:
+                result = error_result(f"Error executing module: {str(e)}")
+            finally:
+                self._running.pop(job_id, None)
+        if self.history is not None:
+            try:
+                job.execution_id = await asyncio.to_thread(
+                    self.history.record_execution, request.module, request.input_json, result, job_id
+                )
+            except Exception as e:
+                logging.warning(f"[job {job_id}] failed to record execution: {e}")
+        job.result = result
+        self._finish(job, "succeeded" if result.exit_code == 0 else "failed")
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = datetime.now()
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished:
+            self.jobs.pop(self._finished.popleft(), None)
@@ -2,15 +2,23 @@ import asyncio
 import argparse
 from core.db import init_engine, get_sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
-from module_registry import ModuleRegistry
+from module_registry import ModuleRegistry, module_cache
 from executor_manager import ExecutorManager
+from admission import AdmissionController
+from fair_scheduler import FairScheduler
 from executors.inline import InlineExecutor
 from executors.venv import VenvExecutor
 from executors.conda import CondaExecutor
-from executors.docker import DockerExecutor
+from executors.conda_envs import CondaEnvIndex
+from executors.docker import DockerExecutor, DockerPoolConfig
 from api.rest import app as rest_app
 from api.grpc_server import serve as serve_grpc
+from execution_history import ExecutionHistory
+from retention import RetentionService
+from job_queue import JobQueue
+import tracing
 import uvicorn
+import yaml
 
 async def main():
     parser = argparse.ArgumentParser(description="Operato Runner")
@@ -20,23 +28,102 @@ async def main():
     parser.add_argument("--venv-path", default="./module_envs", help="Path to virtual environments")
     parser.add_argument("--no-rest", action="store_true", help="Disable REST API")
     parser.add_argument("--no-grpc", action="store_true", help="Disable gRPC server")
+    parser.add_argument("--worker-pool-min", type=int, default=0, help="Warm worker processes kept per module")
+    parser.add_argument("--worker-pool-max", type=int, default=4, help="Max worker processes per module")
+    parser.add_argument("--worker-idle-timeout", type=float, default=300.0, help="Seconds before an idle worker is evicted")
+    parser.add_argument("--worker-max-requests", type=int, default=1000, help="Requests served before a worker is recycled")
+    parser.add_argument("--module-cache-ttl", type=float, default=30.0, help="Seconds to cache module/active-version lookups (0 disables)")
+    parser.add_argument("--conda-refresh-interval", type=float, default=300.0, help="Seconds between background conda env index refreshes")
+    parser.add_argument("--job-workers", type=int, default=4, help="Concurrent executions for asynchronous jobs")
+    parser.add_argument("--job-queue-size", type=int, default=1000, help="Max pending asynchronous jobs before submissions are rejected")
+    parser.add_argument("--job-timeout", type=float, default=3600.0, help="Default time limit in seconds for asynchronous jobs")
+    parser.add_argument("--history-db", default="./executions.db", help="SQLite file for execution history (job results)")
+    parser.add_argument("--admission-config", help="YAML/JSON file with per-module / per-environment concurrency limits")
+    parser.add_argument("--scheduler-config", help="YAML/JSON file enabling weighted fair scheduling across users/scopes")
+    parser.add_argument("--docker-pool-config", help="YAML/JSON file with warm container pool settings (default + per-module overrides)")
+    parser.add_argument("--trace-file", help="Append trace spans as OTLP/JSON lines to this file")
+    parser.add_argument("--otlp-endpoint", help="Send trace spans to an OTLP/HTTP collector (e.g. http://localhost:4318/v1/traces)")
+    parser.add_argument("--retention-config", help="YAML/JSON file with retention policies for execution history and log tables")
+    parser.add_argument("--trace-sample-ratio", type=float, default=1.0, help="Fraction of new traces to record (incoming traceparent flags win)")
     args = parser.parse_args()
 
+    module_cache.ttl = args.module_cache_ttl
+    docker_pool_config = {}
+    if args.docker_pool_config:
+        with open(args.docker_pool_config, "r", encoding="utf-8") as f:
+            docker_pool_config = yaml.safe_load(f) or {}
+    admission = None
+    if args.admission_config:
+        with open(args.admission_config, "r", encoding="utf-8") as f:
+            admission = AdmissionController.from_dict(yaml.safe_load(f) or {})
+    scheduler = None
+    if args.scheduler_config:
+        with open(args.scheduler_config, "r", encoding="utf-8") as f:
+            scheduler = FairScheduler.from_dict(yaml.safe_load(f) or {})
+    retention_config = None
+    if args.retention_config:
+        with open(args.retention_config, "r", encoding="utf-8") as f:
+            retention_config = yaml.safe_load(f) or {}
+    if args.otlp_endpoint:
+        tracing.tracer.configure(tracing.OtlpHttpExporter(args.otlp_endpoint), sample_ratio=args.trace_sample_ratio)
+    elif args.trace_file:
+        tracing.tracer.configure(tracing.JsonlFileExporter(args.trace_file), sample_ratio=args.trace_sample_ratio)
+
     # DB 엔진 초기화
     init_engine()
     async_session = get_sessionmaker()
 
     async with async_session() as db:
         module_registry = ModuleRegistry(db)
-        executor_manager = ExecutorManager(module_registry)
+        executor_manager = ExecutorManager(module_registry, admission=admission, scheduler=scheduler)
         executor_manager.register_executor("inline", InlineExecutor(module_registry))
-        executor_manager.register_executor("venv", VenvExecutor(venv_path=args.venv_path, module_registry=module_registry))
-        executor_manager.register_executor("conda", CondaExecutor(module_registry))
-        executor_manager.register_executor("docker", DockerExecutor(module_registry))
+        executor_manager.register_executor("venv", VenvExecutor(
+            venv_path=args.venv_path,
+            module_registry=module_registry,
+            pool_min_size=args.worker_pool_min,
+            pool_max_size=args.worker_pool_max,
+            pool_idle_timeout=args.worker_idle_timeout,
+            pool_max_requests=args.worker_max_requests,
+        ))
+        conda_executor = CondaExecutor(
+            module_registry,
+            env_index=CondaEnvIndex(refresh_interval=args.conda_refresh_interval),
+            pool_min_size=args.worker_pool_min,
+            pool_max_size=args.worker_pool_max,
+            pool_idle_timeout=args.worker_idle_timeout,
+            pool_max_requests=args.worker_max_requests,
+        )
+        # conda 환경 인덱스를 백그라운드에서 만들고 주기적으로 갱신
+        conda_executor.env_index.start()
+        executor_manager.register_executor("conda", conda_executor)
+        executor_manager.register_executor("docker", DockerExecutor(
+            module_registry,
+            pool_config=DockerPoolConfig(**docker_pool_config.get("default", {})),
+            module_pool_configs=docker_pool_config.get("modules", {}),
+        ))
+        module_registry.executor_manager = executor_manager
+        # 오래 걸리는 실행은 작업 큐로 받아 연결을 붙잡지 않는다
+        history = ExecutionHistory(args.history_db)
+        job_queue = JobQueue(
+            executor_manager,
+            history=history,
+            workers=args.job_workers,
+            max_queue_size=args.job_queue_size,
+            job_timeout=args.job_timeout,
+        )
+        job_queue.start()
+        retention = None
+        if retention_config is not None:
+            # 오래된 실행 이력/로그를 주기적으로 지워 DB 크기를 일정하게 유지
+            retention = RetentionService.from_dict(retention_config, history=history, sessionmaker=async_session)
+            retention.start()
 
         # FastAPI 앱에 context 주입
         rest_app.state.module_registry = module_registry
         rest_app.state.executor_manager = executor_manager
+        rest_app.state.job_queue = job_queue
+        rest_app.state.history = history
+        rest_app.state.retention = retention
 
         grpc_server = None
         grpc_task = None
@@ -45,7 +132,7 @@ async def main():
         try:
             loop = asyncio.get_running_loop()
             if not args.no_grpc:
-                grpc_server = serve_grpc(module_registry, executor_manager, port=args.grpc_port)
+                grpc_server = serve_grpc(module_registry, executor_manager, port=args.grpc_port, job_queue=job_queue)
                 await grpc_server.start()
                 print(f"gRPC server started on port {args.grpc_port}")
                 grpc_task = loop.create_task(grpc_server.wait_for_termination())
@@ -68,6 +155,16 @@ async def main():
                 if t is not None and not t.done():
                     t.cancel()
             await asyncio.sleep(0.1)
+        finally:
+            # 진행 중인 작업과 상주 워커 프로세스 등 executor 리소스 정리
+            await job_queue.stop()
+            if retention is not None:
+                await retention.stop()
+            # 쓰기 큐에 남은 실행 이력을 마저 기록
+            await asyncio.to_thread(history.close)
+            await executor_manager.cleanup()
+            # 남은 span 을 내보낸다
+            tracing.tracer.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Prometheus 텍스트 형식(/metrics)으로 내보내는 가벼운 카운터/히스토그램.
+
+prometheus_client 없이 이벤트 루프 안에서만 갱신하므로 잠금 없이 dict 갱신 한 번으로 기록한다.
+워커 수, 캐시 적중률처럼 이미 다른 곳에서 세고 있는 값은 수집 시점에 읽어 온다 (render).
+"""
+import math
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 초 단위. 인라인 실행(ms 이하)부터 장시간 작업까지
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: Any) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 -> [버킷별 개수(누적 아님)..., +Inf 개수, 합계]
+        self._series: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labelvalues: Any) -> int:
+        series = self._series.get(labelvalues)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labelvalues, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+def _family(kind: str, name: str, help: str, labelnames: Sequence[str], samples: Iterable[Tuple[Sequence[Any], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labelvalues, value in samples:
+        lines.append(f"{name}{_labels(labelnames, labelvalues)} {_number(value)}")
+    return lines
+
+EXECUTION_DURATION = Histogram(
+    "operato_execution_duration_seconds",
+    "Module execution time (excluding queue wait) by module, executor type and exit code",
+    ("module", "executor", "exit_code"),
+)
+QUEUE_WAIT = Histogram(
+    "operato_queue_wait_seconds",
+    "Time an execution waited before running (scheduler, admission or job queue)",
+    ("stage",),
+)
+ADMISSION_REJECTED = Counter(
+    "operato_admission_rejected_total",
+    "Executions rejected because a concurrency limit and its wait queue were full",
+    ("limit",),
+)
+MODULE_LOOKUP = Histogram(
+    "operato_module_lookup_seconds",
+    "Module/active version lookup time (cache or database)",
+)
+WORKER_SPAWN = Histogram(
+    "operato_worker_spawn_seconds",
+    "Time to start a worker process or container until it reports ready",
+    ("executor",),
+)
+
+METRICS = [EXECUTION_DURATION, QUEUE_WAIT, ADMISSION_REJECTED, MODULE_LOOKUP, WORKER_SPAWN]
+
+def render(executor_manager: Optional[Any] = None, job_queue: Optional[Any] = None) -> str:
+    """등록된 지표와 수집 시점의 캐시/워커/대기열 상태를 Prometheus 텍스트 형식으로 만든다."""
+    # 순환 import 를 피하려고 여기서 가져온다
+    from module_registry import module_cache
+    from executors.code_cache import code_cache
+
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    caches = {"module": module_cache.stats(), "code": code_cache.stats()}
+    lines.extend(_family("counter", "operato_cache_hits_total", "Cache hits", ("cache",),
+                         (((name,), stats["hits"]) for name, stats in caches.items())))
+    lines.extend(_family("counter", "operato_cache_misses_total", "Cache misses", ("cache",),
+                         (((name,), stats["misses"]) for name, stats in caches.items())))
+    lines.extend(_family("gauge", "operato_cache_entries", "Entries currently cached", ("cache",),
+                         (((name,), stats["size"]) for name, stats in caches.items())))
+
+    if executor_manager is not None:
+        workers = []
+        spawned = []
+        for env, details in executor_manager.describe_environments().items():
+            for pool, stats in (details.get("pools") or {}).items():
+                workers.append(((env, pool, "busy"), stats.get("busy", 0)))
+                workers.append(((env, pool, "idle"), stats.get("idle", 0)))
+                spawned.append(((env, pool), stats.get("spawned_total", 0)))
+        lines.extend(_family("gauge", "operato_workers", "Warm worker processes/containers by state", ("executor", "pool", "state"), workers))
+        lines.extend(_family("counter", "operato_workers_spawned_total", "Worker processes/containers started", ("executor", "pool"), spawned))
+
+        admission = executor_manager.describe_admission()
+        limits = [((f"{kind[:-1]}:{name}",), stats) for kind in ("modules", "envs") for name, stats in admission.get(kind, {}).items()]
+        lines.extend(_family("gauge", "operato_admission_active", "Executions holding an admission slot", ("limit",),
+                             ((labels, stats["active"]) for labels, stats in limits)))
+        lines.extend(_family("gauge", "operato_admission_waiting", "Executions waiting for an admission slot", ("limit",),
+                             ((labels, stats["waiting"]) for labels, stats in limits)))
+
+        tenants = executor_manager.describe_scheduler().get("tenants", {})
+        lines.extend(_family("gauge", "operato_scheduler_active", "Executions running per tenant", ("tenant",),
+                             (((name,), stats["active"]) for name, stats in tenants.items())))
+        lines.extend(_family("gauge", "operato_scheduler_waiting", "Executions waiting per tenant", ("tenant",),
+                             (((name,), stats["waiting"]) for name, stats in tenants.items())))
+
+    if job_queue is not None:
+        jobs = job_queue.stats()
+        lines.extend(_family("gauge", "operato_jobs", "Asynchronous jobs by state", ("state",),
+                             ((("queued",), jobs["queued"]), (("running",), jobs["running"]))))
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,4 @@
-from .module import ModuleSchema, Module, ExecRequest, ExecResult
+from .module import ModuleSchema, Module, ModuleRecord, ExecContext, ExecRequest, ExecResult, ExecEvent, Job, Tenant
 from .version import Version
 from .deployment import Deployment
 from .role import user_role
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+import logging
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, event, func
+from sqlalchemy.exc import OperationalError
 from .base import Base
 
 class ErrorLog(Base):
     __tablename__ = 'error_log'
+    # 키셋 페이지네이션 (created_at, id)
+    __table_args__ = (Index('idx_error_log_created_at_id', 'created_at', 'id'),)
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(64), nullable=False)
     message = Column(Text, nullable=False)
@@ -10,4 +14,45 @@ class ErrorLog(Base):
     url = Column(String(255), nullable=True)
     stack = Column(Text, nullable=True)
     user = Column(String(64), nullable=True)
-    created_at = Column(DateTime, server_default=func.now(), nullable=False) 
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+# keyword 검색용 전문 색인. 트리거(sqlite)/생성 컬럼(PostgreSQL)이라 어느 경로로 쓰든 error_log 와 함께 갱신된다.
+# alembic 마이그레이션(8f4b2c6d1e93)에 같은 DDL 을 복사해 두었다.
+ERROR_LOG_FTS = 'error_log_fts'
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS error_log_fts USING fts5("
+    "message, dev_message, stack, content='error_log', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS error_log_fts_insert AFTER INSERT ON error_log BEGIN "
+    "INSERT INTO error_log_fts(rowid, message, dev_message, stack) VALUES (new.id, new.message, new.dev_message, new.stack); END",
+    "CREATE TRIGGER IF NOT EXISTS error_log_fts_delete AFTER DELETE ON error_log BEGIN "
+    "INSERT INTO error_log_fts(error_log_fts, rowid, message, dev_message, stack) "
+    "VALUES ('delete', old.id, old.message, old.dev_message, old.stack); END",
+    "CREATE TRIGGER IF NOT EXISTS error_log_fts_update AFTER UPDATE OF message, dev_message, stack ON error_log BEGIN "
+    "INSERT INTO error_log_fts(error_log_fts, rowid, message, dev_message, stack) "
+    "VALUES ('delete', old.id, old.message, old.dev_message, old.stack); "
+    "INSERT INTO error_log_fts(rowid, message, dev_message, stack) VALUES (new.id, new.message, new.dev_message, new.stack); END",
+    # 이미 있던 행까지 색인
+    "INSERT INTO error_log_fts(error_log_fts) VALUES ('rebuild')",
+]
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE error_log ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(message, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(dev_message, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(stack, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_error_log_search_vector ON error_log USING GIN (search_vector)",
+]
+
+@event.listens_for(ErrorLog.__table__, "after_create")
+def create_search_index(target, connection, **kw):
+    statements = {"sqlite": SQLITE_SEARCH_DDL, "postgresql": POSTGRES_SEARCH_DDL}.get(connection.dialect.name, [])
+    try:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+    except OperationalError as e:
+        # FTS5 없이 빌드된 sqlite. keyword 검색은 LIKE 로 돌아간다
+        logging.warning(f"error_log full-text index unavailable: {e}")
+
+@event.listens_for(ErrorLog.__table__, "after_drop")
+def drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {ERROR_LOG_FTS}")
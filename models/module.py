@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
 from sqlalchemy.orm import relationship
 from .base import Base
-from pydantic import BaseModel, Field, ValidationError, StrictStr
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, StrictStr
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
@@ -19,9 +19,21 @@ class ModuleSchema(BaseModel):
     def __str__(self) -> str:
         return f"Module({self.name}, {self.env}, v{self.version})"
 
+class Tenant(BaseModel):
+    """실행을 요청한 사용자와 실행 권한 scope (공정 스케줄링 단위)"""
+    name: str
+    scope: Optional[str] = None  # execute:all | execute:limited
+
 class ExecRequest(BaseModel):
     module: str  # module name
     input_json: Dict[str, Any]
+    # JSON 을 거치지 않고 handler 에 그대로 넘기는 바이너리 입력 (msgpack, Arrow IPC, 이미지 등)
+    payload: Optional[bytes] = None
+    content_type: Optional[str] = None
+    # executor 기본 타임아웃 대신 쓸 실행 제한 시간(초). 비동기 작업처럼 오래 걸리는 실행용
+    timeout: Optional[float] = None
+    # 요청자. 없으면 익명 테넌트로 스케줄링
+    tenant: Optional[Tenant] = None
 
 class ExecResult(BaseModel):
     result_json: Dict[str, Any]
@@ -29,6 +41,107 @@ class ExecResult(BaseModel):
     stderr: Optional[str] = None
     stdout: Optional[str] = None
     duration: float  # seconds
+    # handler 가 bytes/Payload 를 반환한 경우의 바이너리 결과
+    payload: Optional[bytes] = None
+    content_type: Optional[str] = None
+    # 단계별 소요 시간(초): lookup, validate, queue, acquire, serialize, handler, deserialize, cleanup 등
+    phases: Optional[Dict[str, float]] = None
+
+class ExecEvent(BaseModel):
+    """스트리밍 실행 이벤트. 출력 조각/진행 상황을 내보내고 마지막에 type="result" 로 끝난다."""
+    type: str  # stdout | stderr | progress | result
+    data: str = ""  # 출력 조각 또는 진행 메시지
+    progress: Optional[float] = None
+    result: Optional[ExecResult] = None
+
+class Job(BaseModel):
+    """비동기 실행 작업. 제출 즉시 id 를 돌려주고 상태/결과는 나중에 조회한다."""
+    id: str
+    module: str
+    status: str = "queued"  # queued | running | succeeded | failed | cancelled
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[ExecResult] = None
+    # 결과가 저장된 ExecutionHistory 레코드 id
+    execution_id: Optional[int] = None
+
+class ModuleRecord(BaseModel):
+    """모듈 + 활성 버전 정보를 한 번에 담은 읽기 전용 스냅샷 (세션과 무관하게 캐시 가능)"""
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    name: str
+    env: str
+    code: Optional[str] = None  # 활성 버전 코드, 없으면 modules.code
+    path: Optional[str] = None
+    artifact_type: Optional[str] = None
+    artifact_uri: Optional[str] = None
+    version: Optional[str] = None  # 활성 버전, 없으면 modules.version
+    version_id: Optional[int] = None  # 활성 deployment 의 versions.id
+    description: Optional[str] = None
+    tags: List[str] = []
+    is_active: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_orm_rows(cls, module: "Module", active_version=None) -> "ModuleRecord":
+        tags = module.tags
+        if isinstance(tags, str):
+            tags = [t for t in tags.split(",") if t]
+        return cls(
+            id=module.id,
+            name=module.name,
+            env=module.env,
+            code=(active_version.code if active_version is not None and active_version.code else module.code),
+            path=module.path,
+            artifact_type=module.artifact_type,
+            artifact_uri=module.artifact_uri,
+            version=active_version.version if active_version is not None else module.version,
+            version_id=active_version.id if active_version is not None else None,
+            description=(active_version.description if active_version is not None and active_version.description else module.description),
+            tags=tags or [],
+            is_active=module.is_active,
+            created_at=module.created_at,
+        )
+
+class ExecContext(BaseModel):
+    """ExecutorManager 가 요청마다 한 번만 조회해서 validate/execute 에 넘기는 실행 컨텍스트"""
+    model_config = ConfigDict(frozen=True)
+
+    module: ModuleRecord
+
+    @property
+    def name(self) -> str:
+        return self.module.name
+
+    @property
+    def env(self) -> str:
+        return self.module.env
+
+    @property
+    def code(self) -> Optional[str]:
+        return self.module.code
+
+    @property
+    def path(self) -> Optional[str]:
+        return self.module.path
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.module.version
+
+    @property
+    def version_id(self) -> Optional[int]:
+        return self.module.version_id
+
+    @property
+    def artifact_type(self) -> Optional[str]:
+        return self.module.artifact_type
+
+    @property
+    def artifact_uri(self) -> Optional[str]:
+        return self.module.artifact_uri
 
 class Module(Base):
     __tablename__ = 'modules'
@@ -1,18 +1,96 @@
-from typing import List, Optional
-from models.module import Module
+from typing import Any, Dict, List, Optional, Tuple
+from models.module import Module, ModuleRecord
+from models.version import Version
+from models.deployment import Deployment
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
-import os, shutil
+from sqlalchemy import update, delete, and_
+import os, shutil, time
+import tracing
+
+class ModuleCache:
+    """모듈명 -> ModuleRecord TTL 캐시.
+
+    REST/gRPC/executor 가 요청마다 modules/versions/deployments 를 다시 조회하지 않도록
+    프로세스 전역으로 공유한다. 등록/삭제/활성화/롤백 시 invalidate 로 즉시 비운다.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[float, ModuleRecord]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str) -> Optional[ModuleRecord]:
+        entry = self._entries.get(name)
+        if entry is not None:
+            expires_at, record = entry
+            if time.monotonic() < expires_at:
+                self.hits += 1
+                return record
+            del self._entries[name]
+        self.misses += 1
+        return None
+
+    def put(self, record: ModuleRecord) -> None:
+        if self.ttl <= 0:
+            return
+        if len(self._entries) >= self.max_size and record.name not in self._entries:
+            # 가장 먼저 만료될 항목부터 제거
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
+        self._entries[record.name] = (time.monotonic() + self.ttl, record)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+# REST(요청별 ModuleRegistry), gRPC, executor 가 함께 쓰는 캐시
+module_cache = ModuleCache()
 
 class ModuleRegistry:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: Optional[ModuleCache] = None):
         self.db = db
+        self.cache = cache if cache is not None else module_cache
 
     async def get_module(self, name: str) -> Optional[Module]:
         result = await self.db.execute(select(Module).where(Module.name == name))
         return result.scalars().first()
 
+    async def resolve_module(self, name: str) -> Optional[ModuleRecord]:
+        """모듈과 활성 버전을 캐시 또는 단일 쿼리로 조회해 스냅샷으로 반환"""
+        record = self.cache.get(name)
+        if record is not None:
+            return record
+        # 캐시 miss 일 때만 남으므로 trace 에서 DB 조회 여부가 보인다
+        with tracing.span("module_registry.query", "client", attributes={"module": name, "db.system": "sql"}):
+            result = await self.db.execute(
+                select(Module, Version)
+                .outerjoin(Deployment, and_(Deployment.module_id == Module.id, Deployment.status == "active"))
+                .outerjoin(Version, Version.id == Deployment.version_id)
+                .where(Module.name == name)
+                # 장기 세션(main.py)에서도 identity map 의 오래된 값 대신 DB 값을 읽도록
+                .execution_options(populate_existing=True)
+            )
+            row = result.first()
+        if row is None:
+            return None
+        record = ModuleRecord.from_orm_rows(row[0], row[1])
+        self.cache.put(record)
+        return record
+
     async def list_modules(self) -> List[Module]:
         result = await self.db.execute(select(Module))
         return result.scalars().all()
@@ -27,6 +105,7 @@ class ModuleRegistry:
         else:
             self.db.add(module)
             await self.db.commit()
+        self.cache.invalidate(module.name)
 
     async def delete_module(self, name: str) -> bool:
         result = await self.db.execute(select(Module).where(Module.name == name))
@@ -37,9 +116,9 @@ class ModuleRegistry:
                 venv_dir = os.path.abspath(os.path.join("module_envs", name, "venv"))
                 module_env_dir = os.path.abspath(os.path.join("module_envs", name))
                 modules_dir = os.path.abspath(os.path.join("modules", name))
-                # 1. venv 프로세스 종료 (ExecutorManager가 있으면 활용)
+                # 1. venv 워커 프로세스 종료 (ExecutorManager가 있으면 활용)
                 if hasattr(self, "executor_manager") and self.executor_manager:
-                    await self.executor_manager.cleanup_module_venv(name)
+                    await self.executor_manager.invalidate_module(name)
                 # 2. venv 폴더 삭제
                 if os.path.exists(module_env_dir):
                     try:
@@ -55,6 +134,7 @@ class ModuleRegistry:
             await self.db.delete(module)
             await self.db.flush()  # 자식 레코드 삭제 보장
             await self.db.commit()
+            self.cache.invalidate(name)
             return True
         return False
 
@@ -24,31 +24,51 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0e\x65xecutor.proto\x12\x0eoperato.runner\"1\n\x0b\x45xecRequest\x12\x0e\n\x06module\x18\x01 \x01(\t\x12\x12\n\njson_input\x18\x02 \x01(\t\"c\n\x0c\x45xecResponse\x12\x0e\n\x06result\x18\x01 \x01(\t\x12\x11\n\texit_code\x18\x02 \x01(\x05\x12\x0e\n\x06stderr\x18\x03 \x01(\t\x12\x0e\n\x06stdout\x18\x04 \x01(\t\x12\x10\n\x08\x64uration\x18\x05 \x01(\x01\"\x14\n\x12ListModulesRequest\"B\n\x13ListModulesResponse\x12+\n\x07modules\x18\x01 \x03(\x0b\x32\x1a.operato.runner.ModuleInfo\" \n\x10GetModuleRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"Z\n\nModuleInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0b\n\x03\x65nv\x18\x02 \x01(\t\x12\x0f\n\x07version\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t\x12\x0c\n\x04tags\x18\x05 \x03(\t\"m\n\x15RegisterModuleRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0b\n\x03\x65nv\x18\x02 \x01(\t\x12\x0c\n\x04\x63ode\x18\x03 \x01(\t\x12\x0c\n\x04path\x18\x04 \x01(\t\x12\x0f\n\x07version\x18\x05 \x01(\t\x12\x0c\n\x04tags\x18\x06 \x03(\t\"#\n\x13\x44\x65leteModuleRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"\'\n\x14\x44\x65leteModuleResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32\xa3\x03\n\x08\x45xecutor\x12\x44\n\x07\x45xecute\x12\x1b.operato.runner.ExecRequest\x1a\x1c.operato.runner.ExecResponse\x12V\n\x0bListModules\x12\".operato.runner.ListModulesRequest\x1a#.operato.runner.ListModulesResponse\x12I\n\tGetModule\x12 .operato.runner.GetModuleRequest\x1a\x1a.operato.runner.ModuleInfo\x12S\n\x0eRegisterModule\x12%.operato.runner.RegisterModuleRequest\x1a\x1a.operato.runner.ModuleInfo\x12Y\n\x0c\x44\x65leteModule\x12#.operato.runner.DeleteModuleRequest\x1a$.operato.runner.DeleteModuleResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0e\x65xecutor.proto\x12\x0eoperato.runner\"i\n\x0b\x45xecRequest\x12\x0e\n\x06module\x18\x01 \x01(\t\x12\x12\n\njson_input\x18\x02 \x01(\t\x12\x0f\n\x07payload\x18\x03 \x01(\x0c\x12\x14\n\x0c\x63ontent_type\x18\x04 \x01(\t\x12\x0f\n\x07timeout\x18\x05 \x01(\x01\"\xf3\x01\n\x0c\x45xecResponse\x12\x0e\n\x06result\x18\x01 \x01(\t\x12\x11\n\texit_code\x18\x02 \x01(\x05\x12\x0e\n\x06stderr\x18\x03 \x01(\t\x12\x0e\n\x06stdout\x18\x04 \x01(\t\x12\x10\n\x08\x64uration\x18\x05 \x01(\x01\x12\x0f\n\x07payload\x18\x06 \x01(\x0c\x12\x14\n\x0c\x63ontent_type\x18\x07 \x01(\t\x12\x38\n\x06phases\x18\x08 \x03(\x0b\x32(.operato.runner.ExecResponse.PhasesEntry\x1a-\n\x0bPhasesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\".\n\x0c\x45xecProgress\x12\r\n\x05value\x18\x01 \x01(\x01\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x9a\x01\n\tExecEvent\x12\x10\n\x06stdout\x18\x01 \x01(\tH\x00\x12\x10\n\x06stderr\x18\x02 \x01(\tH\x00\x12\x30\n\x08progress\x18\x03 \x01(\x0b\x32\x1c.operato.runner.ExecProgressH\x00\x12.\n\x06result\x18\x04 \x01(\x0b\x32\x1c.operato.runner.ExecResponseH\x00\x42\x07\n\x05\x65vent\"h\n\x0f\x45xecManyRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06module\x18\x02 \x01(\t\x12\x12\n\njson_input\x18\x03 \x01(\t\x12\x0f\n\x07payload\x18\x04 \x01(\x0c\x12\x14\n\x0c\x63ontent_type\x18\x05 \x01(\t\"N\n\x10\x45xecManyResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12.\n\x08response\x18\x02 \x01(\x0b\x32\x1c.operato.runner.ExecResponse\"]\n\x10\x45xecBatchRequest\x12\x0e\n\x06module\x18\x01 \x01(\t\x12\x13\n\x0bjson_inputs\x18\x02 \x03(\t\x12\x13\n\x0b\x63oncurrency\x18\x03 \x01(\x05\x12\x0f\n\x07ordered\x18\x04 \x01(\x08\"N\n\rExecBatchItem\x12\r\n\x05index\x18\x01 \x01(\x05\x12.\n\x08response\x18\x02 \x01(\x0b\x32\x1c.operato.runner.ExecResponse\"\x18\n\nJobRequest\x12\n\n\x02id\x18\x01 \x01(\t\"}\n\tJobStatus\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06module\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12.\n\x08response\x18\x04 \x01(\x0b\x32\x1c.operato.runner.ExecResponse\x12\x14\n\x0c\x65xecution_id\x18\x05 \x01(\x03\"\x14\n\x12ListModulesRequest\"B\n\x13ListModulesResponse\x12+\n\x07modules\x18\x01 \x03(\x0b\x32\x1a.operato.runner.ModuleInfo\" \n\x10GetModuleRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"Z\n\nModuleInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0b\n\x03\x65nv\x18\x02 \x01(\t\x12\x0f\n\x07version\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t\x12\x0c\n\x04tags\x18\x05 \x03(\t\"m\n\x15RegisterModuleRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0b\n\x03\x65nv\x18\x02 \x01(\t\x12\x0c\n\x04\x63ode\x18\x03 \x01(\t\x12\x0c\n\x04path\x18\x04 \x01(\t\x12\x0f\n\x07version\x18\x05 \x01(\t\x12\x0c\n\x04tags\x18\x06 \x03(\t\"#\n\x13\x44\x65leteModuleRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"\'\n\x14\x44\x65leteModuleResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32\xe1\x06\n\x08\x45xecutor\x12\x44\n\x07\x45xecute\x12\x1b.operato.runner.ExecRequest\x1a\x1c.operato.runner.ExecResponse\x12Q\n\x0c\x45xecuteBatch\x12 .operato.runner.ExecBatchRequest\x1a\x1d.operato.runner.ExecBatchItem0\x01\x12I\n\rExecuteStream\x12\x1b.operato.runner.ExecRequest\x1a\x19.operato.runner.ExecEvent0\x01\x12T\n\x0b\x45xecuteMany\x12\x1f.operato.runner.ExecManyRequest\x1a .operato.runner.ExecManyResponse(\x01\x30\x01\x12\x43\n\tSubmitJob\x12\x1b.operato.runner.ExecRequest\x1a\x19.operato.runner.JobStatus\x12?\n\x06GetJob\x12\x1a.operato.runner.JobRequest\x1a\x19.operato.runner.JobStatus\x12\x42\n\tCancelJob\x12\x1a.operato.runner.JobRequest\x1a\x19.operato.runner.JobStatus\x12V\n\x0bListModules\x12\".operato.runner.ListModulesRequest\x1a#.operato.runner.ListModulesResponse\x12I\n\tGetModule\x12 .operato.runner.GetModuleRequest\x1a\x1a.operato.runner.ModuleInfo\x12S\n\x0eRegisterModule\x12%.operato.runner.RegisterModuleRequest\x1a\x1a.operato.runner.ModuleInfo\x12Y\n\x0c\x44\x65leteModule\x12#.operato.runner.DeleteModuleRequest\x1a$.operato.runner.DeleteModuleResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'executor_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_EXECRESPONSE_PHASESENTRY']._loaded_options = None
+  _globals['_EXECRESPONSE_PHASESENTRY']._serialized_options = b'8\001'
   _globals['_EXECREQUEST']._serialized_start=34
-  _globals['_EXECREQUEST']._serialized_end=83
-  _globals['_EXECRESPONSE']._serialized_start=85
-  _globals['_EXECRESPONSE']._serialized_end=184
-  _globals['_LISTMODULESREQUEST']._serialized_start=186
-  _globals['_LISTMODULESREQUEST']._serialized_end=206
-  _globals['_LISTMODULESRESPONSE']._serialized_start=208
-  _globals['_LISTMODULESRESPONSE']._serialized_end=274
-  _globals['_GETMODULEREQUEST']._serialized_start=276
-  _globals['_GETMODULEREQUEST']._serialized_end=308
-  _globals['_MODULEINFO']._serialized_start=310
-  _globals['_MODULEINFO']._serialized_end=400
-  _globals['_REGISTERMODULEREQUEST']._serialized_start=402
-  _globals['_REGISTERMODULEREQUEST']._serialized_end=511
-  _globals['_DELETEMODULEREQUEST']._serialized_start=513
-  _globals['_DELETEMODULEREQUEST']._serialized_end=548
-  _globals['_DELETEMODULERESPONSE']._serialized_start=550
-  _globals['_DELETEMODULERESPONSE']._serialized_end=589
-  _globals['_EXECUTOR']._serialized_start=592
-  _globals['_EXECUTOR']._serialized_end=1011
+  _globals['_EXECREQUEST']._serialized_end=139
+  _globals['_EXECRESPONSE']._serialized_start=142
+  _globals['_EXECRESPONSE']._serialized_end=385
+  _globals['_EXECRESPONSE_PHASESENTRY']._serialized_start=340
+  _globals['_EXECRESPONSE_PHASESENTRY']._serialized_end=385
+  _globals['_EXECPROGRESS']._serialized_start=387
+  _globals['_EXECPROGRESS']._serialized_end=433
+  _globals['_EXECEVENT']._serialized_start=436
+  _globals['_EXECEVENT']._serialized_end=590
+  _globals['_EXECMANYREQUEST']._serialized_start=592
+  _globals['_EXECMANYREQUEST']._serialized_end=696
+  _globals['_EXECMANYRESPONSE']._serialized_start=698
+  _globals['_EXECMANYRESPONSE']._serialized_end=776
+  _globals['_EXECBATCHREQUEST']._serialized_start=778
+  _globals['_EXECBATCHREQUEST']._serialized_end=871
+  _globals['_EXECBATCHITEM']._serialized_start=873
+  _globals['_EXECBATCHITEM']._serialized_end=951
+  _globals['_JOBREQUEST']._serialized_start=953
+  _globals['_JOBREQUEST']._serialized_end=977
+  _globals['_JOBSTATUS']._serialized_start=979
+  _globals['_JOBSTATUS']._serialized_end=1104
+  _globals['_LISTMODULESREQUEST']._serialized_start=1106
+  _globals['_LISTMODULESREQUEST']._serialized_end=1126
+  _globals['_LISTMODULESRESPONSE']._serialized_start=1128
+  _globals['_LISTMODULESRESPONSE']._serialized_end=1194
+  _globals['_GETMODULEREQUEST']._serialized_start=1196
+  _globals['_GETMODULEREQUEST']._serialized_end=1228
+  _globals['_MODULEINFO']._serialized_start=1230
+  _globals['_MODULEINFO']._serialized_end=1320
+  _globals['_REGISTERMODULEREQUEST']._serialized_start=1322
+  _globals['_REGISTERMODULEREQUEST']._serialized_end=1431
+  _globals['_DELETEMODULEREQUEST']._serialized_start=1433
+  _globals['_DELETEMODULEREQUEST']._serialized_end=1468
+  _globals['_DELETEMODULERESPONSE']._serialized_start=1470
+  _globals['_DELETEMODULERESPONSE']._serialized_end=1509
+  _globals['_EXECUTOR']._serialized_start=1512
+  _globals['_EXECUTOR']._serialized_end=2377
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,36 @@ class ExecutorStub(object):
                 request_serializer=executor__pb2.ExecRequest.SerializeToString,
                 response_deserializer=executor__pb2.ExecResponse.FromString,
                 _registered_method=True)
+        self.ExecuteBatch = channel.unary_stream(
+                '/operato.runner.Executor/ExecuteBatch',
+                request_serializer=executor__pb2.ExecBatchRequest.SerializeToString,
+                response_deserializer=executor__pb2.ExecBatchItem.FromString,
+                _registered_method=True)
+        self.ExecuteStream = channel.unary_stream(
+                '/operato.runner.Executor/ExecuteStream',
+                request_serializer=executor__pb2.ExecRequest.SerializeToString,
+                response_deserializer=executor__pb2.ExecEvent.FromString,
+                _registered_method=True)
+        self.ExecuteMany = channel.stream_stream(
+                '/operato.runner.Executor/ExecuteMany',
+                request_serializer=executor__pb2.ExecManyRequest.SerializeToString,
+                response_deserializer=executor__pb2.ExecManyResponse.FromString,
+                _registered_method=True)
+        self.SubmitJob = channel.unary_unary(
+                '/operato.runner.Executor/SubmitJob',
+                request_serializer=executor__pb2.ExecRequest.SerializeToString,
+                response_deserializer=executor__pb2.JobStatus.FromString,
+                _registered_method=True)
+        self.GetJob = channel.unary_unary(
+                '/operato.runner.Executor/GetJob',
+                request_serializer=executor__pb2.JobRequest.SerializeToString,
+                response_deserializer=executor__pb2.JobStatus.FromString,
+                _registered_method=True)
+        self.CancelJob = channel.unary_unary(
+                '/operato.runner.Executor/CancelJob',
+                request_serializer=executor__pb2.JobRequest.SerializeToString,
+                response_deserializer=executor__pb2.JobStatus.FromString,
+                _registered_method=True)
         self.ListModules = channel.unary_unary(
                 '/operato.runner.Executor/ListModules',
                 request_serializer=executor__pb2.ListModulesRequest.SerializeToString,
@@ -70,6 +100,47 @@ class ExecutorServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ExecuteBatch(self, request, context):
+        """Run one module over many inputs; results stream as they complete, or in input order if ordered is set
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ExecuteStream(self, request, context):
+        """Stream stdout/stderr chunks and progress while the handler runs, then a final result
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ExecuteMany(self, request_iterator, context):
+        """Many small executions over one stream; responses carry the request id and may arrive out of order.
+        The optional "x-max-in-flight" metadata bounds concurrent executions per stream.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitJob(self, request, context):
+        """Queue an execution and return its job id right away; poll GetJob for status and result
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CancelJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ListModules(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -102,6 +173,36 @@ def add_ExecutorServicer_to_server(servicer, server):
                     request_deserializer=executor__pb2.ExecRequest.FromString,
                     response_serializer=executor__pb2.ExecResponse.SerializeToString,
             ),
+            'ExecuteBatch': grpc.unary_stream_rpc_method_handler(
+                    servicer.ExecuteBatch,
+                    request_deserializer=executor__pb2.ExecBatchRequest.FromString,
+                    response_serializer=executor__pb2.ExecBatchItem.SerializeToString,
+            ),
+            'ExecuteStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.ExecuteStream,
+                    request_deserializer=executor__pb2.ExecRequest.FromString,
+                    response_serializer=executor__pb2.ExecEvent.SerializeToString,
+            ),
+            'ExecuteMany': grpc.stream_stream_rpc_method_handler(
+                    servicer.ExecuteMany,
+                    request_deserializer=executor__pb2.ExecManyRequest.FromString,
+                    response_serializer=executor__pb2.ExecManyResponse.SerializeToString,
+            ),
+            'SubmitJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitJob,
+                    request_deserializer=executor__pb2.ExecRequest.FromString,
+                    response_serializer=executor__pb2.JobStatus.SerializeToString,
+            ),
+            'GetJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJob,
+                    request_deserializer=executor__pb2.JobRequest.FromString,
+                    response_serializer=executor__pb2.JobStatus.SerializeToString,
+            ),
+            'CancelJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.CancelJob,
+                    request_deserializer=executor__pb2.JobRequest.FromString,
+                    response_serializer=executor__pb2.JobStatus.SerializeToString,
+            ),
             'ListModules': grpc.unary_unary_rpc_method_handler(
                     servicer.ListModules,
                     request_deserializer=executor__pb2.ListModulesRequest.FromString,
@@ -160,6 +261,168 @@ class Executor(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ExecuteBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/operato.runner.Executor/ExecuteBatch',
+            executor__pb2.ExecBatchRequest.SerializeToString,
+            executor__pb2.ExecBatchItem.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ExecuteStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/operato.runner.Executor/ExecuteStream',
+            executor__pb2.ExecRequest.SerializeToString,
+            executor__pb2.ExecEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ExecuteMany(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/operato.runner.Executor/ExecuteMany',
+            executor__pb2.ExecManyRequest.SerializeToString,
+            executor__pb2.ExecManyResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/operato.runner.Executor/SubmitJob',
+            executor__pb2.ExecRequest.SerializeToString,
+            executor__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/operato.runner.Executor/GetJob',
+            executor__pb2.JobRequest.SerializeToString,
+            executor__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CancelJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/operato.runner.Executor/CancelJob',
+            executor__pb2.JobRequest.SerializeToString,
+            executor__pb2.JobStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ListModules(request,
             target,
@@ -0,0 +1,225 @@
+"""실행 이력과 로그 테이블의 보존 정책을 주기적으로 적용하는 백그라운드 서비스.
+
+테이블마다 최대 보존 기간(max_age_days), 최대 행 수(max_rows), 모듈별 최신 N 개(keep_last_per_module)를 정하면
+조건을 넘는 행을 batch_size 개씩 지운다. archive 를 켜면 지우기 전에 gzip JSONL 세그먼트 파일로 먼저 내보낸다.
+지운 뒤에는 incremental vacuum / WAL checkpoint 로 파일 크기를 돌려주고 줄어든 바이트 수를 보고한다.
+
+    executions:
+      max_age_days: 30
+      keep_last_per_module: 1000
+      archive: true
+    execution_rollups:
+      max_age_days: 7      # 분 단위 롤업만 지운다
+    error_log:
+      max_age_days: 90
+      max_rows: 100000
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import delete, select, text
+from execution_history import ExecutionHistory
+from models.audit_log import AuditLog
+from models.error_log import ErrorLog
+from models.module_history import ModuleHistory
+from models.validation_log import ModuleValidationLog
+
+# 테이블 -> (모델, 기준 시각 컬럼, 모듈 컬럼)
+LOG_TABLES = {
+    "error_log": (ErrorLog, ErrorLog.created_at, None),
+    "audit_logs": (AuditLog, AuditLog.created_at, None),
+    "module_validation_logs": (ModuleValidationLog, ModuleValidationLog.created_at, None),
+    "module_history": (ModuleHistory, ModuleHistory.timestamp, ModuleHistory.module_id),
+}
+HISTORY_TABLES = ("executions", "execution_rollups")
+
+class RetentionPolicy(BaseModel):
+    """테이블 하나의 보존 정책. 조건은 각각 따로 적용된다 (하나라도 넘으면 지운다)."""
+    model_config = ConfigDict(frozen=True)
+
+    max_age_days: Optional[float] = None
+    max_rows: Optional[int] = None
+    keep_last_per_module: Optional[int] = None
+    # 지우기 전에 gzip JSONL 세그먼트로 내보낸다 (RetentionService 의 archive_dir 필요)
+    archive: bool = False
+
+class SegmentArchive:
+    """실행 한 번에 테이블마다 {table}-{시각}.jsonl.gz 세그먼트 하나를 만든다."""
+
+    def __init__(self, directory: str, table: str, run_id: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{table}-{run_id}.jsonl.gz")
+        self.count = 0
+
+    def __call__(self, rows: List[Dict[str, Any]]) -> None:
+        # gzip 멤버를 이어 붙여도 하나의 스트림으로 읽힌다
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        self.count += len(rows)
+
+class RetentionService:
+    def __init__(
+        self,
+        policies: Dict[str, RetentionPolicy],
+        history: Optional[ExecutionHistory] = None,
+        sessionmaker=None,
+        interval: float = 3600.0,
+        batch_size: int = 1000,
+        archive_dir: Optional[str] = None,
+    ):
+        for table, policy in policies.items():
+            if table not in LOG_TABLES and table not in HISTORY_TABLES:
+                raise ValueError(f"unknown table {table!r}")
+            if policy.keep_last_per_module is not None and table not in ("executions", "module_history"):
+                raise ValueError(f"{table} has no module column for keep_last_per_module")
+            if policy.archive and archive_dir is None:
+                raise ValueError(f"{table} archive requires archive_dir")
+        self.policies = policies
+        self.history = history
+        self.sessionmaker = sessionmaker
+        self.interval = interval
+        self.batch_size = batch_size
+        self.archive_dir = archive_dir
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> "RetentionService":
+        """{"interval": 3600, "batch_size": 1000, "archive_dir": "...", "tables": {table: {...}}} 형태의 설정(YAML/JSON)"""
+        options = {key: data[key] for key in ("interval", "batch_size", "archive_dir") if data.get(key) is not None}
+        policies = {table: RetentionPolicy(**(policy or {})) for table, policy in (data.get("tables") or {}).items()}
+        return cls(policies, **options, **kwargs)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _loop(self) -> None:
+        # 기동 직후에는 다른 초기화와 겹치지 않게 한 주기 쉬고 시작한다
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logging.exception(f"retention run failed: {e}")
+
+    async def run_once(self) -> Dict[str, Any]:
+        """모든 정책을 한 번 적용하고 {"tables": {table: {"deleted", "archived"}}, "reclaimed_bytes", ...} 를 돌려준다."""
+        async with self._lock:
+            start = time.monotonic()
+            run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+            tables: Dict[str, Dict[str, int]] = {}
+            reclaimed = 0
+            if self.history is not None:
+                for table in HISTORY_TABLES:
+                    if table in self.policies:
+                        tables[table] = await asyncio.to_thread(self._prune_history, table, self.policies[table], run_id)
+                if any(tables.get(table, {}).get("deleted") for table in HISTORY_TABLES):
+                    reclaimed += await asyncio.to_thread(self.history.reclaim)
+            if self.sessionmaker is not None:
+                pruned = False
+                async with self.sessionmaker() as session:
+                    for table, (model, column, module_column) in LOG_TABLES.items():
+                        if table in self.policies:
+                            tables[table] = await self._prune_log(session, table, self.policies[table], run_id)
+                            pruned = pruned or bool(tables[table]["deleted"])
+                    if pruned:
+                        reclaimed += await self._reclaim_log_db(session)
+            self.last_report = {
+                "started_at": run_id,
+                "duration": time.monotonic() - start,
+                "tables": tables,
+                "reclaimed_bytes": reclaimed,
+            }
+            return self.last_report
+
+    def _archive(self, table: str, policy: RetentionPolicy, run_id: str) -> Optional[SegmentArchive]:
+        return SegmentArchive(self.archive_dir, table, run_id) if policy.archive else None
+
+    def _prune_history(self, table: str, policy: RetentionPolicy, run_id: str) -> Dict[str, int]:
+        if table == "execution_rollups":
+            deleted = self.history.prune_rollups(policy.max_age_days) if policy.max_age_days is not None else 0
+            return {"deleted": deleted, "archived": 0}
+        archive = self._archive(table, policy, run_id)
+        deleted = self.history.prune(
+            max_age_days=policy.max_age_days,
+            max_rows=policy.max_rows,
+            keep_last_per_module=policy.keep_last_per_module,
+            batch_size=self.batch_size,
+            archive=archive,
+        )
+        return {"deleted": deleted, "archived": archive.count if archive else 0}
+
+    async def _prune_log(self, session, table: str, policy: RetentionPolicy, run_id: str) -> Dict[str, int]:
+        model, column, module_column = LOG_TABLES[table]
+        conditions = []
+        if policy.max_age_days is not None:
+            # server_default=func.now() 는 UTC 로 기록된다
+            conditions.append(column < datetime.utcnow() - timedelta(days=policy.max_age_days))
+        if policy.max_rows is not None:
+            threshold = (await session.execute(
+                select(model.id).order_by(model.id.desc()).offset(policy.max_rows).limit(1)
+            )).scalar()
+            if threshold is not None:
+                conditions.append(model.id <= threshold)
+        if policy.keep_last_per_module is not None:
+            for module_id in (await session.execute(select(module_column).distinct())).scalars().all():
+                threshold = (await session.execute(
+                    select(model.id).where(module_column == module_id)
+                    .order_by(model.id.desc()).offset(policy.keep_last_per_module).limit(1)
+                )).scalar()
+                if threshold is not None:
+                    conditions.append((module_column == module_id) & (model.id <= threshold))
+        archive = self._archive(table, policy, run_id)
+        deleted = 0
+        for condition in conditions:
+            while True:
+                query = select(model.__table__).where(condition) if archive else select(model.id).where(condition)
+                rows = (await session.execute(query.order_by(model.id).limit(self.batch_size))).all()
+                if not rows:
+                    break
+                if archive is not None:
+                    await asyncio.to_thread(archive, [dict(row._mapping) for row in rows])
+                # 배치마다 커밋해서 잠금을 오래 잡지 않는다
+                await session.execute(delete(model).where(model.id.in_([row.id for row in rows])))
+                await session.commit()
+                deleted += len(rows)
+        return {"deleted": deleted, "archived": archive.count if archive else 0}
+
+    async def _reclaim_log_db(self, session) -> int:
+        if session.bind.dialect.name != "sqlite":
+            # PostgreSQL 등은 autovacuum 에 맡긴다
+            return 0
+        page_size = (await session.execute(text("PRAGMA page_size"))).scalar()
+        before = (await session.execute(text("PRAGMA page_count"))).scalar()
+        if (await session.execute(text("PRAGMA auto_vacuum"))).scalar() == 2:
+            await session.execute(text("PRAGMA incremental_vacuum"))
+        await session.commit()
+        after = (await session.execute(text("PRAGMA page_count"))).scalar()
+        return max(before - after, 0) * page_size
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "batch_size": self.batch_size,
+            "archive_dir": self.archive_dir,
+            "policies": {table: policy.model_dump() for table, policy in self.policies.items()},
+            "last_report": self.last_report,
+        }
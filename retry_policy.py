@@ -1,6 +1,7 @@
 import asyncio
 from typing import Dict, Any, Optional, Callable, TypeVar, Generic
 from models import ExecRequest, ExecResult
+from admission import AdmissionRejected
 
 T = TypeVar('T')
 
@@ -16,6 +17,9 @@ class RetryPolicy(Generic[T]):
         for attempt in range(self.max_retries + 1):
             try:
                 return await func(*args, **kwargs)
+            except AdmissionRejected:
+                # 과부하 상태에서 바로 다시 두드리면 부하만 늘어난다
+                raise
             except Exception as e:
                 last_exception = e
                 if attempt < self.max_retries:
@@ -35,6 +39,9 @@ class RetryableExecutorManager:
                 self.executor_manager.execute,
                 request
             )
+        except AdmissionRejected:
+            # 과부하 거절은 결과로 감추지 않고 호출자(429/RESOURCE_EXHAUSTED)에게 넘긴다
+            raise
         except Exception as e:
             return ExecResult(
                 result_json={},
@@ -44,11 +51,42 @@ class RetryableExecutorManager:
                 duration=0
             )
     
+    async def resolve(self, module_name: str, phases=None):
+        return await self.executor_manager.resolve(module_name, phases)
+
+    async def run(self, executor, context, request: ExecRequest, phases=None) -> ExecResult:
+        return await self.executor_manager.run(executor, context, request, phases)
+
+    def execute_stream(self, request: ExecRequest):
+        # 이미 흘려보낸 출력은 되돌릴 수 없으므로 스트리밍 실행은 재시도하지 않는다
+        return self.executor_manager.execute_stream(request)
+
+    def iter_batch(self, module_name: str, inputs, concurrency: int = 8, ordered: bool = False, tenant=None):
+        return self.executor_manager.iter_batch(module_name, inputs, concurrency, ordered, tenant)
+
+    async def execute_batch(self, module_name: str, inputs, concurrency: int = 8, tenant=None):
+        return await self.executor_manager.execute_batch(module_name, inputs, concurrency, tenant)
+
     def register_executor(self, env: str, executor) -> None:
         self.executor_manager.register_executor(env, executor)
     
     def get_available_environments(self):
         return self.executor_manager.get_available_environments()
+
+    def describe_environments(self):
+        return self.executor_manager.describe_environments()
+
+    def describe_admission(self):
+        return self.executor_manager.describe_admission()
+
+    def describe_scheduler(self):
+        return self.executor_manager.describe_scheduler()
     
+    async def invalidate_module(self, module_name: str) -> None:
+        await self.executor_manager.invalidate_module(module_name)
+
+    async def prepare_module(self, module_name: str) -> None:
+        await self.executor_manager.prepare_module(module_name)
+
     async def cleanup(self) -> None:
         await self.executor_manager.cleanup() 
\ No newline at end of file
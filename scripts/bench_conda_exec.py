@@ -0,0 +1,96 @@
+"""conda 모듈 실행 방식별 지연 시간 비교.
+
+  - conda-run : 기존 방식. 요청마다 `conda run -n <env> python ...` 로 handler 실행
+  - direct    : 요청마다 env 의 python 을 직접 실행 (conda 활성화 비용 제거)
+  - pool      : env 의 python 으로 띄운 상주 워커(WorkerPool) 재사용
+
+사용 예:
+  python scripts/bench_conda_exec.py --env mymod --module-dir module_envs/mymod -n 20
+  python scripts/bench_conda_exec.py --python /usr/bin/python3 --module-dir module_envs/mymod --modes direct,pool
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from executors.conda import conda_python_bin, conda_env_vars
+from executors.conda_envs import CondaEnvIndex
+from executors.worker_pool import WorkerPool, WORKER_SCRIPT
+from utils.process import run_process
+
+ONE_SHOT = (
+    "import json, sys; sys.path.insert(0, sys.argv[1]); from handler import handler; "
+    "print(json.dumps(handler(json.loads(sys.stdin.read()))))"
+)
+
+async def bench_conda_run(env_name, module_dir, payload, n):
+    cmd = ["conda", "run", "-n", env_name, "python", "-c", ONE_SHOT, module_dir]
+    return [await timed(run_process(cmd, input=payload, check=True)) for _ in range(n)]
+
+async def bench_direct(python_bin, env, module_dir, payload, n):
+    cmd = [python_bin, "-c", ONE_SHOT, module_dir]
+    return [await timed(run_process(cmd, input=payload, env=env, check=True)) for _ in range(n)]
+
+async def bench_pool(python_bin, env, module_dir, input_json, n):
+    pool = WorkerPool([python_bin, WORKER_SCRIPT, module_dir], env=env, max_size=1)
+    try:
+        # 첫 요청은 워커 기동 비용이 포함되므로 따로 보고
+        cold = await timed(pool.run(input_json))
+        return [cold] + [await timed(pool.run(input_json)) for _ in range(n - 1)]
+    finally:
+        await pool.close()
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+def report(mode, samples):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{mode:10s} n={len(ms):4d}  first={samples[0] * 1000:9.1f}ms  "
+          f"mean={statistics.mean(ms):9.1f}ms  p50={statistics.median(ms):9.1f}ms  p95={p95:9.1f}ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark conda module execution strategies")
+    parser.add_argument("--env", help="conda environment name (looked up via conda env list)")
+    parser.add_argument("--python", help="Interpreter to use instead of looking up --env")
+    parser.add_argument("--module-dir", required=True, help="Directory containing handler.py")
+    parser.add_argument("--input", default="{}", help="JSON input passed to handler")
+    parser.add_argument("-n", type=int, default=20, help="Requests per mode")
+    parser.add_argument("--modes", default="conda-run,direct,pool")
+    args = parser.parse_args()
+
+    module_dir = os.path.abspath(args.module_dir)
+    input_json = json.loads(args.input)
+    payload = json.dumps(input_json).encode("utf-8")
+    if args.python:
+        python_bin, env = args.python, None
+    else:
+        if not args.env:
+            parser.error("--env or --python is required")
+        index = CondaEnvIndex()
+        await index.refresh()
+        prefix = index.lookup(args.env)
+        if prefix is None:
+            parser.error(f"conda environment '{args.env}' not found")
+        python_bin, env = conda_python_bin(prefix), conda_env_vars(prefix)
+
+    for mode in args.modes.split(","):
+        if mode == "conda-run":
+            if not args.env:
+                print("conda-run  skipped (--env not given)")
+                continue
+            report(mode, await bench_conda_run(args.env, module_dir, payload, args.n))
+        elif mode == "direct":
+            report(mode, await bench_direct(python_bin, env, module_dir, payload, args.n))
+        elif mode == "pool":
+            report(mode, await bench_pool(python_bin, env, module_dir, input_json, args.n))
+        else:
+            parser.error(f"unknown mode: {mode}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from httpx import AsyncClient, ASGITransport
+import core.db as dbmod
+from module_registry import module_cache
+from admission import AdmissionConfig, AdmissionController, AdmissionRejected
+from executor_manager import ExecutorManager
+from fair_scheduler import FairScheduler
+from executors.base import Executor
+from models import ExecContext, ExecRequest, ExecResult, ModuleRecord
+
+class Registry:
+    async def resolve_module(self, name):
+        return ModuleRecord(id=1, name=name, env="venv", version_id=1)
+
+class GatedExecutor(Executor):
+    """release 될 때까지 실행을 붙잡아 두는 executor"""
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = 0
+    async def execute(self, request, context=None):
+        self.started += 1
+        await self.gate.wait()
+        return ExecResult(result_json={}, exit_code=0, duration=0.0)
+    async def validate(self, module_name, context=None):
+        return True
+    async def cleanup(self):
+        pass
+    @property
+    def executor_type(self):
+        return "venv"
+
+def make_manager(**limits):
+    mgr = ExecutorManager(Registry(), admission=AdmissionController(**limits))
+    executor = GatedExecutor()
+    mgr.register_executor("venv", executor)
+    return mgr, executor
+
+@pytest.mark.asyncio
+async def test_module_limit_queues_then_rejects():
+    mgr, executor = make_manager(modules={"heavy": AdmissionConfig(max_concurrency=1, max_queue=1, max_wait=None)})
+    first = asyncio.ensure_future(mgr.execute(ExecRequest(module="heavy", input_json={})))
+    second = asyncio.ensure_future(mgr.execute(ExecRequest(module="heavy", input_json={})))
+    await asyncio.sleep(0.01)
+    assert executor.started == 1
+    # 실행 1 + 대기 1 이 찼으므로 세 번째는 바로 거절
+    with pytest.raises(AdmissionRejected):
+        await mgr.execute(ExecRequest(module="heavy", input_json={}))
+    # 제한이 없는 모듈은 영향 없음
+    other = asyncio.ensure_future(mgr.execute(ExecRequest(module="light", input_json={})))
+    await asyncio.sleep(0.01)
+    assert executor.started == 2
+    executor.gate.set()
+    await asyncio.gather(first, second, other)
+    stats = mgr.describe_admission()["modules"]["heavy"]
+    assert stats["admitted"] == 2 and stats["rejected"] == 1 and stats["active"] == 0
+    assert stats["wait_seconds_max"] > 0
+
+@pytest.mark.asyncio
+async def test_env_limit_and_wait_timeout():
+    mgr, executor = make_manager(envs={"venv": AdmissionConfig(max_concurrency=1, max_queue=4, max_wait=0.05)})
+    first = asyncio.ensure_future(mgr.execute(ExecRequest(module="a", input_json={})))
+    await asyncio.sleep(0.01)
+    with pytest.raises(AdmissionRejected) as e:
+        await mgr.execute(ExecRequest(module="b", input_json={}))
+    assert "environment 'venv'" in str(e.value)
+    # 배치에서는 거절된 입력만 오류 결과로 돌려준다
+    results = await mgr.execute_batch("c", [{}, {}], concurrency=2)
+    assert all(r.exit_code == 1 and "overloaded" in r.stderr for r in results)
+    executor.gate.set()
+    await first
+    assert mgr.describe_admission()["envs"]["venv"]["waiting"] == 0
+
+@pytest.mark.asyncio
+async def test_execute_reports_lookup_and_queue_phases():
+    mgr, executor = make_manager(modules={"m": AdmissionConfig(max_concurrency=1)})
+    executor.gate.set()
+    result = await mgr.execute(ExecRequest(module="m", input_json={}))
+    assert {"lookup", "validate", "queue"} <= set(result.phases)
+
+@pytest.mark.asyncio
+async def test_admission_wait_does_not_hold_scheduler_slot():
+    mgr, executor = make_manager(modules={"heavy": AdmissionConfig(max_concurrency=1, max_queue=8, max_wait=None)})
+    mgr.scheduler = FairScheduler(capacity=2)
+    heavy = [asyncio.ensure_future(mgr.execute(ExecRequest(module="heavy", input_json={}))) for _ in range(4)]
+    await asyncio.sleep(0.01)
+    # heavy 는 하나만 실행 중이고 나머지는 모듈 제한에서 기다리므로 남은 스케줄러 슬롯으로 다른 모듈이 바로 실행된다
+    light = asyncio.ensure_future(mgr.execute(ExecRequest(module="light", input_json={})))
+    await asyncio.sleep(0.01)
+    assert executor.started == 2
+    assert mgr.scheduler.stats()["tenants"]["anonymous"]["active"] == 2
+    executor.gate.set()
+    await asyncio.gather(light, *heavy)
+
+@pytest.mark.asyncio
+async def test_rest_inline_batch_goes_through_admission():
+    from api.rest import create_app
+    mgr, _ = make_manager(modules={"inl": AdmissionConfig(max_concurrency=1, max_queue=0)})
+    record = ModuleRecord(id=1, name="inl", env="inline", version_id=1, code="print(input['x'])\nreturn {'y': input['x'] * 2}")
+    module_cache.put(record)
+    app = create_app()
+    app.state.executor_manager = mgr
+    app.dependency_overrides[dbmod.get_db] = lambda: None
+    body = {"inputs": [{"x": 1}, {"x": 2}]}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            # 인라인 모듈도 다른 환경처럼 입력마다 슬롯을 받으므로, 슬롯이 차 있으면 입력마다 거절된다
+            async with mgr._slot(ExecRequest(module="inl", input_json={}), ExecContext(module=record)):
+                rejected = (await client.post("/run/inl/batch", json=body)).json()["results"]
+            assert [r["exit_code"] for r in rejected] == [1, 1]
+            results = (await client.post("/run/inl/batch", json=body)).json()["results"]
+        assert [(r["result"], r["stdout"]) for r in results] == [({"y": 2}, "1\n"), ({"y": 4}, "2\n")]
+        assert "queue" in results[0]["phases"]
+    finally:
+        module_cache.invalidate("inl")
@@ -0,0 +1,186 @@
+import json
+import asyncio
+import grpc
+import pytest
+from executor_manager import ExecutorManager
+from executors.base import Executor
+from models import ExecResult, ModuleRecord
+from proto import executor_pb2, executor_pb2_grpc
+from api import grpc_server
+from api.grpc_server import ExecutorServicer, JwtAuthInterceptor
+from api.auth import create_access_token, TokenData
+
+class CountingRegistry:
+    def __init__(self, records):
+        self.records = {r.name: r for r in records}
+        self.calls = 0
+    async def resolve_module(self, name):
+        self.calls += 1
+        return self.records.get(name)
+
+class SleepyExecutor(Executor):
+    """입력의 delay 만큼 기다렸다가 x 를 돌려주며 동시 실행 수를 기록"""
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+    async def execute(self, request, context=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(request.input_json.get("delay", 0))
+        finally:
+            self.running -= 1
+        return ExecResult(result_json={"x": request.input_json["x"]}, exit_code=0, duration=0.0)
+    async def validate(self, module_name, context=None):
+        return True
+    async def cleanup(self):
+        pass
+    @property
+    def executor_type(self):
+        return "sleepy"
+
+def make_manager():
+    registry = CountingRegistry([ModuleRecord(id=1, name="m", env="sleepy", version_id=1)])
+    mgr = ExecutorManager(registry)
+    executor = SleepyExecutor()
+    mgr.register_executor("sleepy", executor)
+    return mgr, registry, executor
+
+@pytest.mark.asyncio
+async def test_batch_resolves_once_and_limits_concurrency():
+    mgr, registry, executor = make_manager()
+    inputs = [{"x": i, "delay": 0.01 * (i % 3)} for i in range(20)]
+    results = await mgr.execute_batch("m", inputs, concurrency=4)
+    assert [r.result_json["x"] for r in results] == list(range(20))
+    assert registry.calls == 1
+    assert executor.peak == 4
+
+@pytest.mark.asyncio
+async def test_batch_unordered_yields_as_completed():
+    mgr, _, _ = make_manager()
+    inputs = [{"x": 0, "delay": 0.2}, {"x": 1, "delay": 0}]
+    order = [index async for index, _ in mgr.iter_batch("m", inputs, concurrency=2)]
+    assert order == [1, 0]
+
+@pytest.mark.asyncio
+async def test_batch_reads_inputs_incrementally():
+    mgr, _, _ = make_manager()
+    consumed = 0
+
+    def inputs():
+        nonlocal consumed
+        for i in range(1000):
+            consumed += 1
+            yield {"x": i}
+
+    # 입력 전체를 태스크로 만들지 않고 실행 중인 만큼만 꺼내 읽는다
+    async for index, result in mgr.iter_batch("m", inputs(), concurrency=4, ordered=True):
+        assert result.result_json["x"] == index
+        assert consumed <= index + 1 + 8
+    assert consumed == 1000
+
+@pytest.mark.asyncio
+async def test_batch_unknown_module_reports_each_input():
+    mgr, _, _ = make_manager()
+    results = await mgr.execute_batch("missing", [{}, {}])
+    assert [r.exit_code for r in results] == [1, 1]
+
+@pytest.mark.asyncio
+async def test_grpc_execute_batch_streams_through_auth_interceptor(monkeypatch):
+    mgr, _, _ = make_manager()
+    server = grpc.aio.server(interceptors=[JwtAuthInterceptor()])
+    executor_pb2_grpc.add_ExecutorServicer_to_server(ExecutorServicer(None, mgr), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        token = create_access_token({"sub": "admin", "scopes": ["execute:all"]})
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = executor_pb2_grpc.ExecutorStub(channel)
+            request = executor_pb2.ExecBatchRequest(
+                module="m", json_inputs=[json.dumps({"x": i}) for i in range(5)], ordered=True
+            )
+            items = [item async for item in stub.ExecuteBatch(request, metadata=[("authorization", f"Bearer {token}")])]
+            assert [item.index for item in items] == list(range(5))
+            assert [json.loads(item.response.result)["x"] for item in items] == list(range(5))
+            with pytest.raises(grpc.aio.AioRpcError) as e:
+                [item async for item in stub.ExecuteBatch(request)]
+            assert e.value.code() == grpc.StatusCode.UNAUTHENTICATED
+            # REST 배치와 같은 입력 수 상한
+            monkeypatch.setattr(grpc_server, "BATCH_MAX_SIZE", 3)
+            with pytest.raises(grpc.aio.AioRpcError) as e:
+                [item async for item in stub.ExecuteBatch(request, metadata=[("authorization", f"Bearer {token}")])]
+            assert e.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+    finally:
+        await server.stop(0)
+
+@pytest.mark.asyncio
+async def test_grpc_execute_many_correlates_and_bounds_in_flight():
+    mgr, registry, executor = make_manager()
+    server = grpc.aio.server(interceptors=[JwtAuthInterceptor()])
+    executor_pb2_grpc.add_ExecutorServicer_to_server(ExecutorServicer(None, mgr), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        token = create_access_token({"sub": "admin", "scopes": ["execute:all"]})
+
+        async def requests():
+            for i in range(20):
+                payload = {"x": i, "delay": 0.01 * (i % 3)}
+                yield executor_pb2.ExecManyRequest(id=f"r{i}", module="m", json_input=json.dumps(payload))
+            yield executor_pb2.ExecManyRequest(id="bad", module="m", json_input="{not json")
+
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = executor_pb2_grpc.ExecutorStub(channel)
+            metadata = [("authorization", f"Bearer {token}"), ("x-max-in-flight", "3")]
+            responses = {r.id: r.response async for r in stub.ExecuteMany(requests(), metadata=metadata)}
+        assert len(responses) == 21
+        assert all(json.loads(responses[f"r{i}"].result)["x"] == i for i in range(20))
+        assert responses["bad"].exit_code == 1
+        assert executor.peak <= 3
+    finally:
+        await server.stop(0)
+
+@pytest.mark.asyncio
+async def test_grpc_execute_many_follows_module_changes():
+    mgr, registry, _ = make_manager()
+    server = grpc.aio.server(interceptors=[JwtAuthInterceptor()])
+    executor_pb2_grpc.add_ExecutorServicer_to_server(ExecutorServicer(None, mgr), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        token = create_access_token({"sub": "admin", "scopes": ["execute:all"]})
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            call = executor_pb2_grpc.ExecutorStub(channel).ExecuteMany(metadata=[("authorization", f"Bearer {token}")])
+
+            async def send(id):
+                await call.write(executor_pb2.ExecManyRequest(id=id, module="m", json_input=json.dumps({"x": 1})))
+                return (await call.read()).response
+
+            assert (await send("before")).exit_code == 0
+            # 열려 있는 스트림에서도 모듈이 삭제되면 다음 메시지부터 바로 반영된다
+            record = registry.records.pop("m")
+            assert "not found" in (await send("deleted")).stderr
+            registry.records["m"] = record
+            assert (await send("restored")).exit_code == 0
+            await call.done_writing()
+    finally:
+        await server.stop(0)
+
+class FakeContext:
+    def invocation_metadata(self):
+        return ()
+
+@pytest.mark.asyncio
+async def test_execute_many_surfaces_request_stream_errors():
+    mgr, _, executor = make_manager()
+
+    async def requests():
+        yield executor_pb2.ExecManyRequest(id="slow", module="m", json_input=json.dumps({"x": 1, "delay": 5}))
+        raise RuntimeError("client went away")
+
+    grpc_server.user_ctx_var.set(TokenData(username="admin", scopes=["execute:all"]))
+    responses = ExecutorServicer(None, mgr).ExecuteMany(requests(), FakeContext())
+    # 요청 스트림이 끊기면 응답을 기다리며 멈추지 않고 오류를 올리고, 실행 중이던 요청도 취소한다
+    with pytest.raises(RuntimeError, match="client went away"):
+        await asyncio.wait_for(responses.__anext__(), 2)
+    assert executor.running == 0
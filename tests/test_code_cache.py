@@ -0,0 +1,61 @@
+import pytest
+from executors.code_cache import CodeCache, CompiledModule, code_cache
+from executors.inline import InlineExecutor
+from models import ExecRequest
+
+def test_lru_eviction_and_stats():
+    cache = CodeCache(max_size=2)
+    loads = []
+    def loader(name):
+        def _load():
+            loads.append(name)
+            return CompiledModule(compile("x = 1", name, "exec"))
+        return _load
+    k1 = cache.make_key("a", 1, "x = 1")
+    k2 = cache.make_key("b", 1, "x = 1")
+    k3 = cache.make_key("c", 1, "x = 1")
+    cache.get_or_load(k1, loader("a"))
+    cache.get_or_load(k2, loader("b"))
+    cache.get_or_load(k1, loader("a"))  # hit, a가 최근 사용으로 이동
+    cache.get_or_load(k3, loader("c"))  # b가 밀려남
+    cache.get_or_load(k2, loader("b"))
+    assert loads == ["a", "b", "c", "b"]
+    assert cache.stats()["hits"] == 1
+    assert len(cache) == 2
+
+def test_key_depends_on_code_and_version():
+    assert CodeCache.make_key("m", 1, "a") != CodeCache.make_key("m", 1, "b")
+    assert CodeCache.make_key("m", 1, "a") != CodeCache.make_key("m", 2, "a")
+    assert CodeCache.make_key("m", 1, "a") != CodeCache.make_key("m", 1, "a", kind="body")
+
+def test_invalidate_module():
+    cache = CodeCache()
+    cache.get_or_load(cache.make_key("a", 1, "x"), lambda: CompiledModule(None))
+    cache.get_or_load(cache.make_key("b", 1, "x"), lambda: CompiledModule(None))
+    cache.invalidate("a")
+    assert len(cache) == 1
+
+def test_syntax_error_not_cached():
+    cache = CodeCache()
+    with pytest.raises(SyntaxError):
+        cache.get_or_load(cache.make_key("a", 1, "def"), lambda: CompiledModule(compile("def", "<x>", "exec")))
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_inline_executor_reuses_handler():
+    code = """
+LOADS = []
+LOADS.append(1)
+def handler(input):
+    return {'loads': len(LOADS), 'v': input['v']}
+"""
+    code_cache.invalidate("cached_mod")
+    executor = InlineExecutor()
+    first = await executor.execute(ExecRequest(module="cached_mod", input_json={"v": 1, "code": code}))
+    second = await executor.execute(ExecRequest(module="cached_mod", input_json={"v": 2, "code": code}))
+    # 모듈 본문은 한 번만 실행되고, 두 번째 호출은 캐시된 handler 만 호출
+    assert first.result_json == {"loads": 1, "v": 1}
+    assert second.result_json == {"loads": 1, "v": 2}
+    await executor.invalidate("cached_mod")
+    third = await executor.execute(ExecRequest(module="cached_mod", input_json={"v": 3, "code": code}))
+    assert third.result_json == {"loads": 1, "v": 3}
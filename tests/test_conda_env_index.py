@@ -0,0 +1,75 @@
+import json
+import subprocess
+import pytest
+import executors.conda_envs as conda_envs
+from executors.conda_envs import CondaEnvIndex, env_name_from_prefix
+from executors.conda import CondaExecutor
+
+def fake_conda(envs, calls):
+    async def run_process(cmd, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, json.dumps({"envs": envs}), "")
+    return run_process
+
+def test_env_name_from_prefix():
+    assert env_name_from_prefix("/opt/conda/envs/mymod") == "mymod"
+    assert env_name_from_prefix("/srv/module_envs/mymod/conda_env/") == "mymod"
+
+@pytest.mark.asyncio
+async def test_validate_is_lookup_after_first_refresh(monkeypatch):
+    calls = []
+    monkeypatch.setattr(conda_envs, "run_process", fake_conda(["/opt/conda", "/opt/conda/envs/mymod"], calls))
+    executor = CondaExecutor(env_index=CondaEnvIndex())
+    assert await executor.validate("mymod")
+    assert not await executor.validate("other")
+    # 접미사만 같은 환경은 매칭되지 않음
+    assert not await executor.validate("mod")
+    assert len(calls) == 1
+    snapshot = executor.describe()["conda"]
+    assert snapshot["available"] and snapshot["last_refresh"] is not None
+
+@pytest.mark.asyncio
+async def test_refresh_failure_keeps_previous_index(monkeypatch):
+    calls = []
+    index = CondaEnvIndex()
+    monkeypatch.setattr(conda_envs, "run_process", fake_conda(["/opt/conda/envs/mymod"], calls))
+    await index.refresh()
+
+    async def failing(cmd, **kwargs):
+        raise subprocess.TimeoutExpired(cmd, 1)
+    monkeypatch.setattr(conda_envs, "run_process", failing)
+    await index.refresh()
+    assert index.lookup("mymod") == "/opt/conda/envs/mymod"
+    assert index.last_error
+
+    async def missing(cmd, **kwargs):
+        raise FileNotFoundError("conda")
+    monkeypatch.setattr(conda_envs, "run_process", missing)
+    await index.refresh()
+    assert index.lookup("mymod") is None and not index.available
+
+@pytest.mark.asyncio
+async def test_execute_uses_env_python_directly(tmp_path, monkeypatch):
+    import os
+    import sys
+    from models import ExecRequest
+    # env prefix 의 bin/python 을 현재 인터프리터로 연결한 가짜 conda 환경
+    prefix = tmp_path / "envs" / "mymod"
+    (prefix / "bin").mkdir(parents=True)
+    os.symlink(sys.executable, prefix / "bin" / "python")
+    module_dir = tmp_path / "module_envs" / "mymod"
+    module_dir.mkdir(parents=True)
+    (module_dir / "handler.py").write_text(
+        "import os\ndef handler(input):\n    return {'x': input['x'] * 2, 'prefix': os.environ['CONDA_PREFIX']}\n"
+    )
+    monkeypatch.setattr(conda_envs, "run_process", fake_conda([str(prefix)], []))
+    executor = CondaExecutor(env_index=CondaEnvIndex(), module_root=str(tmp_path / "module_envs"), pool_max_size=1)
+    try:
+        first = await executor.execute(ExecRequest(module="mymod", input_json={"x": 2}))
+        second = await executor.execute(ExecRequest(module="mymod", input_json={"x": 5}))
+        assert first.exit_code == 0, first.stderr
+        assert first.result_json == {"x": 4, "prefix": str(prefix)}
+        assert second.result_json["x"] == 10
+        assert executor.pools["mymod"].stats()["spawned_total"] == 1
+    finally:
+        await executor.cleanup()
@@ -0,0 +1,80 @@
+import os
+import sys
+import stat
+import asyncio
+import pytest
+from executors.docker import ContainerWorkerPool, DockerExecutor, DockerPoolConfig
+
+# docker CLI 대신 쓰는 가짜 스크립트: run 은 마운트된 worker_main.py 를 로컬 python 으로 실행하고,
+# rm 은 지운 컨테이너 이름을 기록한다.
+FAKE_DOCKER = """#!{python}
+import os, sys
+args = sys.argv[1:]
+if args[0] == "rm":
+    with open({log!r}, "a") as f:
+        f.write(args[-1] + "\\n")
+    sys.exit(0)
+volume = args[args.index("-v") + 1]
+host_dir, container_dir = volume.split(":")[:2]
+script, workdir = args[-2], args[-1]
+script = script.replace(container_dir, host_dir)
+os.chdir({module_dir!r})
+os.execv(sys.executable, [sys.executable, script, workdir])
+"""
+
+@pytest.fixture
+def fake_docker(tmp_path, monkeypatch):
+    module_dir = tmp_path / "image"
+    module_dir.mkdir()
+    (module_dir / "handler.py").write_text(
+        "import time\ndef handler(input):\n    time.sleep(input.get('sleep', 0))\n    return {'echo': input.get('v')}\n"
+    )
+    log = tmp_path / "removed.log"
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "docker"
+    script.write_text(FAKE_DOCKER.format(python=sys.executable, log=str(log), module_dir=str(module_dir)))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return log
+
+def test_container_command_applies_limits():
+    config = DockerPoolConfig().model_copy(update={"mem_limit": "1g", "cpu_quota": 20000})
+    cmd = ContainerWorkerPool("repo/img:1", config).container_command("c1")
+    assert cmd[cmd.index("--memory") + 1] == "1g"
+    assert cmd[cmd.index("--cpu-quota") + 1] == "20000"
+    assert cmd[cmd.index("--network") + 1] == "none"
+    assert "repo/img:1" in cmd
+
+@pytest.mark.asyncio
+async def test_warm_container_reused_and_removed_on_timeout(fake_docker):
+    pool = ContainerWorkerPool("repo/img:1", DockerPoolConfig(max_size=1))
+    try:
+        assert (await pool.run({"v": 1}, timeout=10))["result"] == {"echo": 1}
+        assert (await pool.run({"v": 2}, timeout=10))["result"] == {"echo": 2}
+        assert pool.stats()["spawned_total"] == 1
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run({"sleep": 5}, timeout=0.5)
+        # 타임아웃된 워커의 컨테이너는 docker rm -f 로 정리
+        assert fake_docker.read_text().startswith("operato-runner-")
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_shared_pool_survives_invalidating_one_module(fake_docker, monkeypatch):
+    monkeypatch.setattr("executors.docker.docker.from_env", lambda: None)
+    executor = DockerExecutor(pool_config=DockerPoolConfig(max_size=1))
+    try:
+        pool = await executor._get_pool("a", "repo/img:1")
+        assert await executor._get_pool("b", "repo/img:1") is pool
+        assert (await pool.run({"v": 1}, timeout=10))["result"] == {"echo": 1}
+        assert "operato-runner.image=repo/img:1" in pool.container_command("c")
+        # a 를 재배포해도 같은 이미지를 쓰는 b 의 컨테이너는 그대로 남는다
+        await executor.invalidate("a")
+        assert executor.describe()["pools"][f"repo/img:1#{pool.config_digest}"]["modules"] == ["b"]
+        assert (await pool.run({"v": 2}, timeout=10))["result"] == {"echo": 2}
+        assert pool.stats()["spawned_total"] == 1 and not fake_docker.exists()
+        await executor.invalidate("b")
+        assert executor.pools == {} and fake_docker.read_text().startswith("operato-runner-")
+    finally:
+        await executor.cleanup()
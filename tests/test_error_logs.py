@@ -0,0 +1,117 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+import core.db as dbmod
+from models.base import Base
+from models.error_log import ErrorLog
+from utils import fulltext
+from utils.fulltext import parse_keyword, to_fts5, to_tsquery
+from utils.pagination import decode_cursor, encode_cursor
+
+@pytest_asyncio.fixture
+async def async_session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'logs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        # 실제 경로처럼 created_at 은 server_default 로 채운다. 같은 초에 여러 개여도 id 로 순서가 정해진다
+        session.add_all([ErrorLog(code="E1" if i % 2 else "E2", message=f"error {i}") for i in range(7)])
+        await session.commit()
+    yield async_session
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def client(async_session):
+    from api.rest import create_app
+    app = create_app()
+
+    async def _get_db():
+        async with async_session() as session:
+            yield session
+    app.dependency_overrides[dbmod.get_db] = _get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(datetime(2026, 1, 1, 12, 30), 42)
+    assert decode_cursor(cursor) == ("2026-01-01T12:30:00", 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_all_rows(client):
+    seen, cursor = [], None
+    # cursor 가 앞으로 나아가지 않으면 끝나지 않으므로 요청 수를 제한한다
+    for _ in range(5):
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        resp = await client.get("/api/logs/errors", params=params)
+        assert resp.status_code == 200
+        seen += [row["message"] for row in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [f"error {i}" for i in range(6, -1, -1)]
+    resp = await client.get("/api/logs/errors", params={"cursor": "garbage"})
+    assert resp.status_code == 400
+
+@pytest.mark.asyncio
+async def test_streaming_exports(client):
+    resp = await client.get("/api/logs/errors/download", params={"code": "E1"})
+    rows = list(csv.reader(StringIO(resp.text)))
+    assert rows[0][:3] == ["id", "code", "message"]
+    assert [row[2] for row in rows[1:]] == ["error 5", "error 3", "error 1"]
+    resp = await client.get("/api/logs/errors/download", params={"format": "jsonl"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["message"] for line in resp.text.splitlines()] == [f"error {i}" for i in range(6, -1, -1)]
+
+def test_keyword_parsing():
+    terms = parse_keyword('conn* "connection refused" a-b ??')
+    assert to_fts5(terms) == '"conn"* "connection refused" "a b"'
+    assert to_tsquery(terms) == "(conn:*) & (connection <-> refused) & (a <-> b)"
+
+@pytest_asyncio.fixture
+async def search_client(async_session, client):
+    async with async_session() as session:
+        session.add_all([
+            ErrorLog(code="DB", message="connection refused by upstream", stack="at connect()"),
+            ErrorLog(code="DB", message="refused connection", dev_message="connection refused"),
+            ErrorLog(code="IO", message="timeout talking to db"),
+            ErrorLog(code="IO", message="disk full", stack="timeout while writing"),
+        ])
+        await session.commit()
+    return client
+
+async def search(client, keyword, **params):
+    resp = await client.get("/api/logs/errors", params={"keyword": keyword, **params})
+    assert resp.status_code == 200
+    return [row["message"] for row in resp.json()]
+
+@pytest.mark.asyncio
+async def test_fulltext_search(search_client):
+    assert await search(search_client, '"connection refused"') == ["refused connection", "connection refused by upstream"]
+    assert await search(search_client, "connect*", code="DB") == ["refused connection", "connection refused by upstream"]
+    # message 에 나온 쪽이 stack 에만 나온 쪽보다 앞선다
+    assert await search(search_client, "timeout") == ["disk full", "timeout talking to db"]
+    assert await search(search_client, "timeout", sort="relevance") == ["timeout talking to db", "disk full"]
+    assert await search(search_client, "timeout disk") == ["disk full"]
+    resp = await search_client.get("/api/logs/errors/download", params={"keyword": "upstream", "format": "jsonl"})
+    assert [json.loads(line)["message"] for line in resp.text.splitlines()] == ["connection refused by upstream"]
+
+@pytest.mark.asyncio
+async def test_search_index_follows_deletes_and_falls_back_to_like(async_session, search_client):
+    async with async_session() as session:
+        await session.execute(delete(ErrorLog).where(ErrorLog.message == "disk full"))
+        await session.commit()
+        assert await search(search_client, "writing") == []
+        await session.execute(text("DROP TABLE error_log_fts"))
+        await session.commit()
+    fulltext._available.clear()
+    assert await search(search_client, "upstr") == ["connection refused by upstream"]
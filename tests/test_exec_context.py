@@ -0,0 +1,57 @@
+import pytest
+from executor_manager import ExecutorManager
+from executors.base import Executor
+from executors.inline import InlineExecutor
+from models import ExecRequest, ExecResult, ExecContext, ModuleRecord
+
+class CountingRegistry:
+    def __init__(self, records):
+        self.records = {r.name: r for r in records}
+        self.calls = 0
+    async def resolve_module(self, name):
+        self.calls += 1
+        return self.records.get(name)
+
+class RecordingExecutor(Executor):
+    def __init__(self):
+        self.contexts = []
+    async def execute(self, request, context=None):
+        self.contexts.append(context)
+        return ExecResult(result_json={"version": context.version}, exit_code=0, duration=0.0)
+    async def validate(self, module_name, context=None):
+        self.contexts.append(context)
+        return True
+    async def cleanup(self):
+        pass
+    @property
+    def executor_type(self):
+        return "recording"
+
+@pytest.mark.asyncio
+async def test_manager_resolves_once_and_passes_context():
+    record = ModuleRecord(id=1, name="m", env="recording", version="2.0.0", version_id=7)
+    registry = CountingRegistry([record])
+    mgr = ExecutorManager(registry)
+    executor = RecordingExecutor()
+    mgr.register_executor("recording", executor)
+    result = await mgr.execute(ExecRequest(module="m", input_json={}))
+    assert result.result_json == {"version": "2.0.0"}
+    assert registry.calls == 1
+    validate_ctx, execute_ctx = executor.contexts
+    assert validate_ctx is execute_ctx
+    assert isinstance(execute_ctx, ExecContext) and execute_ctx.version_id == 7
+
+def test_exec_context_is_immutable():
+    ctx = ExecContext(module=ModuleRecord(id=1, name="m", env="inline"))
+    with pytest.raises(Exception):
+        ctx.module = ModuleRecord(id=2, name="n", env="inline")
+
+@pytest.mark.asyncio
+async def test_inline_executor_uses_context_without_registry_lookup():
+    code = "def handler(input):\n    return {'doubled': input['x'] * 2}\n"
+    registry = CountingRegistry([])
+    executor = InlineExecutor(registry)
+    ctx = ExecContext(module=ModuleRecord(id=1, name="ctxmod", env="inline", code=code, version_id=1))
+    result = await executor.execute(ExecRequest(module="ctxmod", input_json={"x": 4}), context=ctx)
+    assert result.result_json == {"doubled": 8}
+    assert registry.calls == 0
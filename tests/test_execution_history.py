@@ -58,6 +58,10 @@ def test_list_executions(exec_history, sample_result):
     # pagination
     paged = exec_history.list_executions(limit=2, offset=1)
     assert len(paged) == 2
+    # keyset: 마지막 행의 cursor 로 다음 페이지를 이어 읽는다
+    first = exec_history.list_executions(limit=5)
+    rest = exec_history.list_executions(limit=5, cursor=first[-1]["cursor"])
+    assert [row["id"] for row in first + rest] == [row["id"] for row in all_rows]
 
 def test_get_module_stats(exec_history, sample_result):
     # 성공 3, 실패 2
@@ -73,4 +77,110 @@ def test_get_module_stats(exec_history, sample_result):
     assert stats["success_rate"] == 60.0
     assert stats["min_duration"] == 0.5
     assert stats["max_duration"] == 1.0
-    assert stats["avg_duration"] > 0.5 and stats["avg_duration"] < 1.0 
\ No newline at end of file
+    assert stats["avg_duration"] > 0.5 and stats["avg_duration"] < 1.0 
+
+def test_pending_records_visible_before_flush(temp_db_path, sample_result):
+    history = ExecutionHistory(db_path=temp_db_path, flush_interval=10, batch_size=1000)
+    try:
+        ids = [history.record_execution("modD", {"i": i}, sample_result, job_id=f"job-{i}") for i in range(3)]
+        assert ids == sorted(ids) and len(set(ids)) == 3
+        # writer 가 아직 쓰지 않았어도 조회된다
+        assert history.get_execution(ids[1])["input_json"] == {"i": 1}
+        assert history.get_execution_by_job("job-2")["id"] == ids[2]
+        assert len(history.list_executions(module_name="modD")) == 3
+        assert history.stats()["pending"] == 0
+    finally:
+        history.close()
+    # 다시 열면 이어서 id 를 매긴다
+    reopened = ExecutionHistory(db_path=temp_db_path)
+    try:
+        assert reopened.record_execution("modD", {}, sample_result) == ids[-1] + 1
+        assert reopened.get_execution(ids[0])["job_id"] == "job-0"
+    finally:
+        reopened.close()
+
+
+def test_unserializable_record_does_not_drop_batch(exec_history, sample_result):
+    good = exec_history.record_execution("modE", {"ok": True}, sample_result)
+    bad = exec_history.record_execution("modE", {"obj": object()}, sample_result)
+    exec_history.flush()
+    assert exec_history.get_execution(good)["input_json"] == {"ok": True}
+    assert exec_history.get_execution(bad) is None
+    assert exec_history.stats()["write_errors"] == 1
+
+
+def test_drop_policy_when_queue_full(temp_db_path, sample_result):
+    history = ExecutionHistory(db_path=temp_db_path, max_pending=1, overflow="drop", flush_interval=0.2, batch_size=1000)
+    try:
+        for i in range(50):
+            history.record_execution("modF", {"i": i}, sample_result)
+        history.flush()
+        assert history.dropped > 0
+        assert len(history.list_executions(module_name="modF", limit=100)) == 50 - history.dropped
+    finally:
+        history.close()
+
+
+def test_stats_come_from_rollups(temp_db_path):
+    history = ExecutionHistory(db_path=temp_db_path)
+    try:
+        for i in range(1, 101):
+            result = ExecResult(result_json={}, exit_code=1 if i % 10 == 0 else 0, duration=i / 100)
+            history.record_execution("modG", {}, result)
+        stats = history.get_module_stats("modG")
+        assert stats["total_executions"] == 100 and stats["failed_executions"] == 10
+        assert stats["min_duration"] == 0.01 and stats["max_duration"] == 1.0
+        # 스케치 분위수는 상대 오차 몇 % 안쪽
+        assert abs(stats["p50"] - 0.5) < 0.03 and abs(stats["p99"] - 0.99) < 0.05
+        series = history.get_module_timeseries("modG", granularity="minute")
+        assert sum(bucket["count"] for bucket in series) == 100
+        assert series[-1]["bucket"] == history.list_executions(limit=1)[0]["timestamp"][:16]
+        with pytest.raises(ValueError):
+            history.get_module_timeseries("modG", granularity="week")
+    finally:
+        history.close()
+
+
+def test_rollups_backfilled_for_existing_db(temp_db_path, sample_result):
+    import sqlite3
+    history = ExecutionHistory(db_path=temp_db_path)
+    for i in range(3):
+        history.record_execution("modH", {"i": i}, sample_result)
+    history.close()
+    conn = sqlite3.connect(temp_db_path)
+    conn.execute("DROP TABLE execution_rollups")
+    conn.execute("DROP TABLE execution_rollup_sketches")
+    conn.commit()
+    conn.close()
+    reopened = ExecutionHistory(db_path=temp_db_path)
+    try:
+        assert reopened.get_module_stats("modH")["total_executions"] == 3
+    finally:
+        reopened.close()
+
+
+def test_large_payloads_stored_out_of_line_and_deduplicated(temp_db_path):
+    import sqlite3
+    history = ExecutionHistory(db_path=temp_db_path, inline_threshold=100, preview_size=10, max_output_size=5000)
+    big_result = {"rows": list(range(200))}
+    try:
+        ids = [history.record_execution("modI", {"i": 1}, ExecResult(result_json=big_result, exit_code=0, stdout="x" * 3000, duration=0.1))
+               for _ in range(2)]
+        chatty = history.record_execution("modI", {}, ExecResult(result_json={}, exit_code=0, stdout="y" * 9000, duration=0.1))
+        history.flush()
+        full = history.get_execution(ids[0])
+        assert full["result_json"] == big_result and full["stdout"] == "x" * 3000
+        lazy = history.get_execution(ids[1], include_payloads=False)
+        assert lazy["result_json"] is None and lazy["stdout"] == "x" * 10
+        assert sorted(lazy["offloaded"]) == ["result_json", "stdout"] and lazy["input_json"] == {"i": 1}
+        assert history.get_execution_payload(ids[1], "result_json") == big_result
+        # 한도를 넘는 출력은 앞/뒤만 남는다
+        stdout = history.get_execution_payload(chatty, "stdout")
+        assert stdout.startswith("y" * 2500) and "truncated 4000 characters" in stdout
+    finally:
+        history.close()
+    conn = sqlite3.connect(temp_db_path)
+    # 같은 결과/출력은 한 번만 저장되고 참조 수만 늘어난다
+    assert conn.execute("SELECT COUNT(*), SUM(refcount) FROM execution_blobs").fetchone() == (3, 5)
+    assert max(len(r[0]) for r in conn.execute("SELECT stdout FROM executions")) <= 10
+    conn.close()
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from fair_scheduler import FairScheduler, TenantConfig, tenant_from_token
+from models import Tenant
+
+async def run_all(scheduler, requests, order):
+    async def one(tenant, label):
+        async with scheduler.slot(tenant):
+            order.append(label)
+            await asyncio.sleep(0.001)
+    await asyncio.gather(*(one(t, label) for t, label in requests))
+
+@pytest.mark.asyncio
+async def test_heavy_tenant_does_not_starve_others():
+    scheduler = FairScheduler(capacity=1)
+    heavy, light = Tenant(name="batch"), Tenant(name="alice")
+    order = []
+    # batch 가 먼저 20건을 넣어도 alice 의 요청은 번갈아 끼어든다
+    requests = [(heavy, "batch")] * 20 + [(light, "alice")] * 3
+    await run_all(scheduler, requests, order)
+    assert order.index("alice") <= 2
+    assert [i for i, label in enumerate(order) if label == "alice"][-1] < 8
+    stats = scheduler.stats()["tenants"]
+    assert stats["batch"]["dispatched"] == 20 and stats["alice"]["dispatched"] == 3
+    assert stats["batch"]["wait_seconds_avg"] > stats["alice"]["wait_seconds_avg"]
+
+@pytest.mark.asyncio
+async def test_scope_weights_and_quotas():
+    scheduler = FairScheduler(
+        capacity=4,
+        key_by="scope",
+        scopes={"execute:all": TenantConfig(weight=3), "execute:limited": TenantConfig(weight=1, max_concurrency=1)},
+    )
+    full = tenant_from_token("admin", ["execute:all", "execute:limited"])
+    limited = tenant_from_token("guest", ["execute:limited"])
+    assert full.scope == "execute:all" and limited.scope == "execute:limited"
+    peak = {"execute:limited": 0}
+    order = []
+
+    async def one(tenant):
+        async with scheduler.slot(tenant):
+            order.append(tenant.scope)
+            peak["execute:limited"] = max(peak["execute:limited"], scheduler.stats()["tenants"].get("execute:limited", {}).get("active", 0))
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(*([one(limited) for _ in range(8)] + [one(full) for _ in range(8)]))
+    # limited 는 동시에 1개까지만, 앞쪽 절반은 가중치 3 인 execute:all 이 대부분 차지
+    assert peak["execute:limited"] == 1
+    assert order[:8].count("execute:all") >= 6
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_nothing():
+    scheduler = FairScheduler(capacity=1)
+    gate = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot(Tenant(name="a")):
+            await gate.wait()
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    gate.set()
+    await holder
+    assert scheduler.active == 0 and scheduler.stats()["tenants"]["a"]["waiting"] == 0
@@ -56,4 +56,42 @@ async def test_security_ast_parse_blocks_bad_code():
     # ast.parse는 import 자체를 막지 않으나, RestrictedPython 등 확장 필요
     # 여기서는 SyntaxError가 아니므로 exit_code==0일 수 있음
     assert "import os" in req.input_json["code"]
-    # 실제 보안 테스트는 RestrictedPython 적용 후 강화 필요 
\ No newline at end of file
+    # 실제 보안 테스트는 RestrictedPython 적용 후 강화 필요 
+
+
+@pytest.mark.asyncio
+async def test_payload_handler_and_json_payload():
+    code = """
+def handler(input, payload=None):
+    return payload.data.upper() if payload is not None else {'n': len(input)}
+"""
+    executor = InlineExecutor()
+    result = await executor.execute(ExecRequest(
+        module="bin", input_json={"code": code}, payload=b"abc", content_type="text/plain"
+    ))
+    assert result.exit_code == 0
+    assert result.payload == b"ABC" and result.content_type == "application/octet-stream"
+
+    # payload 인자가 없는 handler 는 application/json 첨부만 디코딩해서 받는다
+    code = "def handler(input):\n    return {'got': input}\n"
+    result = await executor.execute(ExecRequest(
+        module="json", input_json={"code": code}, payload=b'{"x": 1}', content_type="application/json"
+    ))
+    assert result.result_json == {"got": {"x": 1}}
+    result = await executor.execute(ExecRequest(
+        module="json", input_json={"code": code}, payload=b"\x00", content_type="application/x-msgpack"
+    ))
+    assert result.exit_code == 1 and "payload" in result.stderr
+
+@pytest.mark.asyncio
+async def test_cached_handler_does_not_keep_previous_input():
+    # 캐시된 handler 가 첫 요청의 input 을 전역으로 들고 있으면 안 된다
+    global_code = "def handler(data):\n    return {'seen': input['v']}\n"
+    arg_code = "def handler(input):\n    return {'seen': input['v']}\n"
+    executor = InlineExecutor()
+    for code in (global_code, arg_code):
+        seen = []
+        for v in (1, 2, 3):
+            result = await executor.execute(ExecRequest(module="leak", input_json={"v": v, "code": code}))
+            seen.append(result.result_json["seen"])
+        assert seen == [1, 2, 3]
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from executor_manager import ExecutorManager
+from executors.base import Executor
+from execution_history import ExecutionHistory
+from job_queue import JobQueue, JobQueueFull
+from models import ExecRequest, ExecResult, ModuleRecord
+
+class Registry:
+    async def resolve_module(self, name):
+        return ModuleRecord(id=1, name=name, env="slow", version_id=1) if name == "m" else None
+
+class SlowExecutor(Executor):
+    """입력의 delay 만큼 기다렸다가 x 를 돌려주고, 받은 timeout 을 기록"""
+    def __init__(self):
+        self.timeouts = []
+    async def execute(self, request, context=None):
+        self.timeouts.append(request.timeout)
+        await asyncio.sleep(request.input_json.get("delay", 0))
+        return ExecResult(result_json={"x": request.input_json["x"]}, exit_code=request.input_json.get("exit", 0), duration=0.0)
+    async def validate(self, module_name, context=None):
+        return True
+    async def cleanup(self):
+        pass
+    @property
+    def executor_type(self):
+        return "slow"
+
+def make_queue(tmp_path, **kwargs):
+    mgr = ExecutorManager(Registry())
+    executor = SlowExecutor()
+    mgr.register_executor("slow", executor)
+    history = ExecutionHistory(str(tmp_path / "history.db"))
+    return JobQueue(mgr, history=history, **kwargs), executor, history
+
+async def wait_finished(queue, job_id):
+    for _ in range(200):
+        job = await queue.get(job_id)
+        if job.status in ("succeeded", "failed", "cancelled"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+@pytest.mark.asyncio
+async def test_submit_returns_immediately_and_persists_result(tmp_path):
+    queue, executor, history = make_queue(tmp_path, job_timeout=900)
+    try:
+        job = queue.submit(ExecRequest(module="m", input_json={"x": 1, "delay": 0.05}))
+        assert job.status == "queued"
+        job = await wait_finished(queue, job.id)
+        assert job.status == "succeeded" and job.result.result_json == {"x": 1}
+        # 요청에 timeout 이 없으면 작업 큐 기본값으로 실행
+        assert executor.timeouts == [900]
+        row = history.get_execution(job.execution_id)
+        assert row["job_id"] == job.id and row["result_json"] == {"x": 1}
+
+        failed = await wait_finished(queue, queue.submit(ExecRequest(module="m", input_json={"x": 2, "exit": 1})).id)
+        assert failed.status == "failed"
+        # 메모리에서 내려간 작업은 history 에서 복원
+        queue.jobs.clear()
+        restored = await queue.get(job.id)
+        assert restored.status == "succeeded" and restored.result.result_json == {"x": 1}
+        assert await queue.get("missing") is None
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_cancel_queued_and_running_jobs(tmp_path):
+    queue, executor, history = make_queue(tmp_path, workers=1)
+    try:
+        running = queue.submit(ExecRequest(module="m", input_json={"x": 1, "delay": 10}))
+        queued = queue.submit(ExecRequest(module="m", input_json={"x": 2}))
+        await asyncio.sleep(0.05)
+        assert (await queue.get(running.id)).status == "running"
+        assert queue.cancel(queued.id).status == "cancelled"
+        assert queue.cancel(running.id).status == "cancelled"
+        # 실행 중이던 작업이 취소되면 워커가 다음 작업을 받을 수 있다
+        job = await wait_finished(queue, queue.submit(ExecRequest(module="m", input_json={"x": 3})).id)
+        assert job.status == "succeeded"
+        assert len(executor.timeouts) == 2
+        assert history.get_execution_by_job(running.id) is None
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_bounded_queue_rejects_when_full(tmp_path):
+    queue, _, _ = make_queue(tmp_path, workers=1, max_queue_size=2)
+    try:
+        queue.submit(ExecRequest(module="m", input_json={"x": 1, "delay": 10}))
+        await asyncio.sleep(0.02)
+        queue.submit(ExecRequest(module="m", input_json={"x": 2}))
+        queue.submit(ExecRequest(module="m", input_json={"x": 3}))
+        with pytest.raises(JobQueueFull):
+            queue.submit(ExecRequest(module="m", input_json={"x": 4}))
+    finally:
+        await queue.stop()
+
+@pytest.mark.asyncio
+async def test_pending_jobs_alternate_between_tenants(tmp_path):
+    from models import Tenant
+    queue, _, _ = make_queue(tmp_path, workers=1)
+    try:
+        queue.submit(ExecRequest(module="m", input_json={"x": 0, "delay": 0.05}))
+        await asyncio.sleep(0.01)
+        bulk = [queue.submit(ExecRequest(module="m", input_json={"x": i, "delay": 0.05}, tenant=Tenant(name="bulk"))) for i in range(5)]
+        other = queue.submit(ExecRequest(module="m", input_json={"x": 99}, tenant=Tenant(name="alice")))
+        await wait_finished(queue, other.id)
+        # alice 의 작업은 bulk 가 모두 끝나기 전에 실행된다
+        assert (await queue.get(bulk[-1].id)).status == "queued"
+        await wait_finished(queue, bulk[-1].id)
+    finally:
+        await queue.stop()
@@ -0,0 +1,56 @@
+import pytest
+import metrics
+from metrics import Counter, Histogram
+from executor_manager import ExecutorManager
+from executors.base import Executor
+from models import ExecRequest, ExecResult, ModuleRecord
+
+class Registry:
+    async def resolve_module(self, name):
+        return ModuleRecord(id=1, name=name, env="fake", version_id=1)
+
+class FakeExecutor(Executor):
+    async def execute(self, request, context=None):
+        return ExecResult(result_json={}, exit_code=request.input_json.get("exit", 0), duration=0.0)
+    async def validate(self, module_name, context=None):
+        return True
+    def describe(self):
+        return {"type": "fake", "pools": {"m": {"size": 2, "idle": 1, "busy": 1, "spawned_total": 3}}}
+    async def cleanup(self):
+        pass
+    @property
+    def executor_type(self):
+        return "fake"
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("t_seconds", "test", ("module",), buckets=(0.1, 1.0))
+    hist.observe(0.05, "a")
+    hist.observe(0.5, "a")
+    hist.observe(5, 'we"ird')
+    lines = hist.render()
+    assert 't_seconds_bucket{module="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{module="a",le="1"} 2' in lines
+    assert 't_seconds_bucket{module="a",le="+Inf"} 2' in lines
+    assert 't_seconds_count{module="a"} 2' in lines
+    assert 't_seconds_sum{module="a"} 0.55' in lines
+    assert 't_seconds_bucket{module="we\\"ird",le="+Inf"} 1' in lines
+    counter = Counter("t_total", "test", ("limit",))
+    counter.inc("x")
+    counter.inc("x", amount=2)
+    assert counter.render()[-1] == 't_total{limit="x"} 3'
+
+@pytest.mark.asyncio
+async def test_manager_records_execution_and_lookup_metrics():
+    mgr = ExecutorManager(Registry())
+    mgr.register_executor("fake", FakeExecutor())
+    before_ok = metrics.EXECUTION_DURATION.count("metrics-mod", "fake", "0")
+    before_lookup = metrics.MODULE_LOOKUP.count()
+    await mgr.execute(ExecRequest(module="metrics-mod", input_json={}))
+    await mgr.execute(ExecRequest(module="metrics-mod", input_json={"exit": 1}))
+    assert metrics.EXECUTION_DURATION.count("metrics-mod", "fake", "0") == before_ok + 1
+    assert metrics.EXECUTION_DURATION.count("metrics-mod", "fake", "1") >= 1
+    assert metrics.MODULE_LOOKUP.count() == before_lookup + 2
+    text = metrics.render(mgr)
+    assert 'operato_workers{executor="fake",pool="m",state="busy"} 1' in text
+    assert 'operato_cache_hits_total{cache="module"}' in text
+    assert "# TYPE operato_execution_duration_seconds histogram" in text
@@ -0,0 +1,77 @@
+import time
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.module import Module, ModuleRecord
+from models.version import Version
+from models.deployment import Deployment
+from models.user import User
+from models.audit_log import AuditLog
+from module_registry import ModuleRegistry, ModuleCache
+
+def make_record(name="m", version="1.0.0"):
+    return ModuleRecord(id=1, name=name, env="inline", version=version)
+
+def test_cache_hit_miss_and_ttl():
+    cache = ModuleCache(ttl=0.05)
+    assert cache.get("m") is None
+    cache.put(make_record())
+    assert cache.get("m").version == "1.0.0"
+    time.sleep(0.06)
+    assert cache.get("m") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+def test_cache_invalidate():
+    cache = ModuleCache()
+    cache.put(make_record("a"))
+    cache.put(make_record("b"))
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") is not None
+    cache.invalidate()
+    assert cache.get("b") is None
+
+@pytest_asyncio.fixture
+async def session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reg.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as db:
+        yield db
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_resolve_module_with_active_version(session):
+    module = Module(name="calc", env="inline", version="0.1.0", code="old")
+    session.add(module)
+    await session.commit()
+    v1 = Version(module_id=module.id, version="0.1.0", code="v1")
+    v2 = Version(module_id=module.id, version="0.2.0", code="v2")
+    session.add_all([v1, v2])
+    await session.commit()
+    session.add_all([
+        Deployment(module_id=module.id, version_id=v1.id, status="inactive"),
+        Deployment(module_id=module.id, version_id=v2.id, status="active"),
+    ])
+    await session.commit()
+
+    registry = ModuleRegistry(session, cache=ModuleCache())
+    record = await registry.resolve_module("calc")
+    assert record.version == "0.2.0"
+    assert record.version_id == v2.id
+    assert record.code == "v2"
+    # 두 번째 조회는 캐시 hit
+    assert await registry.resolve_module("calc") is record
+    assert registry.cache.stats()["hits"] == 1
+    assert await registry.resolve_module("missing") is None
+
+@pytest.mark.asyncio
+async def test_register_module_invalidates(session):
+    registry = ModuleRegistry(session, cache=ModuleCache())
+    await registry.register_module(Module(name="m1", env="inline", version="0.1.0", code="a"))
+    assert (await registry.resolve_module("m1")).code == "a"
+    await registry.register_module(Module(name="m1", env="inline", version="0.1.0", code="b"))
+    assert (await registry.resolve_module("m1")).code == "b"
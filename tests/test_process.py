@@ -0,0 +1,33 @@
+import sys
+import time
+import asyncio
+import subprocess
+import pytest
+from utils.process import run_process
+
+@pytest.mark.asyncio
+async def test_run_process_captures_output():
+    proc = await run_process([sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"])
+    assert proc.returncode == 0
+    assert proc.stdout.strip() == "out"
+    assert proc.stderr.strip() == "err"
+
+@pytest.mark.asyncio
+async def test_run_process_check_raises():
+    with pytest.raises(subprocess.CalledProcessError):
+        await run_process([sys.executable, "-c", "import sys; sys.exit(3)"], check=True)
+
+@pytest.mark.asyncio
+async def test_run_process_timeout_kills_process():
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        await run_process([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5)
+    assert time.monotonic() - start < 5
+
+@pytest.mark.asyncio
+async def test_run_process_does_not_block_event_loop():
+    # 서로 다른 프로세스 실행이 이벤트 루프 위에서 겹쳐서 진행되어야 한다
+    cmd = [sys.executable, "-c", "import time; time.sleep(1)"]
+    start = time.monotonic()
+    await asyncio.gather(*[run_process(cmd) for _ in range(3)])
+    assert time.monotonic() - start < 2.5
@@ -0,0 +1,83 @@
+import gzip
+import json
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.error_log import ErrorLog
+from models import ExecResult
+from execution_history import ExecutionHistory
+from retention import RetentionPolicy, RetentionService
+
+@pytest.fixture
+def history(tmp_path):
+    history = ExecutionHistory(str(tmp_path / "exec.db"), inline_threshold=64)
+    yield history
+    history.close()
+
+@pytest_asyncio.fixture
+async def async_session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+def record(history, module, stdout="ok"):
+    return history.record_execution(module, {}, ExecResult(result_json={}, exit_code=0, stdout=stdout, stderr="", duration=0.1))
+
+def test_prune_keeps_last_per_module_and_releases_blobs(history, tmp_path):
+    big = "x" * 1000
+    for i in range(5):
+        record(history, "a", big)
+    kept = [record(history, "b") for _ in range(2)]
+    archived = []
+    assert history.prune(keep_last_per_module=2, batch_size=2, archive=archived.extend) == 3
+    assert [row["module_name"] for row in archived] == ["a"] * 3
+    assert archived[0]["stdout"] == big  # 행 밖 값까지 채워서 내보낸다
+    assert history.get_execution(kept[0]) is not None
+    conn = sqlite3.connect(history.db_path)
+    # 남은 두 행이 같은 blob 을 가리킨다
+    assert conn.execute("SELECT refcount FROM execution_blobs").fetchall() == [(2,)]
+    conn.close()
+    history.prune(max_rows=0)
+    conn = sqlite3.connect(history.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM execution_blobs").fetchone()[0] == 0
+    conn.close()
+    assert history.reclaim() >= 0
+
+@pytest.mark.asyncio
+async def test_service_prunes_logs_and_archives(history, async_session, tmp_path):
+    old = datetime.utcnow() - timedelta(days=10)
+    async with async_session() as session:
+        session.add_all([ErrorLog(code="E", message=f"old {i}", created_at=old) for i in range(3)])
+        session.add_all([ErrorLog(code="E", message=f"new {i}") for i in range(4)])
+        await session.commit()
+    for _ in range(3):
+        record(history, "a")
+    service = RetentionService(
+        {"error_log": RetentionPolicy(max_age_days=7, max_rows=3, archive=True), "executions": RetentionPolicy(max_rows=1)},
+        history=history, sessionmaker=async_session, batch_size=2, archive_dir=str(tmp_path / "archive"),
+    )
+    report = await service.run_once()
+    assert report["tables"]["error_log"] == {"deleted": 4, "archived": 4}
+    assert report["tables"]["executions"] == {"deleted": 2, "archived": 0}
+    assert service.describe()["last_report"] is report
+    async with async_session() as session:
+        assert (await session.execute(select(func.count()).select_from(ErrorLog))).scalar() == 3
+    segment, = (tmp_path / "archive").iterdir()
+    with gzip.open(segment, "rt") as f:
+        messages = [json.loads(line)["message"] for line in f]
+    assert messages == ["old 0", "old 1", "old 2", "new 0"]
+
+def test_invalid_policies():
+    with pytest.raises(ValueError):
+        RetentionService({"error_log": RetentionPolicy(keep_last_per_module=5)})
+    with pytest.raises(ValueError):
+        RetentionService({"audit_logs": RetentionPolicy(archive=True)})
+    with pytest.raises(ValueError):
+        RetentionService({"nope": RetentionPolicy()})
@@ -0,0 +1,97 @@
+import os
+import asyncio
+import sys
+import json
+import grpc
+import pytest
+from executor_manager import ExecutorManager
+from executors.venv import VenvExecutor
+from models import ExecRequest, ModuleRecord
+from proto import executor_pb2, executor_pb2_grpc
+from api.grpc_server import ExecutorServicer, JwtAuthInterceptor
+from api.auth import create_access_token
+
+HANDLER_CODE = """
+import sys
+from operato_worker import progress
+
+def handler(input):
+    for i in range(input['n']):
+        print(f'line {i}')
+        progress((i + 1) / input['n'], f'step {i}')
+    print('warn', file=sys.stderr)
+    return {'done': input['n']}
+"""
+
+class StaticRegistry:
+    def __init__(self, records):
+        self.records = {r.name: r for r in records}
+    async def resolve_module(self, name):
+        return self.records.get(name)
+
+@pytest.fixture
+def venv_executor(tmp_path):
+    # module_envs/{name}/venv/bin/python 을 현재 인터프리터로 연결한 가짜 venv
+    module_dir = tmp_path / "streamer"
+    (module_dir / "venv" / "bin").mkdir(parents=True)
+    os.symlink(sys.executable, module_dir / "venv" / "bin" / "python")
+    (module_dir / "handler.py").write_text(HANDLER_CODE)
+    registry = StaticRegistry([ModuleRecord(id=1, name="streamer", env="venv", version_id=1)])
+    return VenvExecutor(venv_path=str(tmp_path), module_registry=registry, pool_max_size=1)
+
+@pytest.mark.asyncio
+async def test_venv_stream_emits_output_before_result(venv_executor):
+    try:
+        events = [e async for e in venv_executor.execute_stream(ExecRequest(module="streamer", input_json={"n": 3}))]
+        types = [e.type for e in events]
+        assert types[-1] == "result"
+        assert [e.data for e in events if e.type == "stdout"] == ["line 0\n", "line 1\n", "line 2\n"]
+        assert [e.progress for e in events if e.type == "progress"] == pytest.approx([1 / 3, 2 / 3, 1.0])
+        assert types.index("stdout") < types.index("progress")
+        assert any(e.type == "stderr" and e.data == "warn\n" for e in events)
+        result = events[-1].result
+        assert result.exit_code == 0 and result.result_json == {"done": 3} and result.stdout == ""
+        # 스트리밍 후에도 워커는 재사용되고 일반 실행은 출력을 모아서 돌려준다
+        plain = await venv_executor.execute(ExecRequest(module="streamer", input_json={"n": 1}))
+        assert plain.stdout == "line 0\n"
+        assert venv_executor.pools["streamer"].stats()["spawned_total"] == 1
+    finally:
+        await venv_executor.cleanup()
+
+@pytest.mark.asyncio
+async def test_grpc_execute_stream(venv_executor):
+    mgr = ExecutorManager(venv_executor.module_registry)
+    mgr.register_executor("venv", venv_executor)
+    server = grpc.aio.server(interceptors=[JwtAuthInterceptor()])
+    executor_pb2_grpc.add_ExecutorServicer_to_server(ExecutorServicer(None, mgr), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        token = create_access_token({"sub": "admin", "scopes": ["execute:all"]})
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = executor_pb2_grpc.ExecutorStub(channel)
+            request = executor_pb2.ExecRequest(module="streamer", json_input=json.dumps({"n": 2}))
+            events = [e async for e in stub.ExecuteStream(request, metadata=[("authorization", f"Bearer {token}")])]
+        kinds = [e.WhichOneof("event") for e in events]
+        assert kinds.count("stdout") == 2 and kinds.count("progress") == 2
+        assert kinds[-1] == "result"
+        assert json.loads(events[-1].result.result) == {"done": 2}
+    finally:
+        await server.stop(0)
+        await venv_executor.cleanup()
+
+@pytest.mark.asyncio
+async def test_invalidate_lets_running_execution_finish(venv_executor, tmp_path):
+    (tmp_path / "streamer" / "handler.py").write_text("import time\ndef handler(input):\n    time.sleep(input['sleep'])\n    return {'ok': True}\n")
+    try:
+        task = asyncio.ensure_future(venv_executor.execute(ExecRequest(module="streamer", input_json={"sleep": 0.5})))
+        while "streamer" not in venv_executor.pools or venv_executor.pools["streamer"].stats()["busy"] == 0:
+            await asyncio.sleep(0.01)
+        pool = venv_executor.pools["streamer"]
+        await venv_executor.invalidate("streamer")
+        result = await task
+        assert result.exit_code == 0 and result.result_json == {"ok": True}
+        # 반납된 워커는 풀로 돌아가지 않고 내려간다
+        assert pool.size == 0
+    finally:
+        await venv_executor.cleanup()
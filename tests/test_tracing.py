@@ -0,0 +1,97 @@
+import json
+import sys
+import pytest
+import tracing
+from executors.worker_pool import WorkerPool, WORKER_SCRIPT
+
+class MemoryExporter:
+    def __init__(self):
+        self.spans = []
+    def export(self, spans):
+        self.spans.extend(span.to_otlp() for span in spans)
+
+@pytest.fixture
+def exporter():
+    exporter = MemoryExporter()
+    tracing.tracer.configure(exporter)
+    yield exporter
+    tracing.tracer.configure(None)
+
+def finished(exporter):
+    tracing.tracer.processor.flush()
+    return {span["name"]: span for span in exporter.spans}
+
+def test_traceparent_round_trip():
+    context = tracing.parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+    assert context == tracing.SpanContext("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)
+    assert tracing.format_traceparent(context) == "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    for bad in (None, "", "garbage", "00-" + "0" * 32 + "-00f067aa0ba902b7-01", "ff-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"):
+        assert tracing.parse_traceparent(bad) is None
+
+def test_spans_nest_under_incoming_parent(exporter):
+    parent = tracing.parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+    with tracing.span("server", "server", parent) as outer:
+        with tracing.span("inner", attributes={"module": "m"}):
+            assert tracing.current_traceparent().startswith("00-4bf92f3577b34da6a3ce929d0e0e4736-")
+        with pytest.raises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("boom")
+    assert tracing.current_context() is None
+    spans = finished(exporter)
+    assert spans["server"]["parentSpanId"] == "00f067aa0ba902b7" and spans["server"]["kind"] == 2
+    assert spans["inner"]["parentSpanId"] == outer.context.span_id
+    assert spans["inner"]["attributes"] == [{"key": "module", "value": {"stringValue": "m"}}]
+    assert spans["failing"]["status"] == {"code": 2, "message": "ValueError: boom"}
+
+def test_disabled_tracer_is_noop():
+    with tracing.span("ignored") as span:
+        assert span is None and tracing.current_traceparent() is None
+
+def test_jsonl_exporter_writes_otlp_requests(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.tracer.configure(tracing.JsonlFileExporter(str(path)))
+    try:
+        with tracing.span("a"):
+            pass
+    finally:
+        tracing.tracer.configure(None)
+    request = json.loads(path.read_text().splitlines()[0])
+    spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["name"] == "a" and len(spans[0]["traceId"]) == 32
+
+@pytest.mark.asyncio
+async def test_trace_context_reaches_worker_handler(tmp_path, exporter):
+    with open(tmp_path / "handler.py", "w") as f:
+        f.write("import os\ndef handler(input):\n    return {'traceparent': os.environ.get('TRACEPARENT')}\n")
+    pool = WorkerPool([sys.executable, WORKER_SCRIPT, str(tmp_path)], max_size=1)
+    try:
+        with tracing.span("request") as root:
+            response = await pool.run({}, timeout=10)
+    finally:
+        await pool.close()
+    spans = finished(exporter)
+    call, handler = spans["worker.call"], spans["handler"]
+    assert call["parentSpanId"] == root.context.span_id
+    assert spans["worker.spawn"]["parentSpanId"] == call["spanId"]
+    assert handler["parentSpanId"] == call["spanId"] and handler["traceId"] == root.context.trace_id
+    # handler 안에서는 자기 span 을 부모로 하는 traceparent 를 환경 변수로 받는다
+    assert response["result"]["traceparent"] == f"00-{root.context.trace_id}-{handler['spanId']}-01"
+
+@pytest.mark.asyncio
+async def test_streamed_execution_opens_execute_span(exporter):
+    from executor_manager import ExecutorManager
+    from executors.inline import InlineExecutor
+    from models import ExecRequest, ModuleRecord
+
+    class Registry:
+        async def resolve_module(self, name):
+            return ModuleRecord(id=1, name=name, env="inline", version_id=1, code="def handler(input):\n    return {'ok': 1}\n")
+
+    mgr = ExecutorManager(Registry())
+    mgr.register_executor("inline", InlineExecutor())
+    events = [e async for e in mgr.execute_stream(ExecRequest(module="streamed", input_json={}))]
+    assert events[-1].result.exit_code == 0 and "queue" in events[-1].result.phases
+    execute = finished(exporter)["execute"]
+    attributes = {a["key"]: a["value"] for a in execute["attributes"]}
+    assert attributes["module"] == {"stringValue": "streamed"} and attributes["exit_code"] == {"intValue": "0"}
+    assert "queue_seconds" in attributes
@@ -0,0 +1,160 @@
+import os
+import sys
+import asyncio
+import pytest
+from executors.worker_pool import WorkerPool, WorkerError, WORKER_SCRIPT
+
+HANDLER_CODE = """
+import os
+LOADED_PID = os.getpid()
+
+def handler(input):
+    print('hello from worker')
+    if input.get('fail'):
+        raise ValueError('boom')
+    if input.get('sleep'):
+        import time
+        time.sleep(input['sleep'])
+    return {'sum': input['a'] + input['b'], 'pid': LOADED_PID}
+"""
+
+@pytest.fixture
+def module_dir(tmp_path):
+    with open(tmp_path / "handler.py", "w") as f:
+        f.write(HANDLER_CODE)
+    return str(tmp_path)
+
+def make_pool(module_dir, **kwargs):
+    return WorkerPool([sys.executable, WORKER_SCRIPT, module_dir], **kwargs)
+
+@pytest.mark.asyncio
+async def test_worker_reused_between_requests(module_dir):
+    pool = make_pool(module_dir, max_size=1)
+    try:
+        first = await pool.run({"a": 1, "b": 2}, timeout=10)
+        second = await pool.run({"a": 3, "b": 4}, timeout=10)
+        assert first["ok"] and first["result"]["sum"] == 3
+        assert second["result"]["sum"] == 7
+        # handler는 한 번만 import 되고 같은 프로세스가 재사용됨
+        assert first["result"]["pid"] == second["result"]["pid"]
+        assert "hello from worker" in first["stdout"]
+        assert pool.stats()["spawned_total"] == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_handler_exception_keeps_worker(module_dir):
+    pool = make_pool(module_dir, max_size=1)
+    try:
+        failed = await pool.run({"fail": True}, timeout=10)
+        assert not failed["ok"]
+        assert "ValueError: boom" in failed["error"]
+        ok = await pool.run({"a": 1, "b": 1}, timeout=10)
+        assert ok["ok"]
+        assert pool.stats()["spawned_total"] == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_recycle_after_max_requests(module_dir):
+    pool = make_pool(module_dir, max_size=1, max_requests=2)
+    try:
+        pids = [(await pool.run({"a": i, "b": 0}, timeout=10))["result"]["pid"] for i in range(3)]
+        assert pids[0] == pids[1] != pids[2]
+        assert pool.stats()["recycled_total"] == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_timeout_discards_worker(module_dir):
+    pool = make_pool(module_dir, max_size=1)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run({"a": 1, "b": 1, "sleep": 5}, timeout=0.5)
+        assert pool.size == 0
+        ok = await pool.run({"a": 1, "b": 1}, timeout=10)
+        assert ok["ok"]
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_idle_eviction_respects_min_size(module_dir):
+    pool = make_pool(module_dir, min_size=1, max_size=2, idle_timeout=0)
+    try:
+        await pool.start()
+        await asyncio.gather(*[pool.run({"a": 1, "b": 1, "sleep": 0.2}, timeout=10) for _ in range(2)])
+        assert pool.size == 2
+        await pool.evict_idle()
+        assert pool.size == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_import_error_reported(tmp_path):
+    with open(tmp_path / "handler.py", "w") as f:
+        f.write("import not_a_real_module\n")
+    pool = make_pool(str(tmp_path))
+    try:
+        with pytest.raises(WorkerError) as e:
+            await pool.run({}, timeout=10)
+        assert "not_a_real_module" in str(e.value)
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_frames_survive_raw_fd_output_and_large_payloads(tmp_path):
+    with open(tmp_path / "handler.py", "w") as f:
+        f.write(
+            "import os, sys\n"
+            "def handler(input):\n"
+            "    os.write(1, b'raw fd output\\n')\n"
+            "    assert sys.stdin.read() == ''\n"
+            "    return {'size': len(input['blob']), 'blob': input['blob']}\n"
+        )
+    pool = make_pool(str(tmp_path), max_size=1)
+    try:
+        blob = "x" * (1024 * 1024)
+        response = await pool.run({"blob": blob}, timeout=10)
+        assert response["ok"], response
+        assert response["result"]["size"] == len(blob)
+        # fd 1 로 직접 쓴 출력은 stderr 로 가고 결과 프레임과 섞이지 않음
+        assert "raw fd output" not in response["stdout"]
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_binary_payload_passed_without_json(tmp_path):
+    with open(tmp_path / "handler.py", "w") as f:
+        f.write(
+            "from operato_worker import Payload\n"
+            "def handler(input, payload=None):\n"
+            "    if payload is None:\n"
+            "        return {'plain': True}\n"
+            "    return Payload(payload.data[::-1], payload.content_type + '+reversed')\n"
+        )
+    pool = make_pool(str(tmp_path), max_size=1)
+    try:
+        blob = bytes(range(256)) * 4096
+        response = await pool.run({}, timeout=10, payload=blob, content_type="application/x-raw")
+        assert response["ok"], response
+        assert response["content_type"] == "application/x-raw+reversed"
+        assert response["payload"] == blob[::-1]
+        # content_type 이 없으면 기존 JSON 호출 그대로
+        plain = await pool.run({}, timeout=10)
+        assert plain["result"] == {"plain": True} and "payload" not in plain
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_run_reports_phase_timings(module_dir):
+    pool = make_pool(module_dir, max_size=1)
+    try:
+        first = await pool.run({"a": 1, "b": 2, "sleep": 0.05}, timeout=10)
+        assert set(first["phases"]) == {"acquire", "serialize", "handler", "deserialize", "cleanup"}
+        assert "timing" not in first
+        assert first["phases"]["handler"] >= 0.05
+        # 첫 요청은 워커 기동이 acquire 에 포함되고, 재사용하면 거의 0
+        second = await pool.run({"a": 1, "b": 2}, timeout=10)
+        assert second["phases"]["acquire"] < first["phases"]["acquire"]
+    finally:
+        await pool.close()
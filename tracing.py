@@ -0,0 +1,333 @@
+"""W3C Trace Context 전파와 OTLP/JSON 내보내기를 하는 가벼운 분산 추적.
+
+opentelemetry SDK 없이 REST/gRPC 진입점 -> ExecutorManager -> ModuleRegistry -> executor -> 워커 프로세스/컨테이너까지
+같은 trace id 로 span 을 잇는다. 현재 span 은 contextvar 로 들고 다니므로 asyncio 태스크에도 그대로 이어지고,
+워커에는 요청 프레임의 "traceparent" 로 넘긴다.
+
+끝난 span 은 BatchSpanProcessor 의 큐에 넣고 백그라운드 스레드가 모아서 exporter 로 보낸다. exporter 를 설정하지 않으면
+span 을 만들지 않는다 (tracer.enabled 가 False).
+"""
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+SERVICE_NAME = "operato-runner"
+TRACEPARENT = "traceparent"
+# OTLP SpanKind
+KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+class SpanContext(NamedTuple):
+    trace_id: str  # 32 hex
+    span_id: str  # 16 hex
+    sampled: bool = True
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """"00-<trace id>-<parent id>-<flags>" 형식이 아니면 None"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == "ff" or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if not parts[1].strip("0") or not parts[2].strip("0"):
+        return None
+    return SpanContext(parts[1].lower(), parts[2].lower(), bool(flags & 1))
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+class Span:
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            tracer._on_end(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": 2, "message": self.error} if self.error is not None else {"code": 0},
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        return data
+
+def export_request(spans: List[Span], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """OTLP ExportTraceServiceRequest 의 JSON 표현"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp() for span in spans]}],
+        }]
+    }
+
+class JsonlFileExporter:
+    """collector 의 file exporter 와 같은 형식(한 줄에 ExportTraceServiceRequest 하나)으로 파일에 덧붙인다.
+    collector 의 otlpjsonfile receiver 로 그대로 다시 읽을 수 있다."""
+
+    def __init__(self, path: str, service_name: str = SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(export_request(spans, self.service_name), separators=(",", ":"))
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+class OtlpHttpExporter:
+    """OTLP/HTTP JSON 으로 collector 에 보낸다 (예: http://otel-collector:4318/v1/traces)"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None, service_name: str = SERVICE_NAME):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]) -> None:
+        data = json.dumps(export_request(spans, self.service_name)).encode("utf-8")
+        request = urllib.request.Request(self.endpoint, data=data, headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+class BatchSpanProcessor:
+    """끝난 span 을 모아 백그라운드 스레드에서 내보낸다. 큐가 가득 차면 버리고 dropped 로 센다."""
+
+    def __init__(self, exporter, max_batch: int = 512, max_queue: int = 10000):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self, first: Optional[Span] = None) -> bool:
+        """큐에 쌓인 span 을 max_batch 개씩 내보낸다. 종료 신호(None)를 만나면 False"""
+        batch = [first] if first is not None else []
+        running = True
+        while running:
+            try:
+                span = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if span is None:
+                running = False
+                self._queue.task_done()
+                continue
+            batch.append(span)
+            if len(batch) >= self.max_batch:
+                self._export(batch)
+                batch = []
+        if batch:
+            self._export(batch)
+        return running
+
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            with self._lock:
+                self.exporter.export(batch)
+        except Exception as e:
+            logging.warning(f"failed to export {len(batch)} spans: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _loop(self) -> None:
+        while True:
+            # 하나가 들어오면 그동안 쌓인 것을 함께 내보낸다
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                self._drain()
+                return
+            if not self._drain(first):
+                self._drain()
+                return
+
+    def flush(self) -> None:
+        """지금까지 끝난 span 을 모두 내보낼 때까지 기다린다."""
+        if self._thread.is_alive():
+            self._queue.join()
+        else:
+            self._drain()
+
+    def shutdown(self) -> None:
+        try:
+            self._queue.put(None, timeout=1.0)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=5.0)
+        self._drain()
+
+class Tracer:
+    def __init__(self):
+        self.processor: Optional[BatchSpanProcessor] = None
+        self.sample_ratio = 1.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def configure(self, exporter=None, sample_ratio: float = 1.0, **processor_options) -> None:
+        """exporter 가 None 이면 추적을 끈다. 들어온 traceparent 의 sampled 플래그는 sample_ratio 보다 우선한다."""
+        self.shutdown()
+        self.sample_ratio = sample_ratio
+        self.processor = BatchSpanProcessor(exporter, **processor_options) if exporter is not None else None
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        span_id: Optional[str] = None,
+        start_ns: Optional[int] = None,
+    ) -> Optional[Span]:
+        if not self.enabled:
+            return None
+        parent = parent or _current.get()
+        if parent is not None:
+            trace_id, sampled = parent.trace_id, parent.sampled
+        else:
+            trace_id, sampled = secrets.token_hex(16), random.random() < self.sample_ratio
+        context = SpanContext(trace_id, span_id or secrets.token_hex(8), sampled)
+        return Span(name, context, parent.span_id if parent else None, kind, attributes, start_ns)
+
+    def _on_end(self, span: Span) -> None:
+        processor = self.processor
+        if processor is not None and span.context.sampled:
+            processor.on_end(span)
+
+    def shutdown(self) -> None:
+        processor, self.processor = self.processor, None
+        if processor is not None:
+            processor.shutdown()
+
+tracer = Tracer()
+_current: ContextVar[Optional[SpanContext]] = ContextVar("trace_context", default=None)
+
+def current_context() -> Optional[SpanContext]:
+    return _current.get()
+
+def current_traceparent() -> Optional[str]:
+    context = _current.get()
+    return format_traceparent(context) if context is not None else None
+
+@contextmanager
+def span(
+    name: str,
+    kind: str = "internal",
+    parent: Optional[SpanContext] = None,
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Iterator[Optional[Span]]:
+    """span 을 열고 블록 동안 현재 span 으로 둔다. 추적이 꺼져 있으면 None 을 내준다."""
+    current = tracer.start_span(name, parent, kind, attributes)
+    if current is None:
+        yield None
+        return
+    token = _current.set(current.context)
+    try:
+        yield current
+    except Exception as e:
+        current.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # 다른 컨텍스트에서 닫힌 async generator (스트리밍 응답을 끝까지 읽지 않은 경우)
+            pass
+        current.end()
+
+def record_span(
+    name: str,
+    start_ns: int,
+    end_ns: int,
+    span_id: Optional[str] = None,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+) -> None:
+    """워커처럼 다른 프로세스에서 잰 구간을 현재 span 의 자식으로 남긴다."""
+    recorded = tracer.start_span(name, kind=kind, attributes=attributes, span_id=span_id, start_ns=start_ns)
+    if recorded is not None:
+        recorded.end(end_ns)
+
+class TracingMiddleware:
+    """HTTP 요청마다 server span 을 연다. 들어온 traceparent 헤더를 부모로 잇고 응답 헤더로 돌려준다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        parent = parse_traceparent(headers.get(TRACEPARENT.encode(), b"").decode("latin-1"))
+        method, path = scope.get("method", ""), scope.get("path", "")
+        with span(f"{method} {path}", "server", parent, {"http.method": method, "http.target": path}) as server_span:
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        server_span.set_error(f"HTTP {message['status']}")
+                    message = {**message, "headers": [
+                        *message.get("headers", []), (TRACEPARENT.encode(), format_traceparent(server_span.context).encode())
+                    ]}
+                await send(message)
+            await self.app(scope, receive, send_with_trace)
@@ -0,0 +1,89 @@
+"""오류 로그 keyword 검색어를 FTS5 MATCH / PostgreSQL tsquery 로 바꾸고 조건을 붙인다.
+
+검색어는 공백으로 나눈 단어들의 AND 이다. "..." 로 묶으면 구(phrase), 끝에 * 를 붙이면 접두어 검색이다.
+전문 색인이 없는 DB 에서는 예전처럼 message/dev_message/stack 에 대한 LIKE 로 돌아간다.
+
+    timeout conn*            -> timeout 과 conn 으로 시작하는 단어가 모두 있는 로그
+    "connection refused"     -> 두 단어가 연달아 나오는 로그
+"""
+import re
+from typing import Dict, List, NamedTuple
+from sqlalchemy import and_, column, func, literal_column, or_, table, text, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.error_log import ErrorLog, ERROR_LOG_FTS
+
+class Term(NamedTuple):
+    words: List[str]
+    prefix: bool = False
+
+_TERM = re.compile(r'"([^"]*)"(\*?)|(\S+)')
+_WORD = re.compile(r"\w+")
+_fts_table = table(ERROR_LOG_FTS, column("rowid"))
+_search_vector = literal_column("error_log.search_vector")
+# 색인이 있다고 확인된 DB (없으면 매번 다시 확인해서 나중에 마이그레이션해도 바로 쓴다)
+_available: Dict[str, bool] = {}
+
+def parse_keyword(keyword: str) -> List[Term]:
+    terms = []
+    for match in _TERM.finditer(keyword or ""):
+        phrase, phrase_prefix, token = match.groups()
+        if token is not None:
+            words, prefix = _WORD.findall(token), token.endswith("*")
+        else:
+            words, prefix = _WORD.findall(phrase), bool(phrase_prefix)
+        if words:
+            terms.append(Term(words, prefix))
+    return terms
+
+def to_fts5(terms: List[Term]) -> str:
+    # 모든 단어를 따옴표로 감싸 FTS5 연산자(AND, NEAR, -, ^ 등)로 해석되지 않게 한다
+    return " ".join('"' + " ".join(term.words) + '"' + ("*" if term.prefix else "") for term in terms)
+
+def to_tsquery(terms: List[Term]) -> str:
+    parts = []
+    for term in terms:
+        words = list(term.words)
+        if term.prefix:
+            words[-1] += ":*"
+        parts.append("(" + " <-> ".join(words) + ")")
+    return " & ".join(parts)
+
+async def fulltext_available(db: AsyncSession) -> bool:
+    bind = db.bind
+    key = str(bind.url)
+    if _available.get(key):
+        return True
+    if bind.dialect.name == "sqlite":
+        query = text("SELECT 1 FROM sqlite_master WHERE name = :name")
+        available = (await db.execute(query, {"name": ERROR_LOG_FTS})).first() is not None
+    elif bind.dialect.name == "postgresql":
+        query = text("SELECT 1 FROM information_schema.columns WHERE table_name = 'error_log' AND column_name = 'search_vector'")
+        available = (await db.execute(query)).first() is not None
+    else:
+        available = False
+    _available[key] = available
+    return available
+
+def like_condition(keyword: str):
+    # 색인이 없을 때: 구/단어마다 세 컬럼 중 하나에 들어 있어야 한다
+    conditions = []
+    for match in _TERM.finditer(keyword or ""):
+        phrase, _, token = match.groups()
+        kw = f"%{token.rstrip('*') if token is not None else phrase}%"
+        conditions.append(or_(ErrorLog.message.like(kw), ErrorLog.dev_message.like(kw), ErrorLog.stack.like(kw)))
+    return and_(*conditions) if conditions else true()
+
+async def apply_keyword(db: AsyncSession, query, keyword: str, ranked: bool = False):
+    """query(select(ErrorLog)...) 에 keyword 조건을 붙인다. ranked 면 관련도 순 정렬을 먼저 건다."""
+    terms = parse_keyword(keyword)
+    if not terms or not await fulltext_available(db):
+        return query.where(like_condition(keyword))
+    if db.bind.dialect.name == "sqlite":
+        query = query.join(_fts_table, _fts_table.c.rowid == ErrorLog.id).where(
+            literal_column(ERROR_LOG_FTS).op("MATCH")(to_fts5(terms))
+        )
+        # bm25 는 낮을수록 관련도가 높다. message 에 나온 단어에 가중치를 더 준다
+        return query.order_by(func.bm25(literal_column(ERROR_LOG_FTS), 3.0, 2.0, 1.0)) if ranked else query
+    tsquery = func.to_tsquery("simple", to_tsquery(terms))
+    query = query.where(_search_vector.op("@@")(tsquery))
+    return query.order_by(func.ts_rank(_search_vector, tsquery).desc()) if ranked else query
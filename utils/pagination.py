@@ -0,0 +1,21 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+def encode_cursor(created_at: Any, id: int) -> str:
+    """(created_at, id) 키셋 위치를 URL 에 그대로 실을 수 있는 불투명 문자열로 만든다."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """encode_cursor 의 역. 형식이 맞지 않으면 ValueError"""
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError(f"invalid cursor: {cursor!r}")
+    if not isinstance(created_at, str) or not isinstance(id, int):
+        raise ValueError(f"invalid cursor: {cursor!r}")
+    return created_at, id
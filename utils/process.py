@@ -0,0 +1,56 @@
+import asyncio
+import os
+import signal
+import subprocess
+from typing import Dict, List, Optional
+
+def kill_process_group(process) -> None:
+    """프로세스와 그 자식들을 함께 종료 (start_new_session=True 로 띄운 경우)"""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+async def run_process(
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    check: bool = False,
+    env: Optional[Dict[str, str]] = None,
+    cwd: Optional[str] = None,
+    input: Optional[bytes] = None,
+    text: bool = True,
+) -> subprocess.CompletedProcess:
+    """subprocess.run 의 asyncio 버전. 이벤트 루프를 막지 않는다.
+
+    타임아웃/취소 시 프로세스 그룹 전체를 kill 하고, subprocess.run 과 동일하게
+    TimeoutExpired / CalledProcessError 를 발생시킨다.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+        cwd=cwd,
+        start_new_session=True,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(input), timeout)
+    except asyncio.TimeoutError:
+        kill_process_group(process)
+        await process.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except asyncio.CancelledError:
+        kill_process_group(process)
+        raise
+    if text:
+        stdout = stdout.decode("utf-8", errors="replace")
+        stderr = stderr.decode("utf-8", errors="replace")
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)